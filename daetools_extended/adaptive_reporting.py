@@ -0,0 +1,74 @@
+__doc__="""
+Change-driven reporting for daeSimulationExtended. Instead of reporting at a fixed interval, the simulation is
+integrated in steps of min_interval and the data is reported only when a monitored variable changed more than
+atol + rtol * |value| since the last report, or when max_interval has elapsed. Discontinuities are reported by the
+simulation itself (data is reported around each one).
+"""
+
+import numpy as np
+
+from daetools_extended.tools import get_variables
+
+
+class ChangeDrivenReporting(object):
+
+    def __init__(self, model, variables=('*',), rtol=1e-3, atol=0.0, min_interval=60., max_interval=24*3600.):
+        """
+        Reporting trigger
+        :param model: root model of the simulation
+        :param variables: fnmatch patterns of the monitored variables relative to the root model (i.e. '*.T')
+        :param rtol: relative change that triggers a report
+        :param atol: absolute change that triggers a report
+        :param min_interval: integration step in seconds, the minimum interval between reports
+        :param max_interval: maximum interval in seconds between reports
+        """
+
+        self.variables = [variable for name, variable in get_variables(model, variables)]
+        self.rtol = rtol
+        self.atol = atol
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.reported_time = None
+        self.reported_values = None
+
+
+    def get_values(self):
+
+        if not self.variables:
+            return np.zeros(0)
+
+        return np.concatenate([np.ravel(variable.npyValues) for variable in self.variables])
+
+
+    def reported(self, time):
+        """
+        Take the current state as the reference of the next changes
+        :param time: time of the report
+        :return:
+        """
+
+        self.reported_time = time
+        self.reported_values = self.get_values()
+
+
+    def update(self, time):
+        """
+        Check if the current state must be reported, in this case it becomes the new reference
+        :param time: current time
+        :return: True if the data must be reported
+        """
+
+        values = self.get_values()
+
+        if self.reported_time is None or time - self.reported_time >= self.max_interval:
+            report = True
+        else:
+            change = np.abs(values - self.reported_values)
+            report = bool(np.any(change > self.atol + self.rtol * np.abs(self.reported_values)))
+
+        if report:
+            self.reported_time = time
+            self.reported_values = values
+
+        return report
@@ -0,0 +1,186 @@
+__doc__="""
+Batch simulation of many networks in a pool of processes. The DaeTools import and configuration are done once per
+worker, and each case gets its own output file. The inputs can be:
+
+* a directory: all the *.json files inside it
+* a glob pattern: i.e. 'cases/network_*.json' or 'cases/*/network.json'
+* a JSON Lines file (*.jsonl): one network data dictionary per line
+
+The case names (and the names of the output files) are the paths relative to the common directory of the inputs,
+i.e. site_a_network and site_b_network for cases/site_a/network.json and cases/site_b/network.json.
+
+It is exposed in the command line as the batch subcommand of simulate.py:
+
+python simulate.py batch cases/ --jobs 4 --format csv --output_dir results/
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+FORMATS = ['json', 'xml', 'mat', 'vtk', 'xlsx', 'csv', 'npz', 'h5', 'jsonl', 'daeres', 'kpi']
+
+
+def get_case_names(paths):
+    """
+    Unique names of the cases read from files
+    :param paths: paths of the json files
+    :return: list of names, the paths relative to their common directory without extension and with the separators
+    replaced by _, with a numeric suffix if still repeated
+    """
+
+    if not paths:
+        return []
+
+    paths = [os.path.abspath(path) for path in paths]
+    base = os.path.commonpath([os.path.dirname(path) for path in paths])
+
+    names = []
+    for path in paths:
+        name = os.path.splitext(os.path.relpath(path, base))[0].replace(os.sep, '_')
+        unique = name
+        i = 1
+        while unique in names:
+            unique = '{0}_{1}'.format(name, i)
+            i += 1
+        names.append(unique)
+
+    return names
+
+
+def read_inputs(source):
+    """
+    Read the cases of the batch
+    :param source: directory, glob pattern or JSON Lines file
+    :return: list of tuples (case name, data dictionary)
+    """
+
+    if source.endswith('.jsonl'):
+        cases = []
+        prefix = os.path.splitext(os.path.basename(source))[0]
+        with open(source) as f:
+            for i, line in enumerate(f):
+                if line.strip():
+                    cases.append(('{0}_{1:04d}'.format(prefix, i), json.loads(line)))
+        return cases
+
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*.json')))
+    else:
+        paths = sorted(glob.glob(source, recursive=True))
+
+    cases = []
+    for name, path in zip(get_case_names(paths), paths):
+        with open(path) as f:
+            cases.append((name, json.load(f)))
+
+    return cases
+
+
+def run_batch_case(args):
+    """
+    Simulate one case of the batch writing its output file
+    :param args: tuple (case name, data dictionary, output path, format, options)
+    :return: dict with the summary of the case
+    """
+
+    # Imported by the worker, the inputs are read without daetools
+    from daetools_extended.runner import get_reporter, simulate_data
+
+    case_name, data, output, format, options = args
+
+    summary = {'case': case_name, 'name': data.get('name'), 'output': output, 'status': 'ok', 'error': '',
+               'elapsed': 0.0, 'equations': None}
+
+    start = time.perf_counter()
+
+    try:
+        dr = get_reporter(format, data=data)
+        dr.Connect(output, data['name'])
+        simulation, dr_local = simulate_data(data, datareporter=dr, local=False, **options)
+        summary['equations'] = simulation.NumberOfEquations
+    except Exception as e:
+        summary['status'] = 'failed'
+        summary['error'] = '{0}: {1}'.format(type(e).__name__, e)
+
+    summary['elapsed'] = time.perf_counter() - start
+
+    return summary
+
+
+def _configure_worker(relative_tolerance, MaxStep, MaxNumSteps):
+
+    from daetools_extended.runner import configure
+
+    configure(relative_tolerance, MaxStep, MaxNumSteps)
+
+
+def run_batch(cases, output_dir, format='json', jobs=None, reporting_interval=3600, time_horizon=20*24*3600,
+              relative_tolerance=1e-6, MaxStep=10., MaxNumSteps=1000000):
+    """
+    Simulate the cases concurrently
+    :param cases: list of tuples (case name, data dictionary)
+    :param output_dir: directory of the output files and of the summary
+    :param format: output format (see runner.get_reporter)
+    :param jobs: number of worker processes, the number of cpus if None
+    :return: list of dicts with the summary of each case
+    """
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    options = {
+        'reporting_interval': reporting_interval,
+        'time_horizon': time_horizon,
+        'relative_tolerance': relative_tolerance,
+    }
+
+    tasks = []
+    for case_name, data in cases:
+        output = os.path.join(output_dir, '{0}.output.{1}'.format(case_name, format))
+        tasks.append((case_name, data, output, format, options))
+
+    # spawn avoids forking a process that already holds the daetools/OpenMP state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_configure_worker,
+                             initargs=(relative_tolerance, MaxStep, MaxNumSteps)) as executor:
+        summary = list(executor.map(run_batch_case, tasks))
+
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    return summary
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='simulate.py batch', description='Simulate many networks concurrently.')
+    parser.add_argument('inputs', help='Directory, glob pattern or JSON Lines file with the networks.')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('--format', default='json', choices=FORMATS, help='Format of the output files.')
+    parser.add_argument('--output_dir', default='batch_output', help='Directory of the output files and summary.')
+    parser.add_argument('--reporting_interval', type=int, default=3600, help='Reporting interval in seconds.')
+    parser.add_argument('--time_horizon', type=int, default=20*24*3600, help='Time horizon in seconds')
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+    parser.add_argument('--MaxStep', type=float, default=10., help='IDAS.MaxStep parameter.')
+    parser.add_argument('--MaxNumSteps', type=int, default=1000000, help='IDAS.MaxNumSteps parameter.')
+
+    args = parser.parse_args(argv)
+
+    cases = read_inputs(args.inputs)
+
+    summary = run_batch(cases, args.output_dir, format=args.format, jobs=args.jobs,
+                        reporting_interval=args.reporting_interval, time_horizon=args.time_horizon,
+                        relative_tolerance=args.relative_tolerance, MaxStep=args.MaxStep,
+                        MaxNumSteps=args.MaxNumSteps)
+
+    for case in summary:
+        print("{case}: {status} in {elapsed:.1f} s {error}".format(**case))
+
+    return summary
@@ -0,0 +1,276 @@
+__doc__="""
+Scaling benchmark of the network simulation. Synthetic networks (see examples.network_generator) are swept in the
+number of edges, in the number of points N of the x domain and in the number of tubes Ny of the tube arrangements,
+and each trial records:
+
+* equations: number of equations of the system
+* construction: wall time of the node tree, instantiation and Initialize (DeclareEquations included)
+* solve_initial: wall time of SolveInitial
+* run_per_hour: wall time of Run per simulated hour
+* peak_rss: peak resident memory in MB
+
+The empirical scaling exponent of each metric is the slope of its log-log fit along each sweep. The results can be
+stored as a baseline, and the following runs are compared to it so the changes of Pipe or daeModelExtended that
+affect the performance are caught. Each trial runs in its own process, so the peak memory is the one of the trial.
+
+python -m daetools_extended.benchmark --suite quick --baseline benchmark_baseline.json --update
+python -m daetools_extended.benchmark --suite quick --baseline benchmark_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+METRICS = ['equations', 'construction', 'solve_initial', 'run_per_hour', 'peak_rss']
+
+# Metrics that do not depend on the machine load, any increase is a regression
+EXACT_METRICS = ['equations']
+
+# Sweep name: base scenario of the network generator, swept parameter and its values
+SUITES = {
+    'quick': collections.OrderedDict([
+        ('edges', ({'topology': 'series', 'model': 'Pipe', 'N': 10}, 'n', [1, 2, 4])),
+        ('N', ({'topology': 'series', 'n': 2, 'model': 'Pipe'}, 'N', [10, 20, 40])),
+        ('Ny', ({'topology': 'series', 'n': 1, 'model': 'ExternalFilmCondensationTubeArrange', 'N': 10}, 'Ny',
+                [2, 4, 8])),
+    ]),
+    'full': collections.OrderedDict([
+        ('edges', ({'topology': 'series', 'model': 'Pipe', 'N': 20}, 'n', [2, 4, 8, 16, 32])),
+        ('N', ({'topology': 'series', 'n': 4, 'model': 'Pipe'}, 'N', [10, 20, 40, 80, 160])),
+        ('Ny', ({'topology': 'series', 'n': 2, 'model': 'ExternalFilmCondensationTubeArrange', 'N': 20}, 'Ny',
+                [2, 4, 8, 16, 32])),
+    ]),
+}
+
+
+def get_trials(suite):
+    """
+    Trials of a suite
+    :param suite: name of the suite (see SUITES) or dict with the same layout
+    :return: list of dicts with the sweep name, the swept value and the scenario of the network generator
+    """
+
+    sweeps = SUITES[suite] if isinstance(suite, str) else suite
+
+    trials = []
+    for sweep, (base, parameter, values) in sweeps.items():
+        for value in values:
+            scenario = dict(base)
+            scenario[parameter] = value
+            trials.append({'sweep': sweep, 'value': value, 'scenario': scenario})
+
+    return trials
+
+
+def run_trial(scenario, time_horizon=3600, reporting_interval=3600, relative_tolerance=1e-6):
+    """
+    Build and run a synthetic network, measuring its phases
+    :param scenario: keyword arguments of network_generator.generate_network
+    :param time_horizon: time horizon in seconds
+    :param reporting_interval: reporting interval in seconds
+    :param relative_tolerance: relative tolerance of the integration method
+    :return: dict with the status, the error message and the metrics
+    """
+
+    # Imported by the worker, the comparison of stored results does not need daetools
+    from examples.network_generator import generate_network
+    from daetools_extended.runner import simulate_data
+    from daetools_extended.timing import PhaseTimer, get_peak_rss
+
+    result = {'status': 'ok', 'error': ''}
+    result.update({metric: None for metric in METRICS})
+
+    timer = PhaseTimer()
+
+    try:
+        data = generate_network(**scenario)
+        simulation, dr = simulate_data(data, reporting_interval=reporting_interval, time_horizon=time_horizon,
+                                       relative_tolerance=relative_tolerance, local=False, timer=timer)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+        return result
+
+    wall = {name: record['wall'] for name, record in timer.phases.items()}
+    peak_rss = get_peak_rss()
+
+    result['equations'] = simulation.NumberOfEquations
+    result['construction'] = sum(wall.get(name, 0.0) for name in ('node_tree', 'instantiation', 'Initialize'))
+    result['solve_initial'] = wall.get('SolveInitial', 0.0)
+    result['run_per_hour'] = wall.get('Run', 0.0) / (time_horizon / 3600.)
+    result['peak_rss'] = peak_rss / 1024 ** 2 if peak_rss is not None else None
+
+    return result
+
+
+def run_benchmark(suite='quick', repeat=1, time_horizon=3600, reporting_interval=3600, relative_tolerance=1e-6,
+                  MaxStep=10., MaxNumSteps=1000000):
+    """
+    Run the trials of a suite, each one in a new process
+    :param suite: name of the suite (see SUITES) or dict with the same layout
+    :param repeat: number of runs of each trial, the minimum of each metric is kept
+    :return: dict with the records of the trials and the scaling exponents
+    """
+
+    from daetools_extended.runner import configure
+
+    records = []
+    context = multiprocessing.get_context('spawn')
+
+    for trial in get_trials(suite):
+
+        results = []
+        for i in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=configure,
+                                     initargs=(relative_tolerance, MaxStep, MaxNumSteps)) as executor:
+                results.append(executor.submit(run_trial, trial['scenario'], time_horizon, reporting_interval,
+                                               relative_tolerance).result())
+
+        record = dict(trial)
+        ok = [result for result in results if result['status'] == 'ok']
+        record['status'] = 'ok' if ok else 'failed'
+        record['error'] = '' if ok else results[-1]['error']
+        for metric in METRICS:
+            values = [result[metric] for result in ok if result[metric] is not None]
+            record[metric] = min(values) if values else None
+
+        print('{0:<6} {1:>6} {2}'.format(record['sweep'], record['value'], format_record(record)))
+        records.append(record)
+
+    return {'records': records, 'exponents': fit_exponents(records)}
+
+
+def format_record(record):
+
+    if record['status'] != 'ok':
+        return 'failed: {0}'.format(record['error'])
+
+    return ('equations {equations}, construction {construction:.3f} s, solve initial {solve_initial:.3f} s, '
+            'run {run_per_hour:.3f} s/h, peak RSS {peak_rss:.1f} MB'.format(**record))
+
+
+def fit_exponents(records):
+    """
+    Empirical scaling exponents, slope of the log-log fit of each metric along each sweep
+    :param records: list of records of the trials
+    :return: dict with the sweep name and the dict with the metric and its exponent (None if it cannot be fitted)
+    """
+
+    exponents = collections.OrderedDict()
+
+    for record in records:
+        exponents.setdefault(record['sweep'], collections.OrderedDict())
+
+    for sweep, fitted in exponents.items():
+        for metric in METRICS:
+            points = [(record['value'], record[metric]) for record in records
+                      if record['sweep'] == sweep and record['status'] == 'ok' and record[metric]]
+            x = np.log([point[0] for point in points])
+            y = np.log([point[1] for point in points])
+            if len(set(x)) < 2:
+                fitted[metric] = None
+            else:
+                fitted[metric] = float(np.polyfit(x, y, 1)[0])
+
+    return exponents
+
+
+def compare_baseline(current, baseline, tolerance=0.25, exponent_tolerance=0.2):
+    """
+    Regressions of a benchmark with respect to a baseline
+    :param current: dict returned by run_benchmark
+    :param baseline: dict returned by run_benchmark of the reference code
+    :param tolerance: relative increase of a metric (but the exact ones) accepted
+    :param exponent_tolerance: absolute increase of a scaling exponent accepted
+    :return: list of dicts with the sweep, value (None for the exponents), metric, baseline and current values
+    """
+
+    regressions = []
+
+    reference = {(record['sweep'], record['value']): record for record in baseline['records']}
+
+    for record in current['records']:
+
+        base = reference.get((record['sweep'], record['value']))
+        if base is None or base['status'] != 'ok':
+            continue
+
+        if record['status'] != 'ok':
+            regressions.append({'sweep': record['sweep'], 'value': record['value'], 'metric': 'status',
+                                'baseline': base['status'], 'current': record['status']})
+            continue
+
+        for metric in METRICS:
+            if base[metric] is None or record[metric] is None:
+                continue
+            limit = base[metric] if metric in EXACT_METRICS else base[metric] * (1 + tolerance)
+            if record[metric] > limit:
+                regressions.append({'sweep': record['sweep'], 'value': record['value'], 'metric': metric,
+                                    'baseline': base[metric], 'current': record[metric]})
+
+    for sweep, fitted in current['exponents'].items():
+        for metric, exponent in fitted.items():
+            base = baseline['exponents'].get(sweep, {}).get(metric)
+            if base is not None and exponent is not None and exponent > base + exponent_tolerance:
+                regressions.append({'sweep': sweep, 'value': None, 'metric': '{0} exponent'.format(metric),
+                                    'baseline': base, 'current': exponent})
+
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Run the scaling benchmark of the network simulation.')
+    parser.add_argument('--suite', default='quick', choices=sorted(SUITES), help='Suite of trials.')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of runs of each trial, the minimum is kept.')
+    parser.add_argument('--baseline', help='Path of the json baseline to compare with.')
+    parser.add_argument('--update', action='store_true', help='Store the results as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Relative increase of the metrics accepted.')
+    parser.add_argument('--exponent_tolerance', type=float, default=0.2, help='Increase of the scaling exponents '
+                                                                              'accepted.')
+    parser.add_argument('--output', help='Path of the json results.')
+    parser.add_argument('--time_horizon', type=int, default=3600, help='Time horizon in seconds')
+    parser.add_argument('--reporting_interval', type=int, default=3600, help='Reporting interval in seconds.')
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+
+    args = parser.parse_args()
+
+    current = run_benchmark(args.suite, repeat=args.repeat, time_horizon=args.time_horizon,
+                            reporting_interval=args.reporting_interval, relative_tolerance=args.relative_tolerance)
+
+    print('{0:<6} {1}'.format('sweep', '  '.join('{0:>13}'.format(metric) for metric in METRICS)))
+    for sweep, fitted in current['exponents'].items():
+        print('{0:<6} {1}'.format(sweep, '  '.join('{0:>13}'.format('-' if fitted[metric] is None else
+                                                                     '{0:.2f}'.format(fitted[metric]))
+                                                   for metric in METRICS)))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+
+    if args.baseline and args.update:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print("Baseline stored in {0}".format(args.baseline))
+
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare_baseline(current, baseline, tolerance=args.tolerance,
+                                       exponent_tolerance=args.exponent_tolerance)
+
+        for regression in regressions:
+            print("Regression of {metric} in the {sweep} sweep ({value}): {baseline} -> {current}".format(
+                **regression))
+
+        if regressions:
+            sys.exit(1)
+        print("No regressions with respect to {0}".format(args.baseline))
@@ -0,0 +1,314 @@
+__doc__="""
+Content-addressed cache of simulation results, so identical inputs are not simulated again. The key is the hash of:
+
+* the canonical JSON of the data dictionary of the network
+* the source of the model classes of the network (and of their base classes), of every module of this package (the
+  simulation, the data reporters, the steady-state detection, ...) and of the water properties
+* the solver and run options (tolerances, reporting interval, time horizon, outputs, format, ...)
+
+Each entry is a directory with the stored JSON value (i.e. the outputs of runner.run_case) and/or result files. The
+cache is local (DAETOOLS_CACHE or ~/.cache/daetools_extended by default), limited in size and the least recently used
+entries are evicted first.
+"""
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+# Modules whose source changes the results of every network, besides the modules of this package
+DEPENDENCIES = ['water_properties']
+
+# Directory of this package, every module is hashed from its file (some of them require daetools to be imported)
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_default_directory():
+
+    return os.environ.get('DAETOOLS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'daetools_extended'))
+
+
+def get_model_classes(data):
+    """
+    Classes of the submodels of the data dictionary, recursively
+    :param data: data dictionary of the network
+    :return: list of classes
+    """
+
+    classes = []
+
+    for submodel in data.get('submodels', {}).values():
+        if 'module' in submodel and 'class' in submodel:
+            classes.append(getattr(importlib.import_module(submodel['module']), submodel['class']))
+        classes += get_model_classes(submodel)
+
+    return classes
+
+
+def get_source_hashes(data):
+    """
+    Hashes of the source files of the modules of this package, of the models of the network and of the common
+    dependencies
+    :param data: data dictionary of the network
+    :return: dict with the module name and the sha256 of its source file
+    """
+
+    modules = set(DEPENDENCIES)
+    for cls in get_model_classes(data):
+        for base in inspect.getmro(cls):
+            # Only the python sources, daetools itself is identified by its version
+            if base.__module__.split('.')[0] != 'daetools' and base.__module__ != 'builtins':
+                modules.add(base.__module__)
+
+    hashes = {}
+    for filename in sorted(os.listdir(PACKAGE)):
+        if filename.endswith('.py'):
+            with open(os.path.join(PACKAGE, filename), 'rb') as f:
+                hashes['daetools_extended.' + filename[:-3]] = hashlib.sha256(f.read()).hexdigest()
+
+    for name in sorted(modules):
+        if name in hashes:
+            continue
+        module = sys.modules.get(name) or importlib.import_module(name)
+        path = getattr(module, '__file__', None)
+        if path and path.endswith('.py'):
+            with open(path, 'rb') as f:
+                hashes[name] = hashlib.sha256(f.read()).hexdigest()
+
+    return hashes
+
+
+def get_key(data, options):
+    """
+    Key of the cache entry of a simulation
+    :param data: data dictionary of the network
+    :param options: dict with the solver and run options that change the results
+    :return: hexadecimal sha256
+    """
+
+    try:
+        import daetools
+        version = getattr(daetools, '__version__', '')
+    except ImportError:
+        version = ''
+
+    content = {
+        'data': data,
+        'sources': get_source_hashes(data),
+        'options': options,
+        'daetools': version,
+    }
+
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), default=repr)
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# Items of the data dictionary that define the structure of the system of equations (but not its values)
+STRUCTURE = ('kind', 'module', 'class', 'from', 'to', 'domains', 'eliminate_aliases')
+
+
+def get_structure(data):
+    """
+    Structure of a network: its submodels, their classes, connections and domains, recursively
+    :param data: data dictionary of the network
+    :return: dict
+    """
+
+    structure = {key: data[key] for key in STRUCTURE if key in data}
+
+    if isinstance(data.get('submodels'), dict):
+        structure['submodels'] = {name: get_structure(submodel) for name, submodel in data['submodels'].items()}
+
+    return structure
+
+
+def get_signature(data):
+    """
+    Signature of the structure of a network, the same for networks that differ only in parameters, specifications
+    and initial guesses
+    :param data: data dictionary of the network
+    :return: hexadecimal sha256
+    """
+
+    canonical = json.dumps(get_structure(data), sort_keys=True, separators=(',', ':'), default=repr)
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def get_size(path):
+
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for filename in files:
+            size += os.path.getsize(os.path.join(root, filename))
+    return size
+
+
+class ResultCache(object):
+
+    def __init__(self, directory=None, max_size=2 * 1024 ** 3):
+        """
+        Local result cache
+        :param directory: directory of the entries, see get_default_directory
+        :param max_size: maximum size in bytes, the least recently used entries are evicted above it
+        """
+
+        self.directory = directory or get_default_directory()
+        self.max_size = max_size
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+
+    def get_path(self, key):
+
+        return os.path.join(self.directory, key[:2], key)
+
+
+    def get(self, key):
+        """
+        Get an entry, marking it as recently used
+        :param key: key of the entry, see get_key
+        :return: path of the entry directory or None if missing
+        """
+
+        path = self.get_path(key)
+        if not os.path.isfile(os.path.join(path, 'entry.json')):
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))
+        return path
+
+
+    def get_value(self, key):
+        """
+        Get the JSON value of an entry
+        :param key: key of the entry
+        :return: stored value or None if missing
+        """
+
+        path = self.get(key)
+        if path is None:
+            return None
+
+        with open(os.path.join(path, 'entry.json')) as f:
+            return json.load(f).get('value')
+
+
+    def get_files(self, key, outputs):
+        """
+        Copy the files of an entry
+        :param key: key of the entry
+        :param outputs: list of the destination paths, in the same order they were stored
+        :return: True if the entry exists
+        """
+
+        path = self.get(key)
+        if path is None:
+            return False
+
+        with open(os.path.join(path, 'entry.json')) as f:
+            files = json.load(f).get('files', [])
+
+        for filename, output in zip(files, outputs):
+            source = os.path.join(path, filename)
+            if os.path.isdir(output):
+                shutil.rmtree(output)
+            if os.path.isdir(source):
+                shutil.copytree(source, output)
+            elif os.path.isfile(source):
+                shutil.copy2(source, output)
+
+        return True
+
+
+    def put(self, key, value=None, files=()):
+        """
+        Store an entry, evicting the least recently used ones above the maximum size
+        :param key: key of the entry
+        :param value: JSON value
+        :param files: paths of the result files or directories, the missing ones are skipped
+        :return: path of the entry
+        """
+
+        path = self.get_path(key)
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+
+        # The entry is assembled aside and renamed into place, so concurrent readers never see it incomplete
+        tmp = tempfile.mkdtemp(prefix='.' + key, dir=parent)
+
+        stored = []
+        for i, source in enumerate(files):
+            filename = 'file_{0:02d}'.format(i)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(tmp, filename))
+            elif os.path.isfile(source):
+                shutil.copy2(source, os.path.join(tmp, filename))
+            stored.append(filename)
+
+        with open(os.path.join(tmp, 'entry.json'), 'w') as f:
+            json.dump({'key': key, 'created': time.time(), 'value': value, 'files': stored}, f)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Stored meanwhile by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict()
+
+        return path
+
+
+    def entries(self):
+        """
+        Entries of the cache
+        :return: list of tuples (last used time, size, path)
+        """
+
+        entries = []
+        for prefix in os.listdir(self.directory):
+            folder = os.path.join(self.directory, prefix)
+            if not os.path.isdir(folder):
+                continue
+            for key in os.listdir(folder):
+                path = os.path.join(folder, key)
+                if not key.startswith('.') and os.path.isdir(path):
+                    entries.append((os.path.getmtime(path), get_size(path), path))
+
+        return entries
+
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in the maximum size
+        :return: number of removed entries
+        """
+
+        entries = sorted(self.entries())
+        size = sum(entry[1] for entry in entries)
+
+        removed = 0
+        for used, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            size -= entry_size
+            removed += 1
+
+        return removed
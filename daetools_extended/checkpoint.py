@@ -0,0 +1,242 @@
+__doc__="""
+Checkpoints of long simulations. A checkpoint directory contains:
+
+* layout.json : name, number of points and shape of each variable, in the order they are stored
+* states.bin : float64 records appended at each checkpoint as [time, values..., time derivatives...]
+* active_states.jsonl : one line per checkpoint with the active state of each state transition network
+
+The time of the records is the absolute time, the time offset of resumed runs included. A resumed run starts from
+the latest checkpoint: the differential variables get it as initial conditions and the algebraic variables as
+initial guesses, and the time of the resumed run is counted from the checkpoint time.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from daetools.pyDAE import *
+from daetools_extended.tools import get_variables
+
+
+LAYOUT_FILE = 'layout.json'
+STATES_FILE = 'states.bin'
+ACTIVE_STATES_FILE = 'active_states.jsonl'
+
+
+def get_stns(model, prefix=''):
+    """
+    Recursively collects the state transition networks of a model and its submodels
+    :param model: model
+    :param prefix: prefix of the relative name, used by the recursion
+    :return: list of tuples (relative name, stn)
+    """
+
+    stns = [(prefix + stn.Name, stn) for stn in model.STNs]
+
+    if hasattr(model, 'submodels'):
+        for submodel_name, submodel in model.submodels.items():
+            stns += get_stns(submodel, prefix="{0}{1}.".format(prefix, submodel_name))
+
+    return stns
+
+
+class CheckpointWriter(object):
+
+    def __init__(self, model, path, interval=24*3600., time_offset=0.0):
+        """
+        Periodic writer of checkpoints
+        :param model: root model of the simulation
+        :param path: checkpoint directory
+        :param interval: minimum time in seconds between two checkpoints
+        :param time_offset: time of the start of the run (not zero for resumed runs)
+        """
+
+        self.path = path
+        self.interval = interval
+        self.time_offset = time_offset
+        self.last_time = None
+
+        self.variables = get_variables(model)
+        self.stns = get_stns(model)
+
+        layout = {
+            'variables': [{'name': name, 'size': int(np.size(variable.npyValues)),
+                           'shape': list(np.shape(variable.npyValues))} for name, variable in self.variables],
+        }
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        # Records are only appended to a checkpoint with the same layout
+        layout_file = os.path.join(path, LAYOUT_FILE)
+        if read_layout(path) != layout:
+            with open(layout_file, 'w') as f:
+                json.dump(layout, f)
+            for filename in (STATES_FILE, ACTIVE_STATES_FILE):
+                open(os.path.join(path, filename), 'w').close()
+        else:
+            truncate(path, layout)
+
+
+    def update(self, time):
+        """
+        Write a checkpoint if the interval has elapsed since the last one
+        :param time: current time of the run
+        :return: True if a checkpoint was written
+        """
+
+        if self.last_time is not None and time - self.last_time < self.interval:
+            return False
+
+        self.write(time)
+        return True
+
+
+    def write(self, time):
+
+        values = [np.ravel(variable.npyValues) for name, variable in self.variables]
+        derivatives = [np.ravel(getattr(variable, 'npyTimeDerivatives', np.zeros_like(variable.npyValues)))
+                       for name, variable in self.variables]
+
+        record = np.concatenate([[time + self.time_offset]] + values + derivatives).astype(np.float64)
+
+        with open(os.path.join(self.path, STATES_FILE), 'ab') as f:
+            record.tofile(f)
+
+        active_states = {name: stn.ActiveState for name, stn in self.stns}
+        with open(os.path.join(self.path, ACTIVE_STATES_FILE), 'a') as f:
+            f.write(json.dumps({'time': time + self.time_offset, 'states': active_states}) + '\n')
+
+        self.last_time = time
+
+
+def read_layout(path):
+
+    layout_file = os.path.join(path, LAYOUT_FILE)
+
+    if not os.path.exists(layout_file):
+        return None
+
+    with open(layout_file) as f:
+        return json.load(f)
+
+
+def get_record_length(layout):
+
+    return 1 + 2 * sum(variable['size'] for variable in layout['variables'])
+
+
+def read_complete(path, layout):
+    """
+    Number of complete checkpoints, the ones whose record and active states line were both written
+    :param path: checkpoint directory
+    :param layout: layout of the checkpoint
+    :return: tuple with the number of checkpoints and the complete lines of the active states
+    """
+
+    states_file = os.path.join(path, STATES_FILE)
+    n_records = os.path.getsize(states_file) // (8 * get_record_length(layout)) if os.path.exists(states_file) else 0
+
+    lines = []
+    active_states_file = os.path.join(path, ACTIVE_STATES_FILE)
+    if os.path.exists(active_states_file):
+        with open(active_states_file) as f:
+            lines = [line for line in f if line.endswith('\n')]
+
+    k = min(n_records, len(lines))
+
+    return k, lines[:k]
+
+
+def truncate(path, layout):
+    """
+    Drop the partial record or the unpaired part of the last checkpoint left by an interrupted run, so the new
+    records are appended after the last complete checkpoint
+    :param path: checkpoint directory
+    :param layout: layout of the checkpoint
+    :return: number of complete checkpoints kept
+    """
+
+    k, lines = read_complete(path, layout)
+
+    with open(os.path.join(path, STATES_FILE), 'ab') as f:
+        f.truncate(8 * get_record_length(layout) * k)
+
+    with open(os.path.join(path, ACTIVE_STATES_FILE), 'w') as f:
+        f.writelines(lines)
+
+    return k
+
+
+def read_checkpoint(path):
+    """
+    Read the latest complete checkpoint
+    :param path: checkpoint directory
+    :return: dict with time, values, derivatives (dicts of flat arrays by relative variable name) and active_states
+    """
+
+    layout = read_layout(path)
+    if not layout:
+        raise IOError("No checkpoint found in {0}".format(path))
+
+    sizes = [variable['size'] for variable in layout['variables']]
+    n = sum(sizes)
+    record_length = get_record_length(layout)
+
+    states_file = os.path.join(path, STATES_FILE)
+
+    # A record is complete only when both of its parts were written
+    n_complete, lines = read_complete(path, layout)
+    k = n_complete - 1
+    if k < 0:
+        raise IOError("No complete checkpoint found in {0}".format(path))
+
+    record = np.array(np.memmap(states_file, dtype=np.float64, mode='r', offset=8 * record_length * k,
+                                shape=(record_length,)))
+
+    offsets = np.cumsum([0] + sizes)
+    values = {}
+    derivatives = {}
+    for variable, start, end in zip(layout['variables'], offsets[:-1], offsets[1:]):
+        values[variable['name']] = record[1 + start:1 + end]
+        derivatives[variable['name']] = record[1 + n + start:1 + n + end]
+
+    return {
+        'time': float(record[0]),
+        'values': values,
+        'derivatives': derivatives,
+        'active_states': json.loads(lines[k])['states'],
+    }
+
+
+def restore_state(model, state):
+    """
+    Set the checkpoint state as initial conditions (differential variables) and initial guesses (algebraic
+    variables). It must be called in SetUpVariables with InitialConditionMode = eAlgebraicValuesProvided.
+    :param model: root model of the simulation
+    :param state: checkpoint returned by read_checkpoint
+    :return:
+    """
+
+    for name, stn in get_stns(model):
+        if name in state['active_states']:
+            stn.ActiveState = state['active_states'][name]
+
+    for name, variable in get_variables(model):
+
+        if name not in state['values']:
+            continue
+
+        values = state['values'][name]
+        ids = np.ravel(variable.npyIDs)
+        shape = np.shape(variable.npyValues)
+
+        for i, (value, variable_type) in enumerate(zip(values, ids)):
+
+            index = np.unravel_index(i, shape) if shape else ()
+
+            if variable_type == cnDifferential:
+                variable.SetInitialCondition(*(tuple(int(j) for j in index) + (float(value),)))
+            elif variable_type == cnAlgebraic:
+                variable.SetInitialGuess(*(tuple(int(j) for j in index) + (float(value),)))
@@ -0,0 +1,200 @@
+__doc__="""
+Regression comparison between two simulation runs (i.e. two code versions or two scenarios). The results are aligned
+by the variable name relative to the root model and by time, and the maximum and RMS differences of each variable are
+accumulated block by block, so very large results are compared in constant memory. Only the times reported by both
+runs (within time_tolerance) are compared. The drift report is ranked by the maximum difference relative to the
+scale of the variable.
+
+python -m daetools_extended.compare reference.output.daeres new.output.daeres --variables "*.T" "*.P" --top 20
+"""
+
+import argparse
+import collections
+import fnmatch
+import json
+
+import numpy as np
+
+from daetools_extended.readers import iter_results
+
+
+def get_names(index, patterns=None):
+    """
+    Names of the variables of the index relative to the root model
+    :param index: index of the reported variables
+    :param patterns: fnmatch patterns of the relative names, all of them if None
+    :return: dict with the relative name and the variable of the index
+    """
+
+    names = collections.OrderedDict()
+    for variable in index['variables']:
+        name = variable['name'].split('.', 1)[-1]
+        if patterns is None or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            names[name] = variable
+
+    return names
+
+
+def align_blocks(blocks_a, blocks_b, names_a, names_b, time_tolerance=1e-6):
+    """
+    Align the blocks of two runs by time, keeping in memory only the rows not yet aligned
+    :param blocks_a: generator of blocks (times, values) of the first run, see readers.iter_results
+    :param blocks_b: generator of blocks of the second run
+    :param names_a: dict with the relative name and the name of the variables of the first run
+    :param names_b: dict with the relative name and the name of the variables of the second run
+    :param time_tolerance: maximum difference of the times of the aligned rows
+    :return: generator of tuples with the aligned times and the dicts (relative name: array) of both runs
+    """
+
+    buffers = [None, None]
+    iterators = [iter(blocks_a), iter(blocks_b)]
+    names = [names_a, names_b]
+    exhausted = [False, False]
+
+    def pull(i):
+        try:
+            times, values = next(iterators[i])
+        except StopIteration:
+            exhausted[i] = True
+            return
+        values = {name: values[full_name] for name, full_name in names[i].items()}
+        if buffers[i] is None:
+            buffers[i] = (times, values)
+        else:
+            buffers[i] = (np.concatenate([buffers[i][0], times]),
+                          {name: np.concatenate([buffers[i][1][name], values[name]]) for name in values})
+
+    def split(i, upto):
+        times, values = buffers[i]
+        n = int(np.searchsorted(times, upto, side='right'))
+        buffers[i] = (times[n:], {name: value[n:] for name, value in values.items()})
+        return times[:n], {name: value[:n] for name, value in values.items()}
+
+    while True:
+
+        for i in range(2):
+            while not exhausted[i] and (buffers[i] is None or not len(buffers[i][0])):
+                pull(i)
+
+        if any(buffer is None or not len(buffer[0]) for buffer in buffers):
+            return
+
+        # Both runs are complete up to the smallest of their last buffered times
+        upto = min(buffers[0][0][-1], buffers[1][0][-1]) + time_tolerance
+        if all(exhausted):
+            upto = np.inf
+
+        times_a, values_a = split(0, upto)
+        times_b, values_b = split(1, upto)
+
+        if len(times_a) and len(times_b):
+            # Nearest time of b for each time of a
+            k = np.searchsorted(times_b, times_a)
+            lower = np.clip(k - 1, 0, len(times_b) - 1)
+            upper = np.clip(k, 0, len(times_b) - 1)
+            k = np.where(np.abs(times_b[lower] - times_a) <= np.abs(times_b[upper] - times_a), lower, upper)
+            matched = np.abs(times_b[k] - times_a) <= time_tolerance
+
+            if np.any(matched):
+                yield times_a[matched], \
+                      {name: value[matched] for name, value in values_a.items()}, \
+                      {name: value[k[matched]] for name, value in values_b.items()}
+
+        for i in range(2):
+            if not exhausted[i] and not len(buffers[i][0]):
+                pull(i)
+
+
+def compare_results(path_a, path_b, variables=None, time_tolerance=1e-6):
+    """
+    Compare the results of two runs
+    :param path_a: results of the reference run (see readers.iter_results)
+    :param path_b: results of the compared run
+    :param variables: fnmatch patterns of the variables relative to the root model, all of them if None
+    :param time_tolerance: maximum difference of the times of the aligned rows
+    :return: list of dicts with the differences of each variable, ranked by the relative maximum difference
+    """
+
+    index_a, blocks_a = iter_results(path_a)
+    index_b, blocks_b = iter_results(path_b)
+
+    variables_a = get_names(index_a, variables)
+    variables_b = get_names(index_b, variables)
+
+    report = []
+    common = collections.OrderedDict()
+
+    for name, variable in variables_a.items():
+        if name not in variables_b:
+            report.append({'variable': name, 'status': 'only in a'})
+        elif list(variable['shape']) != list(variables_b[name]['shape']):
+            report.append({'variable': name, 'status': 'shape'})
+        else:
+            common[name] = {'variable': name, 'status': 'ok', 'max': 0.0, 'rms': 0.0, 'relative': 0.0,
+                            'time_of_max': None, 'scale': 0.0, 'sum_squares': 0.0, 'count': 0}
+    for name in variables_b:
+        if name not in variables_a:
+            report.append({'variable': name, 'status': 'only in b'})
+
+    names_a = {name: variables_a[name]['name'] for name in common}
+    names_b = {name: variables_b[name]['name'] for name in common}
+
+    rows = 0
+    for times, values_a, values_b in align_blocks(blocks_a, blocks_b, names_a, names_b, time_tolerance):
+
+        rows += len(times)
+
+        for name, stats in common.items():
+            a = values_a[name].reshape((len(times), -1))
+            b = values_b[name].reshape((len(times), -1))
+            diff = np.abs(a - b)
+
+            by_time = np.max(np.where(np.isfinite(diff), diff, 0.0), axis=1)
+            i = int(np.argmax(by_time))
+            if by_time[i] > stats['max']:
+                stats['max'] = float(by_time[i])
+                stats['time_of_max'] = float(times[i])
+
+            stats['scale'] = max(stats['scale'], float(np.nanmax(np.abs(a), initial=0.0)))
+            stats['sum_squares'] += float(np.nansum(diff ** 2))
+            stats['count'] += int(np.sum(np.isfinite(diff)))
+
+    for stats in common.values():
+        if stats['count']:
+            stats['rms'] = (stats.pop('sum_squares') / stats.pop('count')) ** 0.5
+        else:
+            stats['status'] = 'no common times'
+            stats.pop('sum_squares')
+            stats.pop('count')
+        stats['relative'] = stats['max'] / stats['scale'] if stats['scale'] > 0 else stats['max']
+        stats['rows'] = rows
+
+    ranked = sorted(common.values(), key=lambda stats: stats['relative'], reverse=True)
+
+    return ranked + report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Compare the results of two simulations.')
+    parser.add_argument('a', help='Results of the reference run (.jsonl, .daeres, npz directory or .h5).')
+    parser.add_argument('b', help='Results of the compared run.')
+    parser.add_argument('--variables', nargs='+', help='Patterns of the variables relative to the root model.')
+    parser.add_argument('--time_tolerance', type=float, default=1e-6, help='Tolerance of the aligned times.')
+    parser.add_argument('--top', type=int, default=20, help='Number of variables printed.')
+    parser.add_argument('--output', help='Path to the json drift report.')
+
+    args = parser.parse_args()
+
+    report = compare_results(args.a, args.b, variables=args.variables, time_tolerance=args.time_tolerance)
+
+    print('{0:<50} {1:>14} {2:>14} {3:>14}'.format('variable', 'max', 'rms', 'relative'))
+    for stats in report[:args.top]:
+        if stats['status'] == 'ok':
+            print('{variable:<50} {max:14.6g} {rms:14.6g} {relative:14.6g}'.format(**stats))
+        else:
+            print('{variable:<50} {status:>14}'.format(**stats))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
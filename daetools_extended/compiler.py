@@ -0,0 +1,204 @@
+__doc__="""
+Export of a built network to standalone code with the DaeTools code generators:
+
+* cxx: C++ sources of the runtime model and of its simulation, built with make when available, so the production runs
+  execute the compiled model without constructing the Python models
+* fmi: FMU for co-simulation (the FMU builds the network from the data stored in its resources, so daetools and this
+  repository must be importable where it runs)
+
+The artifacts are stored in a ResultCache (see cache.py) under <cache>/compiled. The generated code embeds the values
+of the parameters and of the initial conditions, so the key is the structure of the network together with its values,
+the model sources and the target, and the structure signature is recorded in the entry to find the artifacts of the
+same structure.
+
+python simulate.py compile network.json --target cxx --output network_cxx --run
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from copy import deepcopy
+
+from daetools_extended.cache import ResultCache, get_default_directory, get_key, get_signature
+
+
+TARGETS = ['cxx', 'fmi']
+
+
+def get_compile_cache(directory=None):
+
+    return ResultCache(directory or os.path.join(get_default_directory(), 'compiled'))
+
+
+def build_simulation(data):
+    """
+    Build and initialize the simulation of a network, as required by the code generators
+    :param data: data dictionary of the network
+    :return: simulation
+    """
+
+    from daetools.pyDAE import daeIDAS, daeBaseLog, daeNoOpDataReporter
+    from daetools_extended.daesimulation_extended import daeSimulationExtended
+    from daetools_extended.tools import get_node_tree
+
+    data = deepcopy(data)
+    name = data['name']
+
+    simulation = daeSimulationExtended(name, data=data, node_tree=get_node_tree(name, data, {}),
+                                       reporting_interval=data.get('reporting_interval', 3600),
+                                       time_horizon=data.get('time_horizon', 20*24*3600))
+    simulation.Initialize(daeIDAS(), daeNoOpDataReporter(), daeBaseLog())
+
+    return simulation
+
+
+def create_simulation():
+    """
+    Callable of the FMU: the simulation of the network stored in its resources, next to this file
+    :return: simulation
+    """
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'network.json')) as f:
+        return build_simulation(json.load(f))
+
+
+def generate(simulation, data, target, directory):
+    """
+    Generate the code of a simulation
+    :param simulation: initialized simulation
+    :param data: data dictionary of the network
+    :param target: one of TARGETS
+    :param directory: directory of the generated code
+    :return:
+    """
+
+    if target == 'cxx':
+        from daetools.code_generators.cxx import daeCodeGenerator_cxx
+        daeCodeGenerator_cxx().generateSimulation(simulation, directory=directory)
+
+    elif target == 'fmi':
+        from daetools.code_generators.fmi import daeCodeGenerator_FMI
+        data_path = os.path.join(directory, 'network.json')
+        with open(data_path, 'w') as f:
+            json.dump(data, f)
+        daeCodeGenerator_FMI().generateSimulation(simulation, directory=directory,
+                                                  py_simulation_file=os.path.abspath(__file__),
+                                                  callable_object_name='create_simulation', arguments='',
+                                                  additional_files=[(data_path, 'network.json')])
+
+    else:
+        raise ValueError("Unknown target {0}, it must be one of {1}".format(target, TARGETS))
+
+
+def build(directory):
+    """
+    Build the generated C++ code with its makefile
+    :param directory: directory of the generated code
+    :return: True if it was built, False if there is no makefile or make
+    """
+
+    if not os.path.isfile(os.path.join(directory, 'Makefile')) or not shutil.which('make'):
+        print("The generated code was not built, there is no Makefile or make in {0}".format(directory))
+        return False
+
+    subprocess.run(['make'], cwd=directory, check=True)
+    return True
+
+
+def get_executable(directory):
+    """
+    Executable built in the directory of the generated code
+    :param directory: directory of the generated code
+    :return: path or None if missing
+    """
+
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path) and os.access(path, os.X_OK) and not os.path.splitext(filename)[1]:
+            return path
+
+    return None
+
+
+def compile_network(data, target='cxx', output=None, cache=None, make=True):
+    """
+    Export a network to compiled code, reusing the artifact of the cache if the same network was already compiled
+    :param data: data dictionary of the network
+    :param target: one of TARGETS
+    :param output: directory of the artifact, <name>_<target> if None
+    :param cache: ResultCache of the artifacts (see get_compile_cache), no cache if None
+    :param make: build the generated C++ code
+    :return: tuple with the directory of the artifact and True if it was restored from the cache
+    """
+
+    output = output or '{0}_{1}'.format(data['name'], target)
+
+    key = None
+    if cache is not None:
+        key = get_key(data, {'target': target, 'make': make})
+        if cache.get_files(key, [output]):
+            return output, True
+
+    # The artifact is generated aside, so a failed generation does not leave a partial output
+    directory = tempfile.mkdtemp(prefix='.{0}_'.format(target), dir=os.path.dirname(os.path.abspath(output)))
+
+    try:
+        simulation = build_simulation(data)
+        generate(simulation, data, target, directory)
+        if target == 'cxx' and make:
+            build(directory)
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    os.replace(directory, output)
+
+    if key:
+        cache.put(key, value={'name': data['name'], 'target': target, 'signature': get_signature(data)},
+                  files=[output])
+
+    return output, False
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='simulate.py compile', description='Export a network to compiled C++ code '
+                                                                             'or to an FMU.')
+    parser.add_argument('input', help='Path of the json file of the network.')
+    parser.add_argument('--target', default='cxx', choices=TARGETS, help='Code generator.')
+    parser.add_argument('--output', help='Directory of the artifact (default is <name>_<target>).')
+    parser.add_argument('--no_make', action='store_true', help='Only generate the C++ code, without building it.')
+    parser.add_argument('--no_cache', action='store_true', help='Do not use the cache of the artifacts.')
+    parser.add_argument('--cache', help='Directory of the cache of the artifacts (default is '
+                                        '{0}).'.format(os.path.join(get_default_directory(), 'compiled')))
+    parser.add_argument('--run', action='store_true', help='Execute the compiled model (cxx target).')
+
+    args = parser.parse_args(argv)
+
+    with open(args.input) as f:
+        data = json.load(f)
+
+    cache = None if args.no_cache else get_compile_cache(args.cache)
+
+    output, cached = compile_network(data, target=args.target, output=args.output, cache=cache,
+                                     make=not args.no_make)
+
+    print("{0} artifact {1} in {2}".format(args.target, 'restored from the cache' if cached else 'generated', output))
+
+    if args.run:
+        executable = get_executable(output)
+        if args.target != 'cxx' or executable is None:
+            print("There is no compiled executable in {0}".format(output))
+            sys.exit(1)
+        sys.exit(subprocess.run([executable], cwd=output).returncode)
+
+
+if __name__ == "__main__":
+
+    main()
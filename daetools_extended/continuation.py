@@ -0,0 +1,152 @@
+__doc__="""
+Continuation (homotopy) driver for networks that are hard to initialize. A chosen value of the data dictionary (i.e.
+the steam saturation temperature pipe_01.parameters.Tsat or the specified flowrate node_A.specifications.w) is ramped
+from an easy value to the target. At each step only the initial solution is calculated, and the converged state
+seeds the initial guesses of the next step, as done by hand with update_initialdata. The step size grows after a
+converged step and shrinks after a failed one.
+
+Usage from the command line (from the repository root):
+
+python -m daetools_extended.continuation examples.network_examples:case_external_film_condensation_pipe
+--path pipe_01.parameters.Tsat --start 310 --target 333.15 --output seeded.json
+"""
+
+import argparse
+import json
+import time
+from copy import deepcopy
+
+from daetools_extended.runner import configure, simulate_data
+from daetools_extended.sweep import read_base, get_data_value, set_data_value
+from daetools_extended.tools import get_initialdata_from_reporter, update_initialdata
+from daetools_extended.solver_stats import get_solver_stats
+
+
+def solve_initial(data, relative_tolerance=1e-6):
+    """
+    Calculate the initial solution of a network and seed its initial guesses with it
+    :param data: data dictionary
+    :param relative_tolerance: relative tolerance of the solver
+    :return: tuple with the seeded data dictionary and the simulation
+    """
+
+    simulation, dr = simulate_data(deepcopy(data), relative_tolerance=relative_tolerance, run=False)
+
+    previous_output = get_initialdata_from_reporter(dr)
+    new_data = update_initialdata(data['name'], previous_output, deepcopy(data))
+
+    return new_data, simulation
+
+
+def get_iterations(simulation):
+    """
+    Get the number of nonlinear iterations of the solver, if the DaeTools version exposes the integrator statistics
+    :param simulation: simulation
+    :return: number of iterations or None
+    """
+
+    return get_solver_stats(simulation)['nonlinear_iterations']
+
+
+def run_continuation(data, path, start, target, steps=5, growth=1.5, shrink=0.5, min_step=None, relative_tolerance=1e-6):
+    """
+    Ramp a value of the data dictionary from start to target, seeding each step with the previous converged state
+    :param data: data dictionary
+    :param path: dotted path of the ramped value (see sweep.set_data_value)
+    :param start: easy value
+    :param target: target value
+    :param steps: number of steps of the initial step size
+    :param growth: step size factor after a converged step
+    :param shrink: step size factor after a failed step
+    :param min_step: minimum absolute step size, 1e-3 of the initial step if None
+    :param relative_tolerance: relative tolerance of the solver
+    :return: tuple with the data dictionary at the target seeded with the converged state and the per-step report
+    """
+
+    step = (target - start) / float(steps)
+    if min_step is None:
+        min_step = 1e-3 * abs(step)
+
+    report = []
+
+    current = set_data_value(deepcopy(data), path, start)
+    value = None
+    trial = start
+
+    while True:
+
+        candidate = set_data_value(deepcopy(current), path, trial)
+
+        row = {'step': len(report), 'value': trial, 'step_size': trial - value if value is not None else 0.0,
+               'status': 'ok', 'error': '', 'elapsed': 0.0, 'iterations': None}
+
+        begin = time.perf_counter()
+
+        try:
+            current, simulation = solve_initial(candidate, relative_tolerance=relative_tolerance)
+            row['iterations'] = get_iterations(simulation)
+            value = trial
+            if value != start:
+                step *= growth
+        except Exception as e:
+            row['status'] = 'failed'
+            row['error'] = '{0}: {1}'.format(type(e).__name__, e)
+            if value is None:
+                report.append(row)
+                raise RuntimeError("Continuation failed at the start value {0}".format(start))
+            step *= shrink
+
+        row['elapsed'] = time.perf_counter() - begin
+        report.append(row)
+
+        print("Continuation step {step}: {path} = {value} {status} in {elapsed:.2f} s (iterations: {iterations})".format(
+            path=path, **row))
+
+        if value == target:
+            break
+
+        if abs(step) < min_step:
+            raise RuntimeError("Continuation step size below {0} at {1} = {2}".format(min_step, path, value))
+
+        # Do not overshoot the target
+        if abs(target - value) <= abs(step):
+            trial = target
+        else:
+            trial = value + step
+
+    return current, report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Ramp a value of a network from an easy value to the target, '
+                                                 'seeding each step with the previous converged state.')
+    parser.add_argument('base', help='Path of the json file of the network or module:function that returns it.')
+    parser.add_argument('--path', required=True, help='Dotted path of the ramped value (i.e. pipe_01.parameters.Tsat).')
+    parser.add_argument('--start', type=float, required=True, help='Easy value.')
+    parser.add_argument('--target', type=float, help='Target value, the value in the network data if omitted.')
+    parser.add_argument('--steps', type=int, default=5, help='Number of steps of the initial step size.')
+    parser.add_argument('--growth', type=float, default=1.5, help='Step size factor after a converged step.')
+    parser.add_argument('--shrink', type=float, default=0.5, help='Step size factor after a failed step.')
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+    parser.add_argument('--output', default='seeded.json', help='Path of the seeded network json file.')
+
+    args = parser.parse_args()
+
+    configure(relative_tolerance=args.relative_tolerance)
+
+    data = read_base(args.base)
+
+    target = args.target
+    if target is None:
+        target = get_data_value(data, args.path)
+
+    seeded, report = run_continuation(data, args.path, args.start, target, steps=args.steps, growth=args.growth,
+                                      shrink=args.shrink, relative_tolerance=args.relative_tolerance)
+
+    with open(args.output, 'w') as f:
+        json.dump(seeded, f, indent=2)
+
+    with open('{0}.continuation.json'.format(args.output), 'w') as f:
+        json.dump(report, f, indent=2)
@@ -14,7 +14,7 @@ from pyUnits import m, kg, s, K, Pa, J, W, rad
 import numpy as np
 import collections
 
-from .tools import get_module_class_from_data
+from .tools import get_module_class_from_data, get_variables, AliasVariable, is_alias
 
 
 class daeModelExtended(daeModel):
@@ -54,6 +54,13 @@ class daeModelExtended(daeModel):
         # Collect Parent
         self.Parent = Parent
 
+        # Time of the start of the run, not zero for runs resumed from a checkpoint
+        self.time_offset = data.get('time_offset', getattr(Parent, 'time_offset', 0.0))
+
+        # Replace the variables of the alias equations by their expressions (see is_alias), inherited by the submodels
+        self.eliminate_aliases = data.get('eliminate_aliases', getattr(Parent, 'eliminate_aliases', False))
+        self.aliases = collections.OrderedDict()
+
         # Read the submodels tree
         self.instantiate_submodels(node_tree)
 
@@ -153,6 +160,30 @@ class daeModelExtended(daeModel):
             return False
 
 
+    def is_alias(self, method_name):
+        """
+        Check if the equation declared by a method is eliminated as an alias
+        :param method_name: name of the method that declares the equation
+        :return: True if the model eliminates the aliases and the method is decorated with tools.alias_equation
+        """
+
+        return is_alias(self, method_name)
+
+
+    def define_alias(self, name, expression, domains=()):
+        """
+        Define an eliminated variable, to be used instead of daeVariable when its equation is an alias
+        :param name: name of the variable
+        :param expression: callable with the indexes of the variable returning the expression
+        :param domains: domains of the variable
+        :return: AliasVariable
+        """
+
+        alias = AliasVariable(name, expression, domains)
+        self.aliases[name] = alias
+        return alias
+
+
     def setup_domains(self):
         """
         Setup domains according to data dictionary structure
@@ -191,6 +222,8 @@ class daeModelExtended(daeModel):
         # Setting the specifications
         if 'specifications' in self.data:
             for name, value in self.data['specifications'].items():
+                if name in self.aliases:
+                    continue
                 n = getattr(self, name).NumberOfPoints
                 if n == 1:
                     getattr(self, name).AssignValue(value)
@@ -231,6 +264,33 @@ class daeModelExtended(daeModel):
                     getattr(self, name).SetValues(values)
 
 
+    def setup_reporting(self):
+        """
+        Setup the reported variables according to the data dictionary structure. The reporting element contains
+        fnmatch patterns of the variable names relative to this model, i.e.:
+
+        'reporting': {'include': ['*.T', 'pipe_*.P'], 'exclude': ['node_*.*']}
+
+        With include, only the matching variables of this model and its submodels are reported. The exclude patterns
+        are applied afterwards. As this method runs from the root to the leaves, the submodels override the root.
+        :return:
+        """
+
+        if 'reporting' not in self.data:
+            return
+
+        include = self.data['reporting'].get('include')
+        exclude = self.data['reporting'].get('exclude', [])
+
+        if include is not None:
+            included = set(name for name, variable in get_variables(self, include))
+            for name, variable in get_variables(self):
+                variable.ReportingOn = name in included
+
+        for name, variable in get_variables(self, exclude):
+            variable.ReportingOn = False
+
+
     def setup_initial_guess(self):
         """
         Setup initial guesses according to data dictionary structure
@@ -243,6 +303,10 @@ class daeModelExtended(daeModel):
 
             for name, values in self.data['initial_guess'].items():
 
+                # The eliminated variables have no guess
+                if name in self.aliases:
+                    continue
+
                 # Get Shape of Domain
                 expected_shape = []
                 for domain in getattr(self, name).Domains:
@@ -1,43 +1,196 @@
 from daetools.pyDAE import *
 from daetools_extended.daemodel_extended import daeModelExtended
 from daetools_extended.tools import execute_recursive_method, get_module_class_from_data, get_node_tree
+from daetools_extended.steady_state import SteadyStateDetector
+from daetools_extended.checkpoint import CheckpointWriter, restore_state
+from daetools_extended.adaptive_reporting import ChangeDrivenReporting
+from daetools_extended.timing import PhaseTimer
+from daetools_extended.solver_stats import SolverStatsRecorder
 
 
 class daeSimulationExtended(daeSimulation):
 
-    def __init__(self, Name, Parent=None, Description="", data={}, node_tree = {}, set_reporting = True, reporting_interval = 100, time_horizon = 0):
+    def __init__(self, Name, Parent=None, Description="", data={}, node_tree = {}, set_reporting = True, reporting_interval = 100, time_horizon = 0, steady_state = None, checkpoint = None, resume = None, adaptive_reporting = None, timer = None, solver_stats = False):
+        """
+        Simulation of the network described by the data dictionary
+        :param steady_state: dict with the steady-state detection settings (see SteadyStateDetector): variables,
+        atol, rtol, window, action ('stop' the run or switch to the 'coarse' reporting interval) and coarse_interval
+        :param checkpoint: dict with the checkpoint settings (see CheckpointWriter): path and interval
+        :param resume: checkpoint returned by checkpoint.read_checkpoint to start from. The time horizon is counted
+        from the checkpoint time.
+        :param adaptive_reporting: dict with the change-driven reporting settings (see ChangeDrivenReporting):
+        variables, rtol, atol, min_interval and max_interval. It replaces the fixed reporting interval.
+        :param timer: timing.PhaseTimer to measure the phases of the simulation (i.e. with the parsing of the data
+        already measured), a new one if None
+        :param solver_stats: record the integrator statistics after SolveInitial and after each reporting interval
+        (see SolverStatsRecorder), they are logged and kept in solver_stats
+        """
 
         daeSimulation.__init__(self)
 
+        self.timer = timer or PhaseTimer()
+
+        # The models shift their time events (i.e. the biofilm lag) by the time of the checkpoint. It is passed in a
+        # copy, so the data of the caller (and its cache key) is not changed
+        self.time_offset = 0.0
+        if resume:
+            self.time_offset = resume['time']
+            data = dict(data, time_offset=self.time_offset)
+
         class_ = get_module_class_from_data(data)
 
         if not class_:
             class_ = daeModelExtended
 
         if not node_tree:
-            node_tree = get_node_tree(Name, data)
+            with self.timer.phase('node_tree'):
+                node_tree = get_node_tree(Name, data)
+
+        with self.timer.phase('instantiation'):
+            self.m = class_(Name, Parent=Parent, Description=Description, data=data, node_tree=node_tree)
 
-        self.m = class_(Name, Parent=Parent, Description=Description, data=data, node_tree=node_tree)
+        self.timer.wrap_declare_equations(self.m)
 
         self.m.SetReportingOn(set_reporting)
 
         if set_reporting:
             self.ReportingInterval = reporting_interval
+            execute_recursive_method(self.m, 'setup_reporting')
 
         if time_horizon > 0:
             self.TimeHorizon = time_horizon
 
+        self.steady_state = steady_state
+        self.steady_state_time = None
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.adaptive_reporting = adaptive_reporting
+        self.solver_stats = SolverStatsRecorder(self) if solver_stats else None
+
 
     def SetUpVariables(self):
 
+        with self.timer.phase('SetUpVariables'):
+            self.set_up_variables()
+
+
+    def set_up_variables(self):
+
         self.InitialConditionMode = eQuasiSteadyState
 
         execute_recursive_method(self.m,'setup_active_states')
         execute_recursive_method(self.m,'setup_variables')
         execute_recursive_method(self.m,'setup_initial_guess')
 
+        if self.resume:
+            self.InitialConditionMode = eAlgebraicValuesProvided
+            restore_state(self.m, self.resume)
+
 
     def SetUpParametersAndDomains(self):
 
-        execute_recursive_method(self.m,'setup_domains')
-        execute_recursive_method(self.m,'setup_parameters')
\ No newline at end of file
+        with self.timer.phase('SetUpParametersAndDomains'):
+            execute_recursive_method(self.m,'setup_domains')
+            execute_recursive_method(self.m,'setup_parameters')
+
+
+    def Initialize(self, *args, **kwargs):
+
+        with self.timer.phase('Initialize'):
+            daeSimulation.Initialize(self, *args, **kwargs)
+
+
+    def SolveInitial(self):
+
+        with self.timer.phase('SolveInitial'):
+            daeSimulation.SolveInitial(self)
+
+        if self.solver_stats:
+            self.solver_stats.start(self.CurrentTime)
+
+
+    def Finalize(self):
+
+        with self.timer.phase('Finalize'):
+            daeSimulation.Finalize(self)
+
+
+    def Run(self):
+        """
+        Integrate until the time horizon. Without steady-state detection, checkpoints, adaptive reporting and solver
+        statistics it is the DaeTools default Run.
+        :return:
+        """
+
+        with self.timer.phase('Run'):
+            self.run()
+
+
+    def run(self):
+
+        if not self.steady_state and not self.checkpoint and not self.adaptive_reporting and not self.solver_stats:
+            daeSimulation.Run(self)
+            return
+
+        detector = None
+        action = None
+        coarse_interval = None
+        if self.steady_state:
+            settings = dict(self.steady_state)
+            action = settings.pop('action', 'stop')
+            coarse_interval = settings.pop('coarse_interval', 10 * self.ReportingInterval)
+            detector = SteadyStateDetector(self.m, **settings)
+            detector.update(self.CurrentTime)
+
+        writer = None
+        if self.checkpoint:
+            writer = CheckpointWriter(self.m, time_offset=self.time_offset, **self.checkpoint)
+            writer.last_time = self.CurrentTime
+
+        trigger = None
+        interval = self.ReportingInterval
+        if self.adaptive_reporting:
+            trigger = ChangeDrivenReporting(self.m, **self.adaptive_reporting)
+            trigger.reported(self.CurrentTime)
+            interval = trigger.min_interval
+
+        steady = False
+
+        while self.CurrentTime < self.TimeHorizon:
+
+            # Next time of the reporting grid, the integration may stop before it at a discontinuity
+            t = min((int(self.CurrentTime / interval + 1e-9) + 1) * interval, self.TimeHorizon)
+            self.Log.Message('Integrating from {0:.2f} to {1:.2f} ...'.format(self.CurrentTime, t), 0)
+
+            # Data is reported around the discontinuities by DaeTools, as in daeSimulation.Run
+            self.IntegrateUntilTime(t, eStopAtModelDiscontinuity, True)
+
+            if trigger:
+                reported = trigger.update(self.CurrentTime) or self.CurrentTime >= self.TimeHorizon
+            else:
+                reported = True
+
+            if reported:
+                self.ReportData(self.CurrentTime)
+
+            self.Log.SetProgress(int(100.0 * self.CurrentTime / self.TimeHorizon))
+
+            if self.solver_stats:
+                self.Log.Message(self.solver_stats.format(self.solver_stats.update(self.CurrentTime)), 0)
+
+            if writer and writer.update(self.CurrentTime):
+                self.Log.Message('Checkpoint written at {0:.2f} s'.format(self.CurrentTime + self.time_offset), 0)
+
+            if detector and not steady and detector.update(self.CurrentTime):
+
+                steady = True
+                self.Log.Message('Steady state reached at {0:.2f} s'.format(self.CurrentTime), 0)
+
+                if action == 'stop':
+                    if not reported:
+                        self.ReportData(self.CurrentTime)
+                    break
+
+                interval = coarse_interval
+
+        self.steady_state_time = self.CurrentTime if steady else None
@@ -0,0 +1,745 @@
+__doc__="""
+Data reporters that stream the results while the simulation runs, instead of keeping every value in memory until
+the end as daeDataReporterLocal does. The results are assembled as one row per reported time (the flat values of all
+the reported variables), and each reporter decides where the rows go.
+
+The files written here can be read with the functions of the readers module.
+"""
+
+import collections
+import fnmatch
+import json
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from daetools.pyDAE import *
+from daetools_extended.readers import SHM_MAGIC, SHM_HEADER, DAERES_MAGIC, DAERES_HEADER
+
+
+class daeStreamingDataReporter(daeDataReporter_t):
+    """
+    Base class of the streaming data reporters. The subclasses implement open, close, write_header and write_row.
+    """
+
+    def __init__(self, variables=None):
+        """
+        :param variables: fnmatch patterns of the streamed variables relative to the root model (i.e. '*.T'), all
+        the reported variables if None
+        """
+
+        daeDataReporter_t.__init__(self)
+
+        self.patterns = variables
+
+        self.ProcessName = ""
+        self.ConnectString = ""
+        self.connected = False
+
+        self.domains = collections.OrderedDict()
+        self.variables = collections.OrderedDict()
+        self.size = 0
+
+        self.time = None
+        self.row = None
+
+
+    def Connect(self, ConnectString, ProcessName):
+
+        self.ConnectString = ConnectString
+        self.ProcessName = ProcessName
+        self.connected = self.open()
+        return self.connected
+
+
+    def Disconnect(self):
+
+        if self.connected:
+            self.flush_row()
+            self.close()
+            self.connected = False
+        return True
+
+
+    def IsConnected(self):
+
+        return self.connected
+
+
+    def StartRegistration(self):
+
+        return True
+
+
+    def RegisterDomain(self, domain):
+
+        points = np.asarray(domain.Points, dtype=float).ravel()
+        self.domains[domain.Name] = {'type': str(domain.Type), 'size': int(domain.NumberOfPoints),
+                                     'points': points.tolist()}
+        return True
+
+
+    def RegisterVariable(self, variable):
+
+        if self.patterns is not None:
+            # Variable names are canonical, starting with the name of the root model
+            name = variable.Name.split('.', 1)[-1]
+            if not any(fnmatch.fnmatchcase(name, pattern) for pattern in self.patterns):
+                return True
+
+        domains = list(variable.Domains)
+        size = int(variable.NumberOfPoints)
+
+        shape = [self.domains[domain]['size'] for domain in domains if domain in self.domains]
+        if int(np.prod(shape)) != size or len(shape) != len(domains):
+            shape = [size] if domains else []
+
+        self.variables[variable.Name] = {'offset': self.size, 'size': size, 'shape': shape, 'domains': domains,
+                                         'units': str(variable.Units)}
+        self.size += size
+        return True
+
+
+    def EndRegistration(self):
+
+        self.write_header()
+        return True
+
+
+    def StartNewResultSet(self, time):
+
+        self.flush_row()
+        self.time = time
+        self.row = np.full(self.size, np.nan)
+        return True
+
+
+    def SendVariable(self, variableValue):
+
+        variable = self.variables.get(variableValue.Name)
+        if variable and self.row is not None:
+            start = variable['offset']
+            self.row[start:start + variable['size']] = np.ravel(variableValue.Values)
+        return True
+
+
+    def EndOfData(self):
+
+        self.flush_row()
+        return True
+
+
+    def flush_row(self):
+
+        if self.row is not None:
+            self.write_row(self.time, self.row)
+            self.row = None
+
+
+    def get_index(self):
+        """
+        Index of the reported variables and domains, written before the data
+        :return: dict
+        """
+
+        return {
+            'process': self.ProcessName,
+            'size': self.size,
+            'variables': [dict(name=name, **variable) for name, variable in self.variables.items()],
+            'domains': self.domains,
+        }
+
+
+    def open(self):
+
+        return True
+
+
+    def close(self):
+
+        pass
+
+
+    def write_header(self):
+
+        pass
+
+
+    def write_row(self, time, row):
+
+        pass
+
+
+class daeChunkedDataReporter(daeStreamingDataReporter):
+    """
+    Appends the results to chunked and compressed columnar storage, keeping in memory at most one chunk:
+
+    * format 'npz': the ConnectString is a directory with index.json and chunk_NNNNNN.npz files, each one with the
+      arrays time (n,) and values (n, size). The chunks are renamed into place only when complete.
+    * format 'h5': the ConnectString is a HDF5 file with the resizable datasets time and values and the index as
+      the attribute index of the root group. It is written in SWMR mode, so it can be read while the run goes on.
+    """
+
+    def __init__(self, format='npz', chunk_size=100, variables=None):
+
+        daeStreamingDataReporter.__init__(self, variables=variables)
+
+        self.format = format
+        self.chunk_size = chunk_size
+
+        self.times = []
+        self.rows = []
+        self.n_chunks = 0
+        self.n_rows = 0
+        self.h5 = None
+
+
+    def open(self):
+
+        if self.format == 'npz' and not os.path.isdir(self.ConnectString):
+            os.makedirs(self.ConnectString)
+        return True
+
+
+    def write_header(self):
+
+        index = self.get_index()
+        index['chunk_size'] = self.chunk_size
+
+        if self.format == 'h5':
+
+            import h5py
+
+            self.h5 = h5py.File(self.ConnectString, 'w', libver='latest')
+            self.h5.attrs['index'] = json.dumps(index)
+            self.h5.create_dataset('time', shape=(0,), maxshape=(None,), dtype='f8', chunks=(self.chunk_size,))
+            self.h5.create_dataset('values', shape=(0, self.size), maxshape=(None, self.size), dtype='f8',
+                                   chunks=(self.chunk_size, max(self.size, 1)), compression='gzip')
+            self.h5.swmr_mode = True
+
+        else:
+
+            with open(os.path.join(self.ConnectString, 'index.json'), 'w') as f:
+                json.dump(index, f)
+
+
+    def write_row(self, time, row):
+
+        self.times.append(time)
+        self.rows.append(row)
+
+        if len(self.rows) >= self.chunk_size:
+            self.write_chunk()
+
+
+    def write_chunk(self):
+
+        if not self.rows:
+            return
+
+        times = np.asarray(self.times)
+        values = np.vstack(self.rows)
+
+        if self.format == 'h5':
+
+            n = self.n_rows + len(times)
+            self.h5['time'].resize((n,))
+            self.h5['time'][self.n_rows:n] = times
+            self.h5['values'].resize((n, self.size))
+            self.h5['values'][self.n_rows:n] = values
+            self.h5.flush()
+
+        else:
+
+            filename = os.path.join(self.ConnectString, 'chunk_{0:06d}.npz'.format(self.n_chunks))
+            tmp = filename + '.tmp'
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(f, time=times, values=values)
+            os.replace(tmp, filename)
+
+        self.n_chunks += 1
+        self.n_rows += len(times)
+        self.times = []
+        self.rows = []
+
+
+    def close(self):
+
+        self.write_chunk()
+
+        if self.h5 is not None:
+            self.h5.close()
+            self.h5 = None
+
+
+class daeJSONLinesDataReporter(daeStreamingDataReporter):
+    """
+    Writes the results as JSON Lines while the simulation runs. The first line is the index of the variables and
+    each following line one reported time, as {"t": time, "v": [flat values]}. The file is flushed every
+    flush_records lines or flush_seconds seconds, so a crash loses at most the last ones.
+    """
+
+    def __init__(self, flush_records=1, flush_seconds=10., variables=None):
+
+        daeStreamingDataReporter.__init__(self, variables=variables)
+
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+
+        self.f = None
+        self.pending = 0
+        self.flushed_at = time.time()
+
+
+    def open(self):
+
+        self.f = open(self.ConnectString, 'w')
+        return True
+
+
+    def write_header(self):
+
+        self.f.write(json.dumps({'index': self.get_index()}) + '\n')
+        self.flush()
+
+
+    def write_row(self, time_, row):
+
+        self.f.write(json.dumps({'t': time_, 'v': row.tolist()}, separators=(',', ':')) + '\n')
+        self.pending += 1
+
+        if self.pending >= self.flush_records or time.time() - self.flushed_at >= self.flush_seconds:
+            self.flush()
+
+
+    def flush(self):
+
+        self.f.flush()
+        self.pending = 0
+        self.flushed_at = time.time()
+
+
+    def close(self):
+
+        self.f.close()
+        self.f = None
+
+
+class daeSharedMemoryDataReporter(daeStreamingDataReporter):
+    """
+    Publishes the latest reported values into a multiprocessing.shared_memory ring buffer, so a separate lightweight
+    monitor (see readers.SharedMemoryReader and the monitor module) can follow the simulation without a GUI and
+    without slowing the solver. The ConnectString is the name of the shared memory block. Its layout is:
+
+    * header (SHM_HEADER): magic, schema length, number of slots, row length, number of written rows and sequence
+    * schema: the index of the variables as JSON, padded to 8 bytes
+    * ring buffer: slots x row length float64, each row as [time, values...]
+    """
+
+    def __init__(self, slots=64, unlink=True, variables=None):
+        """
+        :param slots: number of rows kept in the ring buffer
+        :param unlink: remove the shared memory block when disconnected
+        """
+
+        daeStreamingDataReporter.__init__(self, variables=variables)
+
+        self.slots = slots
+        self.unlink = unlink
+
+        self.shm = None
+        self.header = None
+        self.ring = None
+        self.count = 0
+        self.sequence = 0
+
+
+    def write_header(self):
+
+        schema = json.dumps(self.get_index()).encode()
+        schema += b' ' * (-len(schema) % 8)
+
+        row_length = self.size + 1
+        offset = SHM_HEADER.size + len(schema)
+        self.shm = shared_memory.SharedMemory(name=self.ConnectString, create=True,
+                                              size=offset + 8 * self.slots * row_length)
+
+        self.shm.buf[SHM_HEADER.size:offset] = schema
+        self.ring = np.ndarray((self.slots, row_length), dtype=np.float64, buffer=self.shm.buf, offset=offset)
+        self.write_status(len(schema), row_length)
+
+
+    def write_status(self, schema_length=None, row_length=None):
+
+        if schema_length is None:
+            magic, schema_length, slots, row_length, count, sequence = SHM_HEADER.unpack_from(self.shm.buf, 0)
+        SHM_HEADER.pack_into(self.shm.buf, 0, SHM_MAGIC, schema_length, self.slots, row_length, self.count,
+                             self.sequence)
+
+
+    def write_row(self, time, row):
+
+        # Readers retry while the sequence is odd or changed during their read
+        self.sequence += 1
+        self.write_status()
+
+        slot = self.ring[self.count % self.slots]
+        slot[0] = time
+        slot[1:] = row
+        self.count += 1
+
+        self.sequence += 1
+        self.write_status()
+
+
+    def close(self):
+
+        if self.shm is None:
+            return
+
+        self.ring = None
+        self.shm.close()
+        if self.unlink:
+            self.shm.unlink()
+        self.shm = None
+
+
+def get_trapezoid_weights(points):
+    """
+    Weights of the trapezoidal rule, so the integral of f over the points is np.dot(weights, f)
+    :param points: points of the domain
+    :return: array of weights
+    """
+
+    points = np.asarray(points, dtype=float)
+    weights = np.zeros(len(points))
+    if len(points) > 1:
+        dx = np.diff(points)
+        weights[:-1] += 0.5 * dx
+        weights[1:] += 0.5 * dx
+    return weights
+
+
+def kpi_heat_duty(values, parameters, weights):
+
+    # Integral of the heat loss per length along the (normalized) x domain
+    return np.tensordot(parameters['L'] * values['Qout'], weights, axes=([1], [0]))
+
+
+def kpi_pressure_drop(values, parameters, weights):
+
+    return values['P'][:, 0] - values['P'][:, -1]
+
+
+def kpi_outlet_temperature(values, parameters, weights):
+
+    return values['T'][:, -1]
+
+
+def kpi_mean_biofilm_mass(values, parameters, weights):
+
+    return np.tensordot(values['mf'], weights, axes=([1], [0])) / weights.sum()
+
+
+def kpi_fouling_resistance(values, parameters, weights):
+
+    from water_properties import conductivity
+
+    # Same film resistance of the biofilmed models, averaged along the x domain
+    kappa = conductivity(values['T'], values['P'], simplified=True)
+    resistance = np.log(parameters['Di'] / values['D']) / (2 * np.pi * kappa)
+    return np.tensordot(resistance, weights, axes=([1], [0])) / weights.sum()
+
+
+# Name of the KPI: (variables of the edge, units, function of the stacked values of the edges)
+KPIS = collections.OrderedDict([
+    ('heat_duty', (('Qout',), 'W', kpi_heat_duty)),
+    ('pressure_drop', (('P',), 'Pa', kpi_pressure_drop)),
+    ('outlet_temperature', (('T',), 'K', kpi_outlet_temperature)),
+    ('mean_biofilm_mass', (('mf',), 'kg/m2', kpi_mean_biofilm_mass)),
+    ('fouling_resistance', (('D', 'T', 'P'), 'K.m/W', kpi_fouling_resistance)),
+])
+
+
+class daeKPIDataReporter(daeStreamingDataReporter):
+    """
+    Computes per edge key performance indicators (KPIs) of each reported state and stores only them, written with
+    daeChunkedDataReporter as the variables <root>.<edge>.<kpi>. The KPIs are reductions along the x domain (the
+    first domain of the edges), so the ones of edges with more domains keep the other ones (i.e. y):
+
+    * heat_duty: L * integral of Qout along x
+    * pressure_drop: P at the inlet - P at the outlet
+    * outlet_temperature: T at the outlet
+    * mean_biofilm_mass: mean of mf along x
+    * fouling_resistance: mean along x of ln(Di / D) / (2 pi kappa)
+
+    A KPI is computed only for the edges that report its variables. The edges with the same shape and domain points
+    are stacked, so each KPI is evaluated once per group of edges. Optionally, every field_decimation-th reported
+    time of the field variables is also written in full to <output>.field (i.e. output.field.h5 for output.h5).
+    """
+
+    def __init__(self, data, kpis=None, format='npz', chunk_size=100, field=None, field_decimation=10):
+        """
+        :param data: data dictionary of the network, with the parameters L and Di of the edges
+        :param kpis: names of the KPIs (see KPIS), all of them if None
+        :param format: format of the chunked files ('npz' or 'h5')
+        :param field: fnmatch patterns of the variables of the decimated field relative to the root model, no field
+        if None
+        :param field_decimation: one of each field_decimation reported times is written to the field
+        """
+
+        self.data = data
+        self.root = data['name']
+        self.kpis = list(KPIS.keys()) if kpis is None else list(kpis)
+
+        self.edges = collections.OrderedDict(
+            (name, submodel) for name, submodel in data.get('submodels', {}).items() if submodel.get('kind') == 'edge')
+
+        required = set(variable for kpi in self.kpis for variable in KPIS[kpi][0])
+        daeStreamingDataReporter.__init__(self, variables=['{0}.{1}'.format(edge, variable)
+                                                           for edge in self.edges for variable in required])
+
+        self.writer = daeChunkedDataReporter(format=format, chunk_size=chunk_size)
+        self.field = None
+        if field:
+            self.field = daeChunkedDataReporter(format=format, chunk_size=chunk_size, variables=field)
+        self.field_decimation = field_decimation
+        self.field_active = False
+        self.n_sets = 0
+
+        self.groups = []
+
+
+    def get_field_path(self):
+
+        base, extension = os.path.splitext(self.ConnectString)
+        return '{0}.field{1}'.format(base, extension)
+
+
+    def open(self):
+
+        self.writer.Connect(self.ConnectString, self.ProcessName)
+        if self.field:
+            self.field.Connect(self.get_field_path(), self.ProcessName)
+        return True
+
+
+    def RegisterDomain(self, domain):
+
+        if self.field:
+            self.field.RegisterDomain(domain)
+        return daeStreamingDataReporter.RegisterDomain(self, domain)
+
+
+    def RegisterVariable(self, variable):
+
+        if self.field:
+            self.field.RegisterVariable(variable)
+        return daeStreamingDataReporter.RegisterVariable(self, variable)
+
+
+    def write_header(self):
+
+        self.groups = []
+        groups = collections.OrderedDict()
+
+        for kpi in self.kpis:
+
+            variables, units, function = KPIS[kpi]
+
+            for edge, submodel in self.edges.items():
+
+                names = ['{0}.{1}.{2}'.format(self.root, edge, variable) for variable in variables]
+                if not all(name in self.variables for name in names):
+                    continue
+
+                reported = [self.variables[name] for name in names]
+                shape = tuple(reported[0]['shape'])
+                if not shape or any(tuple(variable['shape']) != shape for variable in reported):
+                    continue
+
+                # The points of the x domain of the edge, a uniform grid if not registered
+                domains = reported[0]['domains']
+                points = np.linspace(0., 1., shape[0])
+                if domains and domains[0] in self.domains:
+                    points = np.asarray(self.domains[domains[0]]['points'])
+
+                key = (kpi, shape, tuple(points))
+                if key not in groups:
+                    groups[key] = {'kpi': kpi, 'function': function, 'weights': get_trapezoid_weights(points),
+                                   'edges': [], 'columns': {variable: [] for variable in variables},
+                                   'parameters': {'L': [], 'Di': []}}
+                group = groups[key]
+
+                group['edges'].append(edge)
+                for variable, reported_variable in zip(variables, reported):
+                    start = reported_variable['offset']
+                    group['columns'][variable].append(np.arange(start, start + reported_variable['size']))
+                parameters = submodel.get('parameters', {})
+                group['parameters']['L'].append(parameters.get('L', np.nan))
+                group['parameters']['Di'].append(parameters.get('Di', np.nan))
+
+        # Layout of the KPIs written by the chunked data reporter
+        kpi_variables = collections.OrderedDict()
+        size = 0
+
+        for (kpi, shape, points), group in groups.items():
+
+            n = len(group['edges'])
+            extra = (1,) * len(shape)
+
+            # Index arrays to gather the values of all the edges of the group at once
+            group['columns'] = {variable: np.array(columns).reshape((n,) + shape)
+                                for variable, columns in group['columns'].items()}
+            group['parameters'] = {name: np.array(values, dtype=float).reshape((n,) + extra)
+                                   for name, values in group['parameters'].items()}
+
+            kpi_shape = list(shape[1:])
+            kpi_size = int(np.prod(kpi_shape))
+            group['targets'] = size + np.arange(n * kpi_size).reshape((n, kpi_size))
+            for edge in group['edges']:
+                kpi_variables['{0}.{1}.{2}'.format(self.root, edge, kpi)] = {
+                    'offset': size, 'size': kpi_size, 'shape': kpi_shape, 'domains': [],
+                    'units': KPIS[kpi][1]}
+                size += kpi_size
+
+            self.groups.append(group)
+
+        self.writer.domains = self.domains
+        self.writer.variables = kpi_variables
+        self.writer.size = size
+        self.writer.EndRegistration()
+
+        if self.field:
+            self.field.EndRegistration()
+
+
+    def StartNewResultSet(self, time):
+
+        daeStreamingDataReporter.StartNewResultSet(self, time)
+
+        self.field_active = bool(self.field) and self.n_sets % self.field_decimation == 0
+        self.n_sets += 1
+        if self.field_active:
+            self.field.StartNewResultSet(time)
+        return True
+
+
+    def SendVariable(self, variableValue):
+
+        if self.field_active:
+            self.field.SendVariable(variableValue)
+        return daeStreamingDataReporter.SendVariable(self, variableValue)
+
+
+    def EndOfData(self):
+
+        if self.field:
+            self.field.EndOfData()
+        return daeStreamingDataReporter.EndOfData(self)
+
+
+    def write_row(self, time, row):
+
+        kpi_row = np.full(self.writer.size, np.nan)
+
+        for group in self.groups:
+            values = {variable: row[columns] for variable, columns in group['columns'].items()}
+            result = group['function'](values, group['parameters'], group['weights'])
+            kpi_row[group['targets']] = np.reshape(result, group['targets'].shape)
+
+        self.writer.write_row(time, kpi_row)
+
+
+    def close(self):
+
+        self.writer.Disconnect()
+        if self.field:
+            self.field.Disconnect()
+
+
+class daeBinaryDataReporter(daeStreamingDataReporter):
+    """
+    Writes the results to a binary file (.daeres) that can be memory-mapped and read lazily, one variable or a time
+    range at a time (see readers.DaeResFile). The file is:
+
+    * header (DAERES_HEADER): magic, number of rows of the blocks and length of the index
+    * index: the index of the variables as JSON, padded to 8 bytes
+    * blocks of block_rows reported times, each one variable-major: the times (block_rows) and then the values of
+      each variable (block_rows, size), so reading a variable only touches its part of the blocks
+
+    The last block is padded. The sidecar file <output>.blocks has one float64 record [rows, first time, last time]
+    per block, written only after the block, so the file can be read while the run goes on.
+    """
+
+    def __init__(self, block_rows=256, variables=None):
+
+        daeStreamingDataReporter.__init__(self, variables=variables)
+
+        self.block_rows = block_rows
+
+        self.f = None
+        self.f_blocks = None
+        self.times = []
+        self.rows = []
+
+
+    def open(self):
+
+        self.f = open(self.ConnectString, 'wb')
+        self.f_blocks = open(self.ConnectString + '.blocks', 'wb')
+        return True
+
+
+    def write_header(self):
+
+        index = json.dumps(self.get_index()).encode()
+        index += b' ' * (-len(index) % 8)
+
+        self.f.write(DAERES_HEADER.pack(DAERES_MAGIC, self.block_rows, len(index)))
+        self.f.write(index)
+        self.f.flush()
+
+
+    def write_row(self, time, row):
+
+        self.times.append(time)
+        self.rows.append(row)
+
+        if len(self.rows) >= self.block_rows:
+            self.write_block()
+
+
+    def write_block(self):
+
+        n = len(self.rows)
+        if not n:
+            return
+
+        times = np.zeros(self.block_rows)
+        times[:n] = self.times
+        values = np.full((self.block_rows, self.size), np.nan)
+        values[:n] = self.rows
+
+        self.f.write(times.tobytes())
+        for variable in self.variables.values():
+            start = variable['offset']
+            self.f.write(np.ascontiguousarray(values[:, start:start + variable['size']]).tobytes())
+        self.f.flush()
+
+        self.f_blocks.write(np.array([n, self.times[0], self.times[-1]], dtype=np.float64).tobytes())
+        self.f_blocks.flush()
+
+        self.times = []
+        self.rows = []
+
+
+    def close(self):
+
+        self.write_block()
+        self.f.close()
+        self.f_blocks.close()
+        self.f = None
+        self.f_blocks = None
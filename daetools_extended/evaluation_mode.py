@@ -0,0 +1,278 @@
+__doc__="""
+Selection of the evaluation mode of the equations (daetools.core.equations.evaluationMode) and of its number of
+OpenMP threads. For a given network, each combination runs in a new process (the mode and the threads are read when
+the equations are built) the initialization and a short burst of integration, where the residuals and the Jacobian
+are evaluated many times. The fastest burst is chosen and stored per network signature (see cache.get_signature), so
+the later runs of networks with the same structure reuse it:
+
+python simulate.py tune network.json --burst 600
+python simulate.py network.json --format daeres --evaluation_mode auto
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+
+from daetools_extended.cache import get_signature
+
+
+MODES = ['evaluationTree_OpenMP', 'computeStack_OpenMP']
+
+
+def get_default_path():
+
+    return os.environ.get('DAETOOLS_EVALUATION_MODES',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'daetools_extended', 'evaluation_modes.json'))
+
+
+def get_thread_counts(cpus=None):
+    """
+    Numbers of OpenMP threads tried: the powers of 2 up to the number of cpus and the number of cpus itself
+    :param cpus: number of cpus, os.cpu_count() if None
+    :return: list of ints
+    """
+
+    cpus = cpus or os.cpu_count() or 1
+
+    counts = []
+    threads = 1
+    while threads < cpus:
+        counts.append(threads)
+        threads *= 2
+    counts.append(cpus)
+
+    return counts
+
+
+def apply(cfg, choice):
+    """
+    Set the evaluation mode in the DaeTools configuration, before the simulation is initialized
+    :param cfg: DaeTools config
+    :param choice: dict with the mode and the number of threads (0 uses all the cpus)
+    :return:
+    """
+
+    cfg.SetString('daetools.core.equations.evaluationMode', choice['mode'])
+    cfg.SetInteger('daetools.core.equations.{0}.numThreads'.format(choice['mode']), int(choice['threads']))
+
+
+def _configure_trial(mode, threads, relative_tolerance, MaxStep, MaxNumSteps):
+
+    from daetools_extended.runner import configure
+
+    apply(configure(relative_tolerance, MaxStep, MaxNumSteps), {'mode': mode, 'threads': threads})
+
+
+def run_trial(data, mode, threads, burst=600., relative_tolerance=1e-6):
+    """
+    Initialize a network and integrate it for a short burst with the evaluation mode already configured
+    :param data: data dictionary of the network
+    :param mode: evaluation mode, only recorded (see _configure_trial)
+    :param threads: number of threads, only recorded
+    :param burst: time in seconds integrated after the initialization
+    :param relative_tolerance: relative tolerance of the integration method
+    :return: dict with the status, the wall times of the initialization and of the burst and the evaluations
+    """
+
+    # Imported by the worker, the stored choices are read without daetools
+    from daetools.pyDAE import daeIDAS, daeBaseLog, daeNoOpDataReporter, eDoNotStopAtDiscontinuity
+    from daetools_extended.daesimulation_extended import daeSimulationExtended
+    from daetools_extended.tools import get_node_tree
+    from daetools_extended.solver_stats import get_solver_stats
+
+    result = collections.OrderedDict([('mode', mode), ('threads', threads), ('status', 'ok'), ('error', ''),
+                                      ('initial', None), ('burst', None), ('residual_evaluations', None),
+                                      ('jacobian_evaluations', None)])
+
+    try:
+        data = deepcopy(data)
+        name = data['name']
+        simulation = daeSimulationExtended(name, data=data, node_tree=get_node_tree(name, data, {}),
+                                           reporting_interval=burst, time_horizon=burst)
+
+        solver = daeIDAS()
+        solver.RelativeTolerance = relative_tolerance
+        simulation.Initialize(solver, daeNoOpDataReporter(), daeBaseLog())
+
+        start = time.perf_counter()
+        simulation.SolveInitial()
+        result['initial'] = time.perf_counter() - start
+
+        before = get_solver_stats(simulation)
+        start = time.perf_counter()
+        simulation.IntegrateUntilTime(burst, eDoNotStopAtDiscontinuity)
+        result['burst'] = time.perf_counter() - start
+        after = get_solver_stats(simulation)
+
+        for stat in ('residual_evaluations', 'jacobian_evaluations'):
+            if after[stat] is not None:
+                result[stat] = after[stat] - (before[stat] or 0)
+
+        simulation.Finalize()
+
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+
+    return result
+
+
+def tune(data, modes=None, threads=None, burst=600., relative_tolerance=1e-6, MaxStep=10., MaxNumSteps=1000000):
+    """
+    Run the trials of every mode and number of threads, each one in a new process
+    :param data: data dictionary of the network
+    :param modes: evaluation modes tried, MODES if None
+    :param threads: numbers of threads tried, see get_thread_counts if None
+    :param burst: time in seconds integrated by each trial
+    :return: dict with the chosen mode and threads, the number of cpus and the trials
+    """
+
+    context = multiprocessing.get_context('spawn')
+
+    trials = []
+    for mode in modes or MODES:
+        for count in threads or get_thread_counts():
+            with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_configure_trial,
+                                     initargs=(mode, count, relative_tolerance, MaxStep, MaxNumSteps)) as executor:
+                trial = executor.submit(run_trial, data, mode, count, burst, relative_tolerance).result()
+            print('{0:<24} {1:>4} threads: {2}'.format(mode, count, format_trial(trial)))
+            trials.append(trial)
+
+    return get_choice_from_trials(trials)
+
+
+def format_trial(trial):
+
+    if trial['status'] != 'ok':
+        return 'failed: {0}'.format(trial['error'])
+
+    return 'initial {initial:.3f} s, burst {burst:.3f} s, residuals {residual_evaluations}, ' \
+           'jacobians {jacobian_evaluations}'.format(**trial)
+
+
+def get_choice_from_trials(trials):
+    """
+    Choose the fastest trial, by the wall time of its burst and then by the fewest threads
+    :param trials: list of dicts returned by run_trial
+    :return: dict with the chosen mode and threads (None if every trial failed), the number of cpus and the trials
+    """
+
+    ok = [trial for trial in trials if trial['status'] == 'ok']
+    best = min(ok, key=lambda trial: (trial['burst'], trial['threads'])) if ok else None
+
+    return {
+        'mode': best['mode'] if best else None,
+        'threads': best['threads'] if best else None,
+        'cpus': os.cpu_count(),
+        'created': time.time(),
+        'trials': trials,
+    }
+
+
+def read_choices(path=None):
+
+    path = path or get_default_path()
+    if not os.path.isfile(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_choice(data, path=None):
+    """
+    Stored choice of a network
+    :param data: data dictionary of the network
+    :param path: path of the stored choices, see get_default_path
+    :return: dict with the mode and threads or None if it was not tuned on a machine with the same number of cpus
+    """
+
+    choice = read_choices(path).get(get_signature(data))
+    if not choice or not choice.get('mode') or choice.get('cpus') != os.cpu_count():
+        return None
+
+    return choice
+
+
+def store_choice(data, choice, path=None):
+    """
+    Store the choice of a network, replacing the previous one of its signature
+    :param data: data dictionary of the network
+    :param choice: dict returned by tune
+    :param path: path of the stored choices, see get_default_path
+    :return:
+    """
+
+    path = path or get_default_path()
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    choices = read_choices(path)
+    choices[get_signature(data)] = choice
+
+    # Written aside and renamed, so a concurrent run never reads it incomplete
+    tmp = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(tmp, 'w') as f:
+        json.dump(choices, f, indent=2)
+    os.replace(tmp, path)
+
+
+def get_or_tune(data, path=None, **options):
+    """
+    Stored choice of a network, tuning and storing it if missing
+    :param data: data dictionary of the network
+    :param path: path of the stored choices, see get_default_path
+    :param options: options of tune
+    :return: dict with the mode and threads, None if every trial failed
+    """
+
+    choice = get_choice(data, path)
+    if choice is None:
+        print("Tuning the evaluation mode of {0}".format(data.get('name')))
+        choice = tune(data, **options)
+        if choice['mode']:
+            store_choice(data, choice, path)
+
+    return choice if choice['mode'] else None
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='simulate.py tune', description='Choose the fastest evaluation mode and '
+                                                                          'number of threads of a network.')
+    parser.add_argument('input', help='Path of the json file of the network.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, help='Evaluation modes tried.')
+    parser.add_argument('--threads', nargs='+', type=int, help='Numbers of OpenMP threads tried.')
+    parser.add_argument('--burst', type=float, default=600., help='Time in seconds integrated by each trial.')
+    parser.add_argument('--store', help='Path of the stored choices (default is {0}).'.format(get_default_path()))
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+    parser.add_argument('--MaxStep', type=float, default=10., help='IDAS.MaxStep parameter.')
+    parser.add_argument('--MaxNumSteps', type=int, default=1000000, help='IDAS.MaxNumSteps parameter.')
+
+    args = parser.parse_args(argv)
+
+    with open(args.input) as f:
+        data = json.load(f)
+
+    choice = tune(data, modes=args.modes, threads=args.threads, burst=args.burst,
+                  relative_tolerance=args.relative_tolerance, MaxStep=args.MaxStep, MaxNumSteps=args.MaxNumSteps)
+
+    if not choice['mode']:
+        print("Every trial failed, nothing stored")
+        return
+
+    store_choice(data, choice, args.store)
+    print("Chosen {0} with {1} threads, stored in {2}".format(choice['mode'], choice['threads'],
+                                                             args.store or get_default_path()))
+
+
+if __name__ == "__main__":
+
+    main()
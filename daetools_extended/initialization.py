@@ -0,0 +1,227 @@
+__doc__="""
+Sequential initialization of a network along the flow direction. Instead of handing the whole network to a single
+SolveInitial, the nodes are visited in topological order (from the sources, following the edges of get_node_tree) and
+each node is solved with its outlet edges as a small network:
+
+* the node becomes a Source with the pressure and the temperature reached so far (its specification or guess for the
+  first nodes, the outlet states of its inlet edges for the others, averaged by flowrate)
+* each downstream node becomes a Sink with the flowrate of its edges (the guesses k) specified
+
+The converged blocks seed the initial guesses of the edges and the pressures and temperatures of the nodes, so the
+global SolveInitial of the network starts from a consistent state. A block that fails keeps its guesses and the march
+goes on. The flowrates are not solved by the blocks, so the split of the flow among the branches is the one of the
+guesses until the global solve.
+
+python simulate.py network.json --format daeres --initialization sequential
+python -m daetools_extended.initialization network.json --output seeded.json
+"""
+
+import argparse
+import collections
+import json
+import time
+from copy import deepcopy
+
+import numpy as np
+
+from daetools_extended.tools import get_node_tree
+
+
+def get_order(node_tree):
+    """
+    Nodes in topological order along the flow direction
+    :param node_tree: node tree (see tools.get_node_tree)
+    :return: list of node names, the nodes of loops (if any) at the end in alphabetical order
+    """
+
+    to = {edge: node for node, connections in node_tree.items() for edge in connections['inlet']}
+    pending = {node: len(connections['inlet']) for node, connections in node_tree.items()}
+
+    order = []
+    queue = collections.deque(sorted(node for node, count in pending.items() if count == 0))
+
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for edge in node_tree[node]['outlet']:
+            pending[to[edge]] -= 1
+            if pending[to[edge]] == 0:
+                queue.append(to[edge])
+
+    return order + sorted(node for node in node_tree if node not in order)
+
+
+def get_flowrate(edge):
+    """
+    Flowrate guess of an edge
+    :param edge: edge data
+    :return: flowrate in kg/s, the guess k times the number of tubes of the y domain
+    """
+
+    k = np.mean(edge.get('initial_guess', {}).get('k', 0.0))
+    ny = edge.get('domains', {}).get('y', {}).get('N', 1)
+
+    return float(k) * ny
+
+
+def get_node_state(node):
+    """
+    Pressure and temperature of a node before the march: its specification, its external temperature (sources) or
+    its guess
+    :param node: node data
+    :return: tuple with the pressure and the temperature
+    """
+
+    specifications = node.get('specifications', {})
+    guess = node.get('initial_guess', {})
+
+    P = specifications.get('P', guess.get('P', node.get('parameters', {}).get('Pext')))
+    T = guess.get('T', node.get('parameters', {}).get('Text'))
+    if node.get('class') == 'Source':
+        T = node.get('parameters', {}).get('Text', T)
+
+    return P, T
+
+
+def get_block(data, node, node_tree, P, T):
+    """
+    Small network of a node and its outlet edges
+    :param data: data dictionary of the network
+    :param node: name of the node
+    :param node_tree: node tree of the network
+    :param P: pressure of the node
+    :param T: temperature of the node
+    :return: data dictionary of the block, with the names of the network and of its submodels
+    """
+
+    submodels = data['submodels']
+
+    block = {key: value for key, value in data.items() if key != 'submodels'}
+    block['submodels'] = collections.OrderedDict()
+
+    source = deepcopy(submodels[node])
+    source.update({'module': 'models.source', 'class': 'Source', 'specifications': {'P': P}})
+    source['parameters'] = dict(source.get('parameters', {}), Text=T, Pext=P)
+    source['initial_guess'] = dict(source.get('initial_guess', {}), P=P, T=T, w=0.0)
+    block['submodels'][node] = source
+
+    for edge in node_tree[node]['outlet']:
+
+        block['submodels'][edge] = deepcopy(submodels[edge])
+        flowrate = get_flowrate(submodels[edge])
+        source['initial_guess']['w'] += flowrate
+
+        # Parallel edges share the sink, that takes all their flowrate
+        to = submodels[edge]['to']
+        if to not in block['submodels']:
+            sink = deepcopy(submodels[to])
+            sink.update({'module': 'models.sink', 'class': 'Sink', 'specifications': {'w': 0.0}})
+            sink['initial_guess'] = dict(sink.get('initial_guess', {}), w=0.0)
+            block['submodels'][to] = sink
+        block['submodels'][to]['specifications']['w'] += flowrate
+        block['submodels'][to]['initial_guess']['w'] += flowrate
+
+    return block
+
+
+def initialize_sequential(data, relative_tolerance=1e-6):
+    """
+    Seed the initial guesses of a network by solving its nodes and their outlet edges in topological order
+    :param data: data dictionary of the network, its nodes and edges must be submodels of the root
+    :param relative_tolerance: relative tolerance of the solver
+    :return: tuple with the seeded data dictionary and the per-block report, it raises RuntimeError if every block
+    failed
+    """
+
+    # Imported here, the ordering and the blocks do not require daetools
+    from daetools_extended.continuation import solve_initial
+
+    data = deepcopy(data)
+    submodels = data['submodels']
+    node_tree = get_node_tree(data['name'], data, node_tree={})
+
+    missing = [name for name in node_tree if name not in submodels]
+    if missing:
+        raise ValueError("The sequential initialization requires the nodes at the root of the network, missing "
+                         "{0}".format(', '.join(sorted(missing))))
+
+    # (flowrate, P, T) at the outlet of the inlet edges of each node
+    inflows = collections.defaultdict(list)
+    report = []
+
+    for node in get_order(node_tree):
+
+        P, T = get_node_state(submodels[node])
+        if inflows[node]:
+            # The outlet pressures of the inlet edges differ until the global solve, the edges with more flowrate
+            # weigh more in the pressure as in the mixed temperature
+            flowrates = np.array([inflow[0] for inflow in inflows[node]])
+            weights = flowrates if flowrates.sum() > 0 else None
+            P = float(np.average([inflow[1] for inflow in inflows[node]], weights=weights))
+            T = float(np.average([inflow[2] for inflow in inflows[node]], weights=weights))
+            guess = submodels[node].setdefault('initial_guess', {})
+            guess.update({'P': P, 'T': T})
+
+        edges = node_tree[node]['outlet']
+        if not edges:
+            continue
+
+        block = get_block(data, node, node_tree, P, T)
+        row = {'node': node, 'edges': list(edges), 'equations': None, 'status': 'ok', 'error': '', 'elapsed': 0.0}
+
+        begin = time.perf_counter()
+
+        try:
+            seeded, simulation = solve_initial(block, relative_tolerance=relative_tolerance)
+            row['equations'] = simulation.NumberOfEquations
+        except Exception as e:
+            row['status'] = 'failed'
+            row['error'] = '{0}: {1}'.format(type(e).__name__, e)
+            seeded = block
+
+        row['elapsed'] = time.perf_counter() - begin
+        report.append(row)
+
+        print("Initialization block {node} ({n} edges): {status} in {elapsed:.2f} s {error}".format(
+            n=len(edges), **row))
+
+        for edge in edges:
+            submodels[edge]['initial_guess'] = seeded['submodels'][edge].get('initial_guess', {})
+
+        # The sinks of the block are the outlets of its edges, the guesses are kept if it failed
+        for name in sorted(set(submodels[edge]['to'] for edge in edges)):
+            flowrate = block['submodels'][name]['specifications']['w']
+            guess = seeded['submodels'][name].get('initial_guess', {})
+            inflows[name].append((flowrate, guess.get('P', P), guess.get('T', T)))
+
+    if report and all(row['status'] != 'ok' for row in report):
+        raise RuntimeError("Sequential initialization failed for every block: {0}".format(report[0]['error']))
+
+    return data, report
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Seed the initial guesses of a network by solving its nodes and '
+                                                 'their outlet edges in topological order.')
+    parser.add_argument('input', help='Path of the json file of the network.')
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+    parser.add_argument('--output', default='seeded.json', help='Path of the seeded network json file.')
+
+    args = parser.parse_args()
+
+    from daetools_extended.runner import configure
+
+    configure(relative_tolerance=args.relative_tolerance)
+
+    with open(args.input) as f:
+        data = json.load(f)
+
+    seeded, report = initialize_sequential(data, relative_tolerance=args.relative_tolerance)
+
+    failed = [row['node'] for row in report if row['status'] != 'ok']
+    print("{0} blocks solved, {1} failed {2}".format(len(report) - len(failed), len(failed), ', '.join(failed)))
+
+    with open(args.output, 'w') as f:
+        json.dump(seeded, f, indent=2)
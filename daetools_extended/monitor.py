@@ -0,0 +1,66 @@
+__doc__="""
+Lightweight terminal monitor of a running simulation that publishes its results with daeSharedMemoryDataReporter
+(simulate.py --format shm). It does not depend on DaeTools or Qt, so it works on headless servers:
+
+python -m daetools_extended.monitor daetools_monitor --variables "pipe_01.T" "pipe_01.P"
+
+In a notebook, readers.SharedMemoryReader(name).latest(n) returns the latest rows as arrays.
+"""
+
+import argparse
+import fnmatch
+import time
+
+import numpy as np
+
+from daetools_extended.readers import SharedMemoryReader
+
+
+def format_values(times, values):
+    """
+    Format the latest values as text lines: min, mean and max of the distributed variables
+    :param times: times
+    :param values: dict with the variable arrays (time, *shape)
+    :return: list of lines
+    """
+
+    lines = ['time = {0:.2f} s'.format(times[-1])]
+
+    for name, array in values.items():
+        last = np.ravel(array[-1])
+        if last.size == 1:
+            lines.append('  {0:<50} {1:14.6g}'.format(name, last[0]))
+        else:
+            lines.append('  {0:<50} {1:14.6g} {2:14.6g} {3:14.6g}'.format(name, last.min(), last.mean(), last.max()))
+
+    return lines
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Follow a simulation published in shared memory.')
+    parser.add_argument('name', help='Name of the shared memory block.')
+    parser.add_argument('--variables', nargs='+', default=['*'], help='Patterns of the variables relative to the '
+                                                                      'root model.')
+    parser.add_argument('--interval', type=float, default=1.0, help='Refresh interval in seconds.')
+
+    args = parser.parse_args()
+
+    reader = SharedMemoryReader(args.name)
+
+    names = [variable['name'] for variable in reader.index['variables']
+             if any(fnmatch.fnmatchcase(variable['name'].split('.', 1)[-1], pattern) for pattern in args.variables)]
+
+    last_time = None
+
+    try:
+        while True:
+            times, values = reader.latest(1, variables=names)
+            if len(times) and times[-1] != last_time:
+                last_time = times[-1]
+                print('\n'.join(format_values(times, values)))
+            time.sleep(args.interval)
+    except (KeyboardInterrupt, FileNotFoundError):
+        pass
+    finally:
+        reader.close()
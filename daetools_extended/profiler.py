@@ -0,0 +1,312 @@
+__doc__="""
+Equation and expression complexity profiler. It walks a model already initialized (so its equations are
+instantiated) and reports, per submodel and per equation, the number of instantiated equations and variables and the
+number of nodes of the expression trees of the residuals. It replaces the equation counts hand-documented in the
+DeclareEquations methods, and shows which equations (i.e. eq_fD or the Gnielinski eq_calculate_hint) are worth
+optimizing.
+
+The water properties are not functions of the expression trees but Python functions that build a subexpression each
+time they are called, so their contribution is measured while the equations are declared: the nodes of each returned
+subexpression are attributed to the calling equation and multiplied by its number of instances.
+
+python -m daetools_extended.profiler network.json --top 20 --output profile.json
+"""
+
+import argparse
+import collections
+import contextlib
+import json
+import sys
+
+import water_properties
+
+
+# Water properties whose subexpressions are measured
+PROPERTY_FUNCTIONS = ['density', 'enthalpy', 'heat_capacity', 'conductivity', 'viscosity']
+
+# Attributes of the children of the nodes of the DaeTools expression trees
+CHILDREN = ('Node', 'LNode', 'RNode')
+
+
+def get_children(node):
+
+    children = [getattr(node, name, None) for name in CHILDREN]
+    children += list(getattr(node, 'Nodes', None) or [])
+
+    return [child for child in children if child is not None]
+
+
+def count_nodes(node, types=None):
+    """
+    Count the nodes of an expression tree
+    :param node: root node (adNode) or adouble
+    :param types: collections.Counter updated with the count of each node type
+    :return: number of nodes
+    """
+
+    # The trees can be deeper than the recursion limit
+    stack = [node]
+    count = 0
+
+    while stack:
+        node = stack.pop()
+        count += 1
+        if types is not None:
+            types[type(node).__name__] += 1
+        stack.extend(get_children(node))
+
+    return count
+
+
+def get_expression_nodes(value):
+    """
+    Count the nodes of the expression built by a Python function
+    :param value: returned value, adouble or number
+    :return: number of nodes, a number is a single constant node
+    """
+
+    node = getattr(value, 'Node', None)
+    if node is None:
+        return 1
+
+    return count_nodes(node)
+
+
+def get_equations(model, active_only=False):
+    """
+    Equations of a model, including the ones of the states of its state transition networks
+    :param model: DaeTools model
+    :param active_only: only the equations of the active states
+    :return: list of equations
+    """
+
+    equations = list(getattr(model, 'Equations', []))
+
+    for stn in getattr(model, 'STNs', []):
+        for state in getattr(stn, 'States', []):
+            if active_only and state.Name != getattr(stn, 'ActiveState', state.Name):
+                continue
+            equations += list(getattr(state, 'Equations', []))
+
+    return equations
+
+
+def get_models(model):
+    """
+    The model and its submodels, from the root to the leaves
+    :param model: root model
+    :return: list of models
+    """
+
+    models = [model]
+    for submodel in getattr(model, 'submodels', {}).values():
+        models += get_models(submodel)
+
+    return models
+
+
+class ExpressionProfiler(object):
+
+    def __init__(self):
+        """
+        Profiler of the equations of a model. The property functions are measured inside record_functions, that must
+        include the DeclareEquations (i.e. the Initialize of the simulation):
+
+        profiler = ExpressionProfiler()
+        with profiler.record_functions():
+            simulation.Initialize(solver, datareporter, log)
+        report = profiler.profile(simulation.m)
+
+        """
+
+        # (function name, equation canonical name): [calls, nodes]
+        self.calls = collections.defaultdict(lambda: [0, 0])
+
+
+    def wrap(self, name, function):
+
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            value = function(*args, **kwargs)
+            key = (name, profiler.get_calling_equation())
+            profiler.calls[key][0] += 1
+            profiler.calls[key][1] += get_expression_nodes(value)
+            return value
+
+        wrapper.__wrapped__ = function
+        return wrapper
+
+
+    def get_calling_equation(self):
+        """
+        Equation being declared by the caller of a property function, found as the local eq of the calling frames
+        :return: canonical name of the equation or the name of the calling function
+        """
+
+        frame = sys._getframe(2)
+        caller = frame.f_code.co_name
+
+        while frame is not None:
+            eq = frame.f_locals.get('eq')
+            if eq is not None and hasattr(eq, 'CanonicalName'):
+                return eq.CanonicalName
+            frame = frame.f_back
+
+        return caller
+
+
+    @contextlib.contextmanager
+    def record_functions(self):
+        """
+        Measure the subexpressions built by the property functions while the equations are declared
+        """
+
+        patched = []
+
+        # The models import the functions by name, so they are replaced in every module that holds them
+        for name in PROPERTY_FUNCTIONS:
+            function = getattr(water_properties, name)
+            wrapper = self.wrap(name, function)
+            for module in list(sys.modules.values()):
+                if module is not water_properties and getattr(module, name, None) is function:
+                    setattr(module, name, wrapper)
+                    patched.append((module, name, function))
+
+        try:
+            yield
+        finally:
+            for module, name, function in patched:
+                setattr(module, name, function)
+
+
+    def profile(self, model):
+        """
+        Profile an initialized model
+        :param model: root model
+        :return: dict with the lists of the models, equations and property functions, the heaviest first
+        """
+
+        models = []
+        equations = []
+
+        for submodel in get_models(model):
+
+            variables = sum(getattr(variable, 'NumberOfPoints', 1) for variable in getattr(submodel, 'Variables', []))
+            record = collections.OrderedDict([
+                ('model', submodel.CanonicalName),
+                ('class', type(submodel).__name__),
+                ('equations', 0),
+                ('variables', variables),
+                ('nodes', 0),
+            ])
+
+            for eq in get_equations(submodel):
+
+                types = collections.Counter()
+                nodes = [count_nodes(info.Node, types) for info in eq.EquationExecutionInfos]
+
+                equations.append(collections.OrderedDict([
+                    ('equation', eq.CanonicalName),
+                    ('model', submodel.CanonicalName),
+                    ('class', type(submodel).__name__),
+                    ('name', eq.Name),
+                    ('instances', len(nodes)),
+                    ('nodes', sum(nodes)),
+                    ('mean_nodes', sum(nodes) / float(len(nodes)) if nodes else 0.0),
+                    ('max_nodes', max(nodes) if nodes else 0),
+                    ('node_types', dict(types.most_common())),
+                ]))
+
+                record['equations'] += len(nodes)
+                record['nodes'] += sum(nodes)
+
+            models.append(record)
+
+        instances = {eq['equation']: eq['instances'] for eq in equations}
+        total = sum(eq['nodes'] for eq in equations)
+
+        functions = collections.OrderedDict()
+        for (name, equation), (calls, nodes) in self.calls.items():
+            function = functions.setdefault(name, collections.OrderedDict([
+                ('function', name), ('calls', 0), ('nodes', 0), ('fraction', 0.0), ('equations', {})]))
+            # The subexpression is expanded once per instance of the equation
+            expanded = nodes * instances.get(equation, 1)
+            function['calls'] += calls
+            function['nodes'] += expanded
+            function['equations'][equation] = expanded
+
+        for function in functions.values():
+            function['fraction'] = function['nodes'] / float(total) if total else 0.0
+
+        # Ranked by class and name, the same equation of many submodels is summed
+        by_class = collections.OrderedDict()
+        for eq in equations:
+            summed = by_class.setdefault((eq['class'], eq['name']), collections.OrderedDict([
+                ('class', eq['class']), ('name', eq['name']), ('submodels', 0), ('instances', 0), ('nodes', 0)]))
+            summed['submodels'] += 1
+            summed['instances'] += eq['instances']
+            summed['nodes'] += eq['nodes']
+
+        return {
+            'total': {'equations': sum(eq['instances'] for eq in equations),
+                      'variables': sum(record['variables'] for record in models), 'nodes': total},
+            'models': sorted(models, key=lambda record: record['nodes'], reverse=True),
+            'equations': sorted(equations, key=lambda eq: eq['nodes'], reverse=True),
+            'classes': sorted(by_class.values(), key=lambda record: record['nodes'], reverse=True),
+            'functions': sorted(functions.values(), key=lambda function: function['nodes'], reverse=True),
+        }
+
+
+def print_report(report, top=20):
+
+    total = report['total']
+    print("Equations {equations}, variables {variables}, expression nodes {nodes}".format(**total))
+
+    print('\n{0:<40} {1:<40} {2:>10} {3:>12} {4:>8}'.format('class', 'equation', 'instances', 'nodes', '%'))
+    for record in report['classes'][:top]:
+        fraction = 100. * record['nodes'] / total['nodes'] if total['nodes'] else 0.0
+        print('{0:<40} {1:<40} {2:>10} {3:>12} {4:8.1f}'.format(record['class'], record['name'],
+                                                                  record['instances'], record['nodes'], fraction))
+
+    print('\n{0:<40} {1:>10} {2:>12} {3:>12} {4:>8}'.format('model', 'equations', 'variables', 'nodes', '%'))
+    for record in report['models'][:top]:
+        fraction = 100. * record['nodes'] / total['nodes'] if total['nodes'] else 0.0
+        print('{0:<40} {1:>10} {2:>12} {3:>12} {4:8.1f}'.format(record['model'], record['equations'],
+                                                                  record['variables'], record['nodes'], fraction))
+
+    print('\n{0:<40} {1:>10} {2:>12} {3:>8}'.format('property function', 'calls', 'nodes', '%'))
+    for function in report['functions']:
+        print('{0:<40} {1:>10} {2:>12} {3:8.1f}'.format(function['function'], function['calls'], function['nodes'],
+                                                         100. * function['fraction']))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Profile the equations of a network.')
+    parser.add_argument('input', help='Path of the json file of the network.')
+    parser.add_argument('--top', type=int, default=20, help='Number of equations and models printed.')
+    parser.add_argument('--output', help='Path of the json report.')
+
+    args = parser.parse_args()
+
+    from daetools.pyDAE import daeIDAS, daeBaseLog, daeNoOpDataReporter
+    from daetools_extended.daesimulation_extended import daeSimulationExtended
+    from daetools_extended.tools import get_node_tree
+
+    with open(args.input) as f:
+        data = json.load(f)
+
+    simulation = daeSimulationExtended(data['name'], data=data, node_tree=get_node_tree(data['name'], data, {}))
+
+    profiler = ExpressionProfiler()
+    with profiler.record_functions():
+        simulation.Initialize(daeIDAS(), daeNoOpDataReporter(), daeBaseLog())
+
+    report = profiler.profile(simulation.m)
+
+    print_report(report, top=args.top)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
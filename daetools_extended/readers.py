@@ -0,0 +1,437 @@
+__doc__="""
+Readers of the result files written by the data reporters of the data_reporters module. They only depend on numpy
+(and h5py for HDF5 files), so the results can be post-processed without DaeTools, even while the run goes on.
+"""
+
+import glob
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Header of the shared memory ring buffer: magic, schema length, number of slots, row length, number of written rows
+# and sequence (odd while a row is being written)
+SHM_MAGIC = b'DAESHM01'
+SHM_HEADER = struct.Struct('<8sQQQQQ')
+
+# Header of the binary result files: magic, number of rows of the blocks and length of the index
+DAERES_MAGIC = b'DAERES01'
+DAERES_HEADER = struct.Struct('<8sQQ')
+
+
+def split_row(index, values, variables=None):
+    """
+    Split the flat values of the rows into one array per variable
+    :param index: index of the reported variables
+    :param values: array (time, size)
+    :param variables: names of the variables to be returned, all of them if None
+    :return: dict with the variable name and the array (time, *shape)
+    """
+
+    output = {}
+
+    for variable in index['variables']:
+        if variables is not None and variable['name'] not in variables:
+            continue
+        start = variable['offset']
+        block = values[:, start:start + variable['size']]
+        output[variable['name']] = block.reshape((values.shape[0],) + tuple(variable['shape']))
+
+    return output
+
+
+def _copy(arrays):
+
+    # The views would keep the whole chunk in memory
+    return {name: array.copy() for name, array in arrays.items()}
+
+
+def concatenate_blocks(index, blocks, variables=None):
+    """
+    Concatenate the blocks of the iter_* functions
+    :param index: index of the reported variables
+    :param blocks: iterable of tuples with the times and the dict with the variable arrays
+    :param variables: names of the variables of the blocks, all of them if None
+    :return: tuple with the times and the dict with the variable arrays (time, *shape)
+    """
+
+    times = []
+    parts = []
+    for block_times, values in blocks:
+        times.append(block_times)
+        parts.append(values)
+
+    empty = split_row(index, np.zeros((0, index['size'])), variables)
+    output = {}
+    for name in empty:
+        output[name] = np.concatenate([empty[name]] + [part[name] for part in parts])
+
+    return np.concatenate([np.zeros(0)] + times), output
+
+
+def iter_chunked(path, variables=None):
+    """
+    Iterate over the complete chunks of the results of daeChunkedDataReporter (directory of npz chunks or HDF5 file)
+    :param path: directory or HDF5 file
+    :param variables: names of the variables to be returned, all of them if None
+    :return: tuple with the index and the generator of tuples with the times and the dict with the variable arrays
+    """
+
+    if os.path.isfile(path):
+
+        import h5py
+
+        with h5py.File(path, 'r', libver='latest', swmr=True) as f:
+            index = json.loads(f.attrs['index'])
+
+        def blocks():
+            with h5py.File(path, 'r', libver='latest', swmr=True) as f:
+                n = len(f['time'])
+                for start in range(0, n, index['chunk_size']):
+                    end = min(start + index['chunk_size'], n)
+                    yield f['time'][start:end], _copy(split_row(index, f['values'][start:end], variables))
+
+    else:
+
+        with open(os.path.join(path, 'index.json')) as f:
+            index = json.load(f)
+
+        def blocks():
+            for filename in sorted(glob.glob(os.path.join(path, 'chunk_*.npz'))):
+                with np.load(filename) as chunk:
+                    yield chunk['time'], _copy(split_row(index, chunk['values'], variables))
+
+    return index, blocks()
+
+
+def read_chunked(path, variables=None):
+    """
+    Read the results of daeChunkedDataReporter (directory of npz chunks or HDF5 file). Only the complete chunks
+    are read, so it can be used while the run goes on.
+    :param path: directory or HDF5 file
+    :param variables: names of the variables to be returned, all of them if None
+    :return: tuple with the index, the times and the dict with the variable arrays (time, *shape)
+    """
+
+    # Only the selected variables of each chunk are kept in memory
+    index, blocks = iter_chunked(path, variables)
+    times, output = concatenate_blocks(index, blocks, variables)
+
+    return index, times, output
+
+
+def iter_jsonl(path, variables=None, rows=1000):
+    """
+    Iterate over the results of daeJSONLinesDataReporter in blocks of rows. An incomplete last line (i.e. of a
+    crashed or running simulation) is ignored.
+    :param path: JSON Lines file
+    :param variables: names of the variables to be returned, all of them if None
+    :param rows: number of rows of the blocks
+    :return: tuple with the index and the generator of tuples with the times and the dict with the variable arrays
+    """
+
+    with open(path) as f:
+        index = json.loads(f.readline())['index']
+
+    def block(times, values):
+        values = np.array(values, dtype=float).reshape((len(values), index['size']))
+        return np.array(times, dtype=float), _copy(split_row(index, values, variables))
+
+    def blocks():
+        times = []
+        values = []
+        with open(path) as f:
+            f.readline()
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                times.append(record['t'])
+                values.append(record['v'])
+                if len(times) >= rows:
+                    yield block(times, values)
+                    times = []
+                    values = []
+        if times:
+            yield block(times, values)
+
+    return index, blocks()
+
+
+def read_jsonl(path, variables=None):
+    """
+    Read the results of daeJSONLinesDataReporter. An incomplete last line (i.e. of a crashed or running simulation)
+    is ignored.
+    :param path: JSON Lines file
+    :param variables: names of the variables to be returned, all of them if None
+    :return: tuple with the index, the times and the dict with the variable arrays (time, *shape)
+    """
+
+    index, blocks = iter_jsonl(path, variables)
+    times, output = concatenate_blocks(index, blocks, variables)
+
+    return index, times, output
+
+
+class SharedMemoryReader(object):
+    """
+    Reader of the shared memory ring buffer published by daeSharedMemoryDataReporter
+    """
+
+    def __init__(self, name):
+        """
+        Attach to the shared memory block
+        :param name: name of the shared memory block (ConnectString of the data reporter)
+        """
+
+        self.shm = shared_memory.SharedMemory(name=name)
+
+        # Only the writer owns the block, the resource tracker must not remove it when the reader exits
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+        magic, schema_length, self.slots, self.row_length, count, sequence = SHM_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != SHM_MAGIC:
+            raise IOError("{0} is not a daetools shared memory block".format(name))
+
+        offset = SHM_HEADER.size + schema_length
+        self.index = json.loads(bytes(self.shm.buf[SHM_HEADER.size:offset]).decode())
+        self.ring = np.ndarray((self.slots, self.row_length), dtype=np.float64, buffer=self.shm.buf, offset=offset)
+
+
+    def latest(self, n=1, variables=None, retries=100):
+        """
+        Read the latest rows
+        :param n: number of rows (at most the number of slots)
+        :param variables: names of the variables to be returned, all of them if None
+        :param retries: number of attempts while the writer is writing
+        :return: tuple with the times and the dict with the variable arrays (time, *shape)
+        """
+
+        for i in range(retries):
+
+            magic, schema_length, slots, row_length, count, sequence = SHM_HEADER.unpack_from(self.shm.buf, 0)
+            if sequence % 2 == 0:
+                n = min(n, count, self.slots)
+                slots = [(count - n + j) % self.slots for j in range(n)]
+                rows = self.ring[slots].copy()
+                if SHM_HEADER.unpack_from(self.shm.buf, 0)[5] == sequence:
+                    return rows[:, 0], split_row(self.index, rows[:, 1:], variables)
+            time.sleep(1e-3)
+
+        raise IOError("The shared memory block is busy")
+
+
+    def close(self):
+
+        self.ring = None
+        self.shm.close()
+
+
+class LazyArray(object):
+    """
+    Values (time, *shape) of a variable of a DaeResFile. Only the blocks of the selected times are read when
+    indexed, i.e. values[-10:] or values[:, 0].
+    """
+
+    def __init__(self, name, blocks, rows, shape):
+        """
+        :param name: name of the variable
+        :param blocks: memory-mapped view (blocks, block rows, size)
+        :param rows: number of reported times
+        :param shape: shape of the variable
+        """
+
+        self.name = name
+        self.blocks = blocks
+        self.shape = (rows,) + tuple(shape)
+        self.dtype = blocks.dtype
+
+
+    def __len__(self):
+
+        return self.shape[0]
+
+
+    def __getitem__(self, key):
+
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        rows = np.arange(self.shape[0])[key[0]]
+        block_rows = self.blocks.shape[1]
+        values = self.blocks[rows // block_rows, rows % block_rows]
+        values = values.reshape(np.shape(rows) + self.shape[1:])
+
+        if len(key) > 1:
+            values = values[(slice(None),) * np.ndim(rows) + key[1:]]
+
+        return values
+
+
+    def __array__(self, dtype=None, copy=None):
+
+        values = self[:]
+        if dtype is None:
+            return values
+        return values.astype(dtype)
+
+
+class DaeResFile(object):
+    """
+    Reader of the binary result files of daeBinaryDataReporter. The data is memory-mapped and the variables are
+    returned as LazyArray, so a variable or a time range of a large file is read without reading the rest.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: .daeres file
+        """
+
+        with open(path, 'rb') as f:
+            magic, self.block_rows, index_length = DAERES_HEADER.unpack(f.read(DAERES_HEADER.size))
+            if magic != DAERES_MAGIC:
+                raise IOError("{0} is not a daetools binary result file".format(path))
+            self.index = json.loads(f.read(index_length).decode())
+
+        offset = DAERES_HEADER.size + index_length
+        block_length = self.block_rows * (1 + self.index['size'])
+
+        # Only the blocks already recorded in the sidecar are complete
+        blocks = np.zeros((0, 3))
+        if os.path.isfile(path + '.blocks'):
+            blocks = np.fromfile(path + '.blocks', dtype=np.float64)
+            blocks = blocks[:len(blocks) // 3 * 3].reshape((-1, 3))
+        n_blocks = min(len(blocks), (os.path.getsize(path) - offset) // (8 * block_length))
+
+        self.blocks = blocks[:n_blocks]
+        self.rows = int(self.blocks[:, 0].sum())
+
+        if n_blocks:
+            self.data = np.memmap(path, dtype=np.float64, mode='r', offset=offset, shape=(n_blocks, block_length))
+        else:
+            self.data = np.zeros((0, block_length))
+
+        self.variables = {variable['name']: variable for variable in self.index['variables']}
+
+
+    @property
+    def times(self):
+
+        return self.data[:, :self.block_rows].reshape(-1)[:self.rows]
+
+
+    def keys(self):
+
+        return self.variables.keys()
+
+
+    def __getitem__(self, name):
+        """
+        Lazy values of a variable
+        :param name: name of the variable
+        :return: LazyArray
+        """
+
+        variable = self.variables[name]
+        start = self.block_rows * (1 + variable['offset'])
+        end = start + self.block_rows * variable['size']
+        blocks = self.data[:, start:end].reshape((len(self.data), self.block_rows, variable['size']))
+
+        return LazyArray(name, blocks, self.rows, variable['shape'])
+
+
+    def time_slice(self, start=None, end=None):
+        """
+        Rows of a time range, using the first and last times of the blocks
+        :param start: first time, from the beginning if None
+        :param end: last time (included), to the end if None
+        :return: slice
+        """
+
+        first = 0
+        last = self.rows
+        if start is not None:
+            k = int(np.searchsorted(self.blocks[:, 2], start, side='left'))
+            if k < len(self.blocks):
+                times = self.data[k, :int(self.blocks[k, 0])]
+                first = k * self.block_rows + int(np.searchsorted(times, start, side='left'))
+        if end is not None:
+            k = int(np.searchsorted(self.blocks[:, 1], end, side='right')) - 1
+            if k >= 0:
+                times = self.data[k, :int(self.blocks[k, 0])]
+                last = k * self.block_rows + int(np.searchsorted(times, end, side='right'))
+            else:
+                last = 0
+
+        return slice(first, max(first, last))
+
+
+    def close(self):
+
+        self.data = None
+
+
+def read_daeres(path, variables=None, start=None, end=None):
+    """
+    Read the results of daeBinaryDataReporter. Only the selected variables and times are read from the file.
+    :param path: .daeres file
+    :param variables: names of the variables to be returned, all of them if None
+    :param start: first time, from the beginning if None
+    :param end: last time (included), to the end if None
+    :return: tuple with the index, the times and the dict with the variable arrays (time, *shape)
+    """
+
+    f = DaeResFile(path)
+    rows = f.time_slice(start, end)
+
+    output = {}
+    for name in f.keys():
+        if variables is None or name in variables:
+            output[name] = f[name][rows]
+
+    return f.index, np.array(f.times[rows]), output
+
+
+def iter_daeres(path, variables=None):
+    """
+    Iterate over the blocks of the results of daeBinaryDataReporter
+    :param path: .daeres file
+    :param variables: names of the variables to be returned, all of them if None
+    :return: tuple with the index and the generator of tuples with the times and the dict with the variable arrays
+    """
+
+    f = DaeResFile(path)
+
+    def blocks():
+        names = [name for name in f.keys() if variables is None or name in variables]
+        arrays = {name: f[name] for name in names}
+        for k in range(len(f.blocks)):
+            rows = slice(k * f.block_rows, k * f.block_rows + int(f.blocks[k, 0]))
+            yield np.array(f.times[rows]), {name: arrays[name][rows] for name in names}
+
+    return f.index, blocks()
+
+
+def iter_results(path, variables=None):
+    """
+    Iterate over the results of any of the file data reporters of the data_reporters module, by blocks of times,
+    so large results can be processed in constant memory
+    :param path: JSON Lines file, binary result file (.daeres), directory of npz chunks or HDF5 file
+    :param variables: names of the variables to be returned, all of them if None
+    :return: tuple with the index and the generator of tuples with the times and the dict with the variable arrays
+    """
+
+    if path.endswith('.jsonl'):
+        return iter_jsonl(path, variables)
+    elif path.endswith('.daeres'):
+        return iter_daeres(path, variables)
+    return iter_chunked(path, variables)
@@ -0,0 +1,343 @@
+__doc__="""
+Labeled access to the results of a simulation. Each variable is a LabeledArray: a NumPy array (time, x, y, ...) with
+the names of its dimensions and their coordinates (the times and the points of the domains). The arrays are views of
+the reporter output, and the selections by time range or by domain range are views as well, so large runs can be
+post-processed without per-row Python loops:
+
+results = Results.from_reporter(dr, root='network')
+T = results['pipe_01.T'].sel(time=(0, 24*3600))
+T.values.mean(axis=0)
+
+results.edge('pipe_01')           # all the variables of pipe_01
+results.select(['*.T', '*.P'])    # variables by pattern
+results.sel(time=(0, 3600))       # all the variables in a time range
+
+It only depends on numpy, the results can be read from the local data reporter of DaeTools or from the files of the
+streaming data reporters (see the readers module).
+"""
+
+import collections
+import fnmatch
+
+import numpy as np
+
+from daetools_extended.readers import read_chunked, read_jsonl, read_daeres
+
+
+DIMS = ('x', 'y', 'z')
+
+
+class LabeledArray(object):
+    """
+    Values of one variable with the names and coordinates of their dimensions, the first one is always time
+    """
+
+    def __init__(self, name, values, times, dims=None, coords=None, units=''):
+        """
+        :param name: name of the variable
+        :param values: array (time, *shape)
+        :param times: array of times
+        :param dims: names of the dimensions after time, x, y, ... if None
+        :param coords: dict with the coordinates of the dimensions after time, the indexes if not given
+        :param units: units of the variable
+        """
+
+        self.name = name
+        self.values = np.asarray(values)
+        self.units = units
+
+        if dims is None:
+            dims = DIMS[:self.values.ndim - 1]
+        self.dims = ('time',) + tuple(dims)
+
+        self.coords = collections.OrderedDict()
+        self.coords['time'] = np.asarray(times, dtype=float)
+        for i, dim in enumerate(self.dims[1:]):
+            coord = (coords or {}).get(dim)
+            if coord is None or len(coord) != self.values.shape[i + 1]:
+                coord = np.arange(self.values.shape[i + 1], dtype=float)
+            self.coords[dim] = np.asarray(coord, dtype=float)
+
+
+    def __repr__(self):
+
+        return "<LabeledArray {0} {1} [{2}]>".format(
+            self.name, ', '.join('{0}: {1}'.format(dim, n) for dim, n in zip(self.dims, self.shape)), self.units)
+
+
+    def __array__(self, dtype=None, copy=None):
+
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype)
+
+
+    def __len__(self):
+
+        return len(self.values)
+
+
+    @property
+    def shape(self):
+
+        return self.values.shape
+
+
+    @property
+    def times(self):
+
+        return self.coords['time']
+
+
+    def get_index(self, dim, selection):
+        """
+        Index of a selection along a dimension
+        :param dim: name of the dimension
+        :param selection: tuple (start, end) of coordinates, both included and None for open ends, or a coordinate
+        (the nearest point is selected)
+        :return: slice (the result is a view) or integer
+        """
+
+        coord = self.coords[dim]
+
+        if isinstance(selection, (tuple, list, slice)):
+            if isinstance(selection, slice):
+                start, end = selection.start, selection.stop
+            else:
+                start, end = selection
+            first = 0 if start is None else int(np.searchsorted(coord, start, side='left'))
+            last = len(coord) if end is None else int(np.searchsorted(coord, end, side='right'))
+            return slice(first, last)
+
+        return int(np.argmin(np.abs(coord - selection)))
+
+
+    def sel(self, **selections):
+        """
+        Select by coordinates, i.e. sel(time=(0, 3600), x=1.0). Ranges keep the dimension and points drop it.
+        :param selections: dict with the dimension and the selection (see get_index)
+        :return: LabeledArray with a view of the values
+        """
+
+        index = []
+        dims = []
+        coords = {}
+
+        for dim in self.dims:
+            if dim in selections:
+                i = self.get_index(dim, selections[dim])
+            else:
+                i = slice(None)
+            index.append(i)
+            if isinstance(i, slice):
+                dims.append(dim)
+                coords[dim] = self.coords[dim][i]
+
+        values = self.values[tuple(index)]
+
+        # A selected time point is kept as a time dimension of length one
+        if 'time' not in dims:
+            values = values[np.newaxis]
+            times = self.coords['time'][[index[0]]]
+        else:
+            times = coords['time']
+
+        return LabeledArray(self.name, values, times, dims=dims[1:] if 'time' in dims else dims, coords=coords,
+                            units=self.units)
+
+
+    def isel(self, **selections):
+        """
+        Select by position, i.e. isel(time=-1) or isel(x=slice(0, 5))
+        :param selections: dict with the dimension and the integer or slice
+        :return: LabeledArray with a view of the values
+        """
+
+        index = [selections.get(dim, slice(None)) for dim in self.dims]
+
+        values = self.values[tuple(index)]
+        times = self.coords['time'][index[0]]
+        if not isinstance(index[0], slice):
+            values = values[np.newaxis]
+            times = self.coords['time'][[index[0]]]
+
+        dims = [dim for dim, i in zip(self.dims[1:], index[1:]) if isinstance(i, slice)]
+        coords = {dim: self.coords[dim][i] for dim, i in zip(self.dims[1:], index[1:]) if isinstance(i, slice)}
+
+        return LabeledArray(self.name, values, times, dims=dims, coords=coords, units=self.units)
+
+
+class Results(object):
+    """
+    Ordered collection of LabeledArray by the variable name relative to the root model
+    """
+
+    def __init__(self, variables, root=None):
+        """
+        :param variables: dict with the relative variable name and the LabeledArray
+        :param root: name of the root model
+        """
+
+        self.variables = collections.OrderedDict(variables)
+        self.root = root
+
+
+    @classmethod
+    def from_reporter(cls, datareporter, root=None):
+        """
+        Results of a DaeTools local data reporter (i.e. daeDataReporterLocal), without copying the values
+        :param datareporter: local data reporter
+        :param root: name of the root model to be removed from the variable names
+        :return: Results
+        """
+
+        variables = collections.OrderedDict()
+
+        for variable_name, (ndarr_values, ndarr_times, l_domains, s_units) in \
+                datareporter.Process.dictVariableValues.items():
+
+            name = variable_name
+            if root and name.startswith(root + '.'):
+                name = name[len(root) + 1:]
+
+            values = np.asarray(ndarr_values)
+            coords = dict(zip(DIMS, l_domains))
+            variables[name] = LabeledArray(name, values, ndarr_times, coords=coords, units=s_units)
+
+        return cls(variables, root=root)
+
+
+    @classmethod
+    def from_index(cls, index, times, values, root=None):
+        """
+        Results of the readers of the streaming data reporters
+        :param index: index of the reported variables and domains
+        :param times: array of times
+        :param values: dict with the variable name and the array (time, *shape)
+        :param root: name of the root model to be removed from the variable names, the first part of the names if
+        None
+        :return: Results
+        """
+
+        variables = collections.OrderedDict()
+
+        for variable in index['variables']:
+
+            if variable['name'] not in values:
+                continue
+
+            name = variable['name']
+            if root is None:
+                name = name.split('.', 1)[-1]
+            elif name.startswith(root + '.'):
+                name = name[len(root) + 1:]
+
+            dims = []
+            coords = {}
+            if len(variable['domains']) == len(variable['shape']):
+                for domain in variable['domains']:
+                    dim = domain.split('.')[-1]
+                    dims.append(dim)
+                    if domain in index['domains']:
+                        coords[dim] = index['domains'][domain]['points']
+            else:
+                dims = DIMS[:len(variable['shape'])]
+
+            variables[name] = LabeledArray(name, values[variable['name']], times, dims=dims, coords=coords,
+                                           units=variable.get('units', ''))
+
+        return cls(variables, root=root)
+
+
+    @classmethod
+    def read(cls, path, variables=None):
+        """
+        Read the results written by the streaming data reporters
+        :param path: JSON Lines file, binary result file (.daeres), directory of npz chunks or HDF5 file
+        :param variables: names of the variables (with the root model) to be read, all of them if None
+        :return: Results
+        """
+
+        if path.endswith('.jsonl'):
+            index, times, values = read_jsonl(path, variables)
+        elif path.endswith('.daeres'):
+            index, times, values = read_daeres(path, variables)
+        else:
+            index, times, values = read_chunked(path, variables)
+
+        return cls.from_index(index, times, values)
+
+
+    def __repr__(self):
+
+        return "<Results {0} variables>".format(len(self.variables))
+
+
+    def __getitem__(self, name):
+
+        return self.variables[name]
+
+
+    def __contains__(self, name):
+
+        return name in self.variables
+
+
+    def __iter__(self):
+
+        return iter(self.variables)
+
+
+    def __len__(self):
+
+        return len(self.variables)
+
+
+    def keys(self):
+
+        return self.variables.keys()
+
+
+    def items(self):
+
+        return self.variables.items()
+
+
+    def select(self, patterns):
+        """
+        Variables that match the patterns
+        :param patterns: list of fnmatch patterns of the relative variable names (i.e. '*.T')
+        :return: Results sharing the arrays
+        """
+
+        if isinstance(patterns, str):
+            patterns = [patterns]
+
+        return Results([(name, variable) for name, variable in self.variables.items()
+                        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)], root=self.root)
+
+
+    def edge(self, name):
+        """
+        Variables of a submodel (i.e. an edge or a node)
+        :param name: name of the submodel relative to the root model
+        :return: Results sharing the arrays, with the names relative to the submodel
+        """
+
+        prefix = name + '.'
+        return Results([(variable_name[len(prefix):], variable) for variable_name, variable in self.variables.items()
+                        if variable_name.startswith(prefix)], root=self.root)
+
+
+    def sel(self, **selections):
+        """
+        Select all the variables by coordinates (see LabeledArray.sel). The dimensions a variable does not have
+        are ignored, i.e. sel(time=(0, 3600), x=1.0).
+        :return: Results with views of the arrays
+        """
+
+        output = collections.OrderedDict()
+        for name, variable in self.variables.items():
+            output[name] = variable.sel(**{dim: s for dim, s in selections.items() if dim in variable.dims})
+
+        return Results(output, root=self.root)
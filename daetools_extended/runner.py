@@ -0,0 +1,228 @@
+__doc__="""
+Helpers to configure, build and run a single daeSimulationExtended from a data dictionary without any GUI. They are
+shared by the command line tools (sweeps, batches, ...) that need to run many cases in the same process.
+"""
+
+import fnmatch
+import time
+
+import numpy as np
+
+from daetools.pyDAE import *
+from daetools.pyDAE.data_reporters import *
+from daetools_extended.daesimulation_extended import daeSimulationExtended
+from daetools_extended.tools import get_node_tree
+from daetools_extended.cache import get_key
+from daetools_extended.timing import PhaseTimer
+from daetools_extended.data_reporters import daeChunkedDataReporter, daeJSONLinesDataReporter, \
+    daeSharedMemoryDataReporter, daeKPIDataReporter, daeBinaryDataReporter
+
+
+def configure(relative_tolerance=1e-6, MaxStep=10., MaxNumSteps=1000000):
+    """
+    Set the DaeTools configuration used by the simulations of this process
+    :param relative_tolerance: relative tolerance of the integration method
+    :param MaxStep: IDAS.MaxStep parameter
+    :param MaxNumSteps: IDAS.MaxNumSteps parameter
+    :return: DaeTools config
+    """
+
+    cfg = daeGetConfig()
+    cfg.SetBoolean('daetools.activity.printHeader', False)
+    cfg.SetFloat('daetools.IDAS.MaxStep', MaxStep)
+    cfg.SetFloat('daetools.IDAS.relativeTolerance', relative_tolerance)
+    cfg.SetInteger('daetools.IDAS.MaxNumSteps', MaxNumSteps)
+    return cfg
+
+
+def get_reporter(format, data=None, kpi_field=None, kpi_field_decimation=10):
+    """
+    Get the file data reporter according to the output format
+    :param format: output format
+    :param data: data dictionary of the network, required by the kpi format
+    :param kpi_field: patterns of the variables of the decimated field of the kpi format
+    :param kpi_field_decimation: decimation of the field of the kpi format
+    :return: data reporter or None if the format is unknown
+    """
+
+    if format == 'json':
+        dr = daeJSONFileDataReporter()
+    elif format == 'xml':
+        dr = daeXMLFileDataReporter()
+    elif format == 'mat':
+        dr = daeMatlabMATFileDataReporter()
+    elif format == 'xlsx':
+        dr = daeExcelFileDataReporter()
+    elif format == 'vtk':
+        dr = daeVTKDataReporter()
+    elif format == 'csv':
+        dr = daeCSVFileDataReporter()
+    elif format in ('npz', 'h5'):
+        dr = daeChunkedDataReporter(format=format)
+    elif format == 'jsonl':
+        dr = daeJSONLinesDataReporter()
+    elif format == 'daeres':
+        dr = daeBinaryDataReporter()
+    elif format == 'shm':
+        dr = daeSharedMemoryDataReporter()
+    elif format == 'kpi':
+        dr = daeKPIDataReporter(data, field=kpi_field, field_decimation=kpi_field_decimation)
+    else:
+        dr = None
+
+    return dr
+
+
+def simulate_data(data, reporting_interval=3600, time_horizon=20*24*3600, relative_tolerance=1e-6, datareporter=None,
+                  log=None, run=True, local=True, timer=None):
+    """
+    Build and run the simulation described by the data dictionary
+    :param data: data dictionary of the network
+    :param reporting_interval: reporting interval in seconds
+    :param time_horizon: time horizon in seconds
+    :param relative_tolerance: relative tolerance of the integration method
+    :param datareporter: extra data reporter (already connected) to receive the results
+    :param log: DaeTools log, quiet by default
+    :param run: if False, only the initial solution is calculated
+    :param local: if False, the results are not kept in memory by a local data reporter
+    :param timer: timing.PhaseTimer to measure the phases of the construction and of the run
+    :return: tuple with the simulation and the local data reporter with the results (None if not local)
+    """
+
+    name = data['name']
+
+    timer = timer or PhaseTimer()
+
+    # A fresh node tree, get_node_tree default argument is shared among the calls
+    with timer.phase('node_tree'):
+        node_tree = get_node_tree(name, data, node_tree={})
+
+    simulation = daeSimulationExtended(name, data=data, node_tree=node_tree, set_reporting=True,
+                                       reporting_interval=reporting_interval, time_horizon=time_horizon, timer=timer)
+
+    delegate = daeDelegateDataReporter()
+    dr = None
+    if local:
+        dr = daeDataReporterLocal()
+        delegate.AddDataReporter(dr)
+    if datareporter:
+        delegate.AddDataReporter(datareporter)
+
+    solver = daeIDAS()
+    solver.RelativeTolerance = relative_tolerance
+
+    if not log:
+        log = daeBaseLog()
+
+    simulation.Initialize(solver, delegate, log)
+    simulation.SolveInitial()
+
+    if run:
+        simulation.Run()
+
+    simulation.Finalize()
+
+    return simulation, dr
+
+
+def collect_outputs(datareporter, patterns, root=None, reduction='last'):
+    """
+    Collect the values of the reported variables that matches the patterns
+    :param datareporter: DaeTools local data reporter
+    :param patterns: list of fnmatch patterns (i.e. 'pipe_01.P' or '*.T') relative to the root model
+    :param root: name of the root model to be removed from the variable names
+    :param reduction: 'last' (last reported value), 'first', 'max', 'min', 'mean' or 'all' (the whole time series)
+    :return: dict with the relative variable name and the reduced value (float or list)
+    """
+
+    output = {}
+
+    for variable_name, (ndarr_values, ndarr_times, l_domains, s_units) in datareporter.Process.dictVariableValues.items():
+
+        name = variable_name
+        if root and name.startswith(root + '.'):
+            name = name[len(root) + 1:]
+
+        if not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            continue
+
+        values = np.asarray(ndarr_values, dtype=float)
+
+        if reduction == 'first':
+            value = values[0]
+        elif reduction == 'max':
+            value = values.max(axis=0)
+        elif reduction == 'min':
+            value = values.min(axis=0)
+        elif reduction == 'mean':
+            value = values.mean(axis=0)
+        elif reduction == 'all':
+            value = values
+        else:
+            value = values[-1]
+
+        if np.ndim(value) == 0:
+            output[name] = float(value)
+        else:
+            output[name] = value.tolist()
+
+    return output
+
+
+def get_options(relative_tolerance=1e-6, **options):
+    """
+    Options of a run that change its results, to be used in the keys of the result cache
+    :param relative_tolerance: relative tolerance of the integration method
+    :param options: other options (reporting interval, time horizon, outputs, ...)
+    :return: dict
+    """
+
+    cfg = daeGetConfig()
+
+    options['relative_tolerance'] = relative_tolerance
+    options['MaxStep'] = cfg.GetFloat('daetools.IDAS.MaxStep', 10.)
+    options['MaxNumSteps'] = cfg.GetInteger('daetools.IDAS.MaxNumSteps', 1000000)
+
+    return options
+
+
+def run_case(data, outputs=(), reduction='last', reporting_interval=3600, time_horizon=20*24*3600,
+             relative_tolerance=1e-6, cache=None):
+    """
+    Run a case catching its failures, so it can be used in a pool of processes. Only picklable objects are returned.
+    :param data: data dictionary of the network
+    :param outputs: patterns of the variables to be collected
+    :param reduction: see collect_outputs
+    :param cache: cache.ResultCache, the result of an identical case is returned without simulating it
+    :return: dict with status ('ok' or 'failed'), error message, elapsed wall time, the collected outputs and if it
+    was cached
+    """
+
+    result = {'status': 'ok', 'error': '', 'elapsed': 0.0, 'outputs': {}, 'cached': False}
+
+    start = time.perf_counter()
+
+    key = None
+    if cache is not None:
+        key = get_key(data, get_options(relative_tolerance, outputs=list(outputs), reduction=reduction,
+                                        reporting_interval=reporting_interval, time_horizon=time_horizon))
+        outputs_cached = cache.get_value(key)
+        if outputs_cached is not None:
+            result['outputs'] = outputs_cached
+            result['cached'] = True
+            result['elapsed'] = time.perf_counter() - start
+            return result
+
+    try:
+        simulation, dr = simulate_data(data, reporting_interval=reporting_interval, time_horizon=time_horizon,
+                                       relative_tolerance=relative_tolerance)
+        result['outputs'] = collect_outputs(dr, outputs, root=data['name'], reduction=reduction)
+        if key:
+            cache.put(key, value=result['outputs'])
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+
+    result['elapsed'] = time.perf_counter() - start
+
+    return result
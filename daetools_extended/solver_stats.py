@@ -0,0 +1,141 @@
+__doc__="""
+Statistics of the IDAS integrator (steps, residual and Jacobian evaluations, nonlinear iterations, failures and step
+sizes), to find stiffness or tolerance problems of slow runs. The names of the statistics exposed by
+daeIDAS.IntegratorStats changed among the DaeTools versions, so they are mapped to stable names and the missing ones
+are None.
+"""
+
+import collections
+import json
+
+
+# Stable name: names in the DaeTools integrator statistics. The first ones are the keys filled by
+# daeIDASolver::GetIntegratorStats (IDAS_DAESolver/ida_solver.cpp) of DaeTools 1.9.0, the others are the IDAS names
+STATS = collections.OrderedDict([
+    ('steps', ('NumSteps', 'nst')),
+    ('residual_evaluations', ('NumEquationEvals', 'NumResEvals', 'nre')),
+    ('jacobian_evaluations', ('NumJacobianEvals', 'NumJacEvals', 'nje')),
+    ('nonlinear_iterations', ('NumNonlinSolvIters', 'nni')),
+    ('convergence_failures', ('NumNonlinSolvConvFails', 'ncfn')),
+    ('error_test_failures', ('NumErrTestFails', 'netf')),
+    ('last_step', ('LastStep', 'hlast')),
+    ('current_step', ('CurrentStep', 'hcur')),
+    ('last_order', ('LastOrder', 'klast')),
+])
+
+# Statistics that are counters, the others are the current state of the integrator
+COUNTERS = ('steps', 'residual_evaluations', 'jacobian_evaluations', 'nonlinear_iterations', 'convergence_failures',
+            'error_test_failures')
+
+
+def get_solver_stats(simulation):
+    """
+    Current statistics of the integrator
+    :param simulation: simulation (or the DAE solver itself)
+    :return: dict with the stable names and the values, None if not exposed by the solver
+    """
+
+    solver = getattr(simulation, 'DAESolver', simulation)
+
+    try:
+        stats = dict(getattr(solver, 'IntegratorStats', None) or {})
+    except Exception:
+        stats = {}
+
+    lower = {str(key).lower(): value for key, value in stats.items()}
+
+    output = collections.OrderedDict()
+    for name, keys in STATS.items():
+        value = None
+        for key in keys:
+            value = stats.get(key, lower.get(key.lower()))
+            if value is not None:
+                break
+        if value is not None:
+            value = int(value) if name in COUNTERS else float(value)
+        output[name] = value
+
+    return output
+
+
+class SolverStatsRecorder(object):
+
+    def __init__(self, simulation):
+        """
+        Recorder of the integrator statistics after SolveInitial and after each reporting interval of the run
+        :param simulation: simulation
+        """
+
+        self.simulation = simulation
+        self.initial = None
+        self.intervals = []
+        self.last = None
+        self.last_time = None
+
+
+    def start(self, time):
+        """
+        Record the statistics after SolveInitial
+        :param time: current time
+        :return:
+        """
+
+        self.initial = get_solver_stats(self.simulation)
+        self.last = self.initial
+        self.last_time = time
+
+
+    def update(self, time):
+        """
+        Record the statistics of the interval since the previous record
+        :param time: current time
+        :return: dict with the statistics of the interval
+        """
+
+        stats = get_solver_stats(self.simulation)
+
+        interval = collections.OrderedDict([('start', self.last_time), ('end', time)])
+        for name in STATS:
+            if name in COUNTERS:
+                previous = self.last.get(name) if self.last else None
+                interval[name] = stats[name] - (previous or 0) if stats[name] is not None else None
+            else:
+                interval[name] = stats[name]
+
+        interval['mean_step'] = None
+        if interval['steps']:
+            interval['mean_step'] = (time - self.last_time) / interval['steps']
+
+        self.intervals.append(interval)
+        self.last = stats
+        self.last_time = time
+
+        return interval
+
+
+    def format(self, interval):
+
+        return ('Solver stats {start:.2f}-{end:.2f} s: steps {steps}, residuals {residual_evaluations}, '
+                'jacobians {jacobian_evaluations}, nonlinear iterations {nonlinear_iterations}, convergence failures '
+                '{convergence_failures}, error test failures {error_test_failures}, last step {last_step}, mean step '
+                '{mean_step}'.format(**interval))
+
+
+    def to_dict(self):
+
+        return {
+            'initial': self.initial,
+            'total': get_solver_stats(self.simulation),
+            'intervals': self.intervals,
+        }
+
+
+    def write(self, path):
+        """
+        Write the statistics as JSON
+        :param path: path of the file
+        :return:
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
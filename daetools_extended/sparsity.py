@@ -0,0 +1,266 @@
+__doc__="""
+Sparsity pattern of the Jacobian of a built simulation and its block-triangular structure. The rows are the
+instantiated equations and the columns the unknown variables (the assigned ones are not unknowns), with a nonzero
+where the equation depends on the variable or on its time derivative. The Dulmage-Mendelsohn decomposition splits it
+into:
+
+* the over-determined part (equations left without a variable by the maximum matching)
+* the under-determined part (variables left without an equation)
+* the square part, decomposed into its strongly connected blocks in block lower triangular order, where each block
+  only depends on itself and on the blocks before it
+
+The block sizes tell if the network can be solved block by block (i.e. downstream along the flow), torn or
+reordered. The pattern is exported in the Matrix Market format, with the names of the rows and columns and the
+decomposition in a json sidecar:
+
+python -m daetools_extended.sparsity network.json --output network.mtx --top 10
+"""
+
+import argparse
+import collections
+import json
+import os
+
+import numpy as np
+from scipy import io, sparse
+from scipy.sparse.csgraph import connected_components, maximum_bipartite_matching
+
+from daetools_extended.profiler import get_equations, get_models
+
+
+def get_pattern(simulation):
+    """
+    Sparsity pattern of the Jacobian of an initialized simulation
+    :param simulation: simulation
+    :return: tuple with the csr matrix (equations x unknown variables) and the lists of equation and variable names
+    """
+
+    model = simulation.m
+    n = simulation.NumberOfEquations
+
+    # Overall index of the variables: (index among the unknowns, name), the assigned ones are out of the range
+    mapping = dict(getattr(model, 'OverallIndex_BlockIndex_VariableNameMap', {}))
+
+    rows = []
+    columns = []
+    equations = []
+
+    for submodel in get_models(model):
+        for eq in get_equations(submodel, active_only=True):
+            for i, info in enumerate(eq.EquationExecutionInfos):
+                row = len(equations)
+                equations.append('{0}[{1}]'.format(eq.CanonicalName, i))
+                for index in info.VariableIndexes:
+                    column = mapping[index][0] if index in mapping else index
+                    if column < n:
+                        rows.append(row)
+                        columns.append(column)
+
+    variables = [str(index) for index in range(n)]
+    for index, (column, name) in mapping.items():
+        if column < n:
+            variables[column] = name
+
+    matrix = sparse.coo_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(equations), n)).tocsr()
+    matrix.data[:] = 1.0
+
+    return matrix, equations, variables
+
+
+def _alternating(start, neighbours, matched):
+    """
+    Rows and columns reachable by alternating paths (a nonzero, then the matching) from the unmatched ones
+    :param start: unmatched indexes where the paths start
+    :param neighbours: csr matrix from the start side to the other side
+    :param matched: index of the start side matched to each index of the other side, -1 if unmatched
+    :return: tuple with the sets of reached indexes of the start side and of the other side
+    """
+
+    reached = set(start)
+    other = set()
+    queue = list(start)
+
+    while queue:
+        i = queue.pop()
+        for j in neighbours.indices[neighbours.indptr[i]:neighbours.indptr[i + 1]]:
+            if j in other:
+                continue
+            other.add(j)
+            k = matched[j]
+            if k >= 0 and k not in reached:
+                reached.add(k)
+                queue.append(k)
+
+    return reached, other
+
+
+def block_triangular(matrix):
+    """
+    Dulmage-Mendelsohn decomposition of a sparsity pattern
+    :param matrix: sparse matrix, rows are equations and columns are variables
+    :return: dict with the structural rank, the over and under-determined parts, the blocks of the square part (lists
+    of rows in block lower triangular order) and the row and column orders
+    """
+
+    matrix = sparse.csr_matrix(matrix)
+    n_rows, n_columns = matrix.shape
+
+    column_of_row = np.asarray(maximum_bipartite_matching(matrix, perm_type='column'))
+    row_of_column = np.full(n_columns, -1, dtype=int)
+    matched_rows = np.flatnonzero(column_of_row >= 0)
+    row_of_column[column_of_row[matched_rows]] = matched_rows
+
+    # Over-determined: from the unmatched rows, under-determined: from the unmatched columns
+    over_rows, over_columns = _alternating(np.flatnonzero(column_of_row < 0), matrix, row_of_column)
+    under_columns, under_rows = _alternating(np.flatnonzero(row_of_column < 0), matrix.T.tocsr(), column_of_row)
+
+    square = np.array([row for row in matched_rows if row not in over_rows and row not in under_rows], dtype=int)
+    position = np.full(n_rows, -1, dtype=int)
+    position[square] = np.arange(len(square))
+
+    # Row i depends on row j if i has a nonzero in the column matched to j
+    coo = matrix.tocoo()
+    dependency = row_of_column[coo.col]
+    keep = (position[coo.row] >= 0) & (dependency >= 0)
+    keep[keep] = (position[dependency[keep]] >= 0) & (coo.row[keep] != dependency[keep])
+    graph = sparse.coo_matrix((np.ones(int(keep.sum())), (position[coo.row[keep]], position[dependency[keep]])),
+                              shape=(len(square), len(square))).tocsr()
+
+    n_blocks, labels = connected_components(graph, directed=True, connection='strong')
+
+    # The blocks a block depends on come first (topological order of the condensed graph)
+    graph = graph.tocoo()
+    edges = set(zip(labels[graph.row], labels[graph.col])) if len(square) else set()
+    dependents = collections.defaultdict(list)
+    pending = np.zeros(n_blocks, dtype=int)
+    for block, required in edges:
+        if block != required:
+            dependents[required].append(block)
+            pending[block] += 1
+
+    members = collections.defaultdict(list)
+    for i, label in enumerate(labels):
+        members[label].append(int(square[i]))
+
+    queue = collections.deque(np.flatnonzero(pending == 0))
+    blocks = []
+    while queue:
+        label = queue.popleft()
+        blocks.append(members[label])
+        for block in dependents[label]:
+            pending[block] -= 1
+            if pending[block] == 0:
+                queue.append(block)
+
+    over_rows = sorted(int(row) for row in over_rows)
+    under_rows = sorted(int(row) for row in under_rows)
+    row_order = under_rows + [row for block in blocks for row in block] + over_rows
+    column_order = [int(column_of_row[row]) for row in row_order if column_of_row[row] >= 0]
+    column_order += sorted(int(column) for column in set(range(n_columns)) - set(column_order))
+
+    return {
+        'shape': [n_rows, n_columns],
+        'nnz': int(matrix.nnz),
+        'structural_rank': int(len(matched_rows)),
+        'over': {'rows': over_rows, 'columns': sorted(int(column) for column in over_columns)},
+        'under': {'rows': under_rows, 'columns': sorted(int(column) for column in under_columns)},
+        'blocks': blocks,
+        'row_order': row_order,
+        'column_order': column_order,
+    }
+
+
+def get_summary(decomposition):
+    """
+    Block sizes of a decomposition
+    :param decomposition: dict returned by block_triangular
+    :return: dict with the number of blocks, the largest block and the number of blocks of each size
+    """
+
+    sizes = collections.Counter(len(block) for block in decomposition['blocks'])
+
+    return {
+        'blocks': len(decomposition['blocks']),
+        'largest': max(sizes) if sizes else 0,
+        'sizes': {str(size): count for size, count in sorted(sizes.items())},
+    }
+
+
+def write_pattern(path, matrix, decomposition, equations, variables):
+    """
+    Write the pattern and its block triangular permutation in the Matrix Market format, with a json sidecar
+    :param path: path of the pattern (.mtx), the permuted one is <base>.btf.mtx and the sidecar <base>.json
+    :param matrix: sparse matrix of the pattern
+    :param decomposition: dict returned by block_triangular
+    :param equations: names of the rows
+    :param variables: names of the columns
+    :return:
+    """
+
+    base = os.path.splitext(path)[0]
+
+    io.mmwrite(path, sparse.coo_matrix(matrix), comment='Jacobian sparsity pattern (equations x variables)',
+               field='pattern')
+
+    permuted = sparse.csr_matrix(matrix)[decomposition['row_order'], :][:, decomposition['column_order']]
+    io.mmwrite(base + '.btf.mtx', sparse.coo_matrix(permuted), field='pattern',
+               comment='Jacobian sparsity pattern in block lower triangular order')
+
+    with open(base + '.json', 'w') as f:
+        json.dump({'equations': equations, 'variables': variables, 'summary': get_summary(decomposition),
+                   'decomposition': decomposition}, f)
+
+
+def print_report(decomposition, equations, variables, top=10):
+
+    summary = get_summary(decomposition)
+
+    print("Equations {0}, variables {1}, nonzeros {2}, structural rank {3}".format(
+        decomposition['shape'][0], decomposition['shape'][1], decomposition['nnz'], decomposition['structural_rank']))
+    print("Over-determined equations {0}, under-determined variables {1}".format(
+        len(decomposition['over']['rows']), len(decomposition['under']['columns'])))
+    print("Blocks {blocks}, largest block {largest}".format(**summary))
+
+    print('\n{0:>10} {1:>10}'.format('size', 'blocks'))
+    for size, count in summary['sizes'].items():
+        print('{0:>10} {1:>10}'.format(size, count))
+
+    largest = sorted(decomposition['blocks'], key=len, reverse=True)[:top]
+    for block in largest:
+        if len(block) < 2:
+            break
+        names = sorted(set(equations[row].split('[')[0] for row in block))
+        print('\nBlock of {0} equations: {1}'.format(len(block), ', '.join(names[:top]) +
+                                                     (', ...' if len(names) > top else '')))
+
+    for row in decomposition['over']['rows'][:top]:
+        print('Over-determined: {0}'.format(equations[row]))
+    for column in decomposition['under']['columns'][:top]:
+        print('Under-determined: {0}'.format(variables[column]))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Export the Jacobian sparsity pattern of a network and analyze its '
+                                                 'block triangular structure.')
+    parser.add_argument('input', help='Path of the json file of the network.')
+    parser.add_argument('--output', help='Path of the Matrix Market pattern (default is input.mtx).')
+    parser.add_argument('--top', type=int, default=10, help='Number of blocks printed.')
+
+    args = parser.parse_args()
+
+    from daetools_extended.compiler import build_simulation
+
+    with open(args.input) as f:
+        data = json.load(f)
+
+    simulation = build_simulation(data)
+
+    matrix, equations, variables = get_pattern(simulation)
+    decomposition = block_triangular(matrix)
+
+    print_report(decomposition, equations, variables, top=args.top)
+
+    output = args.output or '{0}.mtx'.format(os.path.splitext(args.input)[0])
+    write_pattern(output, matrix, decomposition, equations, variables)
+    print("Pattern written to {0}".format(output))
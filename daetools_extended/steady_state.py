@@ -0,0 +1,92 @@
+__doc__="""
+Steady-state detection for daeSimulationExtended. The rates of change of the monitored variables are the largest of
+their time derivatives at the report (npyTimeDerivatives, the differential variables) and of their change between
+two consecutive reports (so the algebraic variables, i.e. v or Re, can be monitored as well). The simulation is
+considered at steady state when all of them stay below the tolerance during a time window that spans at least two
+reporting intervals, so a single quiet interval does not stop the run.
+"""
+
+import numpy as np
+
+from daetools_extended.tools import get_variables
+
+
+class SteadyStateDetector(object):
+
+    def __init__(self, model, variables=('*',), atol=1e-8, rtol=1e-8, window=3600.):
+        """
+        Steady-state detector
+        :param model: root model of the simulation
+        :param variables: fnmatch patterns of the monitored variables relative to the root model (i.e. '*.T')
+        :param atol: absolute tolerance of the time derivatives (unit of the variable per second)
+        :param rtol: relative tolerance of the time derivatives (per second)
+        :param window: time in seconds the derivatives must stay below the tolerance, during two reports at least
+        """
+
+        self.variables = [variable for name, variable in get_variables(model, variables)]
+        self.atol = atol
+        self.rtol = rtol
+        self.window = window
+
+        self.previous_time = None
+        self.previous_values = None
+        self.settled_time = 0.0
+        self.settled_updates = 0
+        self.max_rate = np.inf
+
+
+    def get_values(self):
+
+        if not self.variables:
+            return np.zeros(0)
+
+        return np.concatenate([np.ravel(variable.npyValues) for variable in self.variables])
+
+
+    def get_derivatives(self):
+
+        derivatives = []
+        for variable in self.variables:
+            try:
+                derivative = variable.npyTimeDerivatives
+            except Exception:
+                derivative = None
+            if derivative is None or np.size(derivative) != np.size(variable.npyValues):
+                derivative = np.zeros(np.size(variable.npyValues))
+            derivatives.append(np.ravel(derivative))
+
+        return np.concatenate(derivatives) if derivatives else np.zeros(0)
+
+
+    def update(self, time):
+        """
+        Update the detector with the current state of the simulation
+        :param time: current time
+        :return: True if the steady state was reached
+        """
+
+        values = self.get_values()
+
+        if self.previous_time is not None and time > self.previous_time:
+
+            dt = time - self.previous_time
+            rate = np.maximum(np.abs(values - self.previous_values) / dt, np.abs(self.get_derivatives()))
+            scaled = rate / (self.atol + self.rtol * np.abs(values))
+            self.max_rate = float(rate.max()) if rate.size else 0.0
+
+            if np.all(scaled <= 1.0):
+                self.settled_time += dt
+                self.settled_updates += 1
+            else:
+                self.settled_time = 0.0
+                self.settled_updates = 0
+
+        self.previous_time = time
+        self.previous_values = values
+
+        return self.is_steady()
+
+
+    def is_steady(self):
+
+        return self.settled_time >= self.window and self.settled_updates >= 2
@@ -0,0 +1,241 @@
+__doc__="""
+Parameter sweeps over a base network data dictionary. Each case is the base data with some values replaced, where a
+value is addressed by a dotted path through the submodels, i.e.:
+
+* pipe_01.parameters.ep : roughness of the pipe_01
+* node_A.specifications.P : pressure specified at node_A
+* pipe_01.initial_guess.k : initial guess of the mass flowrate of pipe_01
+
+The cases run in a pool of processes and the selected outputs are collected into one table, together with the
+timing and the failure status of each case.
+
+Usage from the command line (from the repository root):
+
+python -m daetools_extended.sweep examples.network_examples:case_pipe --grid pipe_01.parameters.ep=45e-6,90e-6
+--outputs "pipe_01.P" "pipe_01.T" --jobs 4 --output sweep.csv
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+
+import pandas as pd
+
+from daetools_extended.runner import configure, run_case
+from daetools_extended.cache import ResultCache
+
+
+def get_data_value(data, path):
+    """
+    Get a value of the data dictionary by its dotted path
+    :param data: data dictionary
+    :param path: dotted path, where the submodels level can be omitted
+    :return: value
+    """
+
+    container, key = _resolve(data, path)
+    return container[key]
+
+
+def set_data_value(data, path, value, create=False):
+    """
+    Set a value of the data dictionary by its dotted path
+    :param data: data dictionary (modified in place)
+    :param path: dotted path, where the submodels level can be omitted
+    :param value: new value
+    :param create: add the last key if missing, otherwise a missing key (i.e. a mistyped parameter) raises KeyError
+    :return: data dictionary
+    """
+
+    container, key = _resolve(data, path)
+    if not create and key not in container:
+        raise KeyError("Path {0} not found in the data dictionary".format(path))
+    container[key] = value
+    return data
+
+
+def _resolve(data, path):
+
+    tokens = path.split('.')
+    node = data
+
+    for token in tokens[:-1]:
+        if token in node:
+            node = node[token]
+        elif 'submodels' in node and token in node['submodels']:
+            node = node['submodels'][token]
+        else:
+            raise KeyError("Path {0} not found in the data dictionary".format(path))
+
+    return node, tokens[-1]
+
+
+def expand_grid(grid):
+    """
+    Expand a parameter grid into the list of its cases (cartesian product)
+    :param grid: dict with the dotted path as key and the list of values
+    :return: list of dicts with the dotted path and the value of each case
+    """
+
+    paths = list(grid.keys())
+    return [dict(zip(paths, values)) for values in itertools.product(*[grid[path] for path in paths])]
+
+
+def build_case(data, sample):
+    """
+    Build the data dictionary of a case
+    :param data: base data dictionary
+    :param sample: dict with the dotted path and the value to be replaced
+    :return: new data dictionary
+    """
+
+    case = deepcopy(data)
+
+    for path, value in sample.items():
+        set_data_value(case, path, value)
+
+    return case
+
+
+def _run_sample(args):
+
+    data, sample, options = args
+    return run_case(build_case(data, sample), **options)
+
+
+def run_sweep(data, grid=None, samples=None, outputs=(), reduction='last', jobs=None, reporting_interval=3600,
+              time_horizon=20*24*3600, relative_tolerance=1e-6, MaxStep=10., MaxNumSteps=1000000, cache=None):
+    """
+    Run the cases of a parameter sweep in a pool of processes
+    :param data: base data dictionary
+    :param grid: dict with the dotted path as key and the list of values (cartesian product)
+    :param samples: list of dicts with the dotted path and the value (used as they are)
+    :param outputs: patterns of the variables to be collected (see runner.collect_outputs)
+    :param reduction: reduction of the time series of the outputs (see runner.collect_outputs)
+    :param jobs: number of worker processes, the number of cpus if None
+    :param cache: cache.ResultCache, the cases already simulated are not simulated again
+    :return: pandas DataFrame with one row per case
+    """
+
+    cases = []
+    if grid:
+        cases += expand_grid(grid)
+    if samples:
+        cases += list(samples)
+
+    options = {
+        'outputs': list(outputs),
+        'reduction': reduction,
+        'reporting_interval': reporting_interval,
+        'time_horizon': time_horizon,
+        'relative_tolerance': relative_tolerance,
+        'cache': cache,
+    }
+
+    # spawn avoids forking a process that already holds the daetools/OpenMP state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=configure,
+                             initargs=(relative_tolerance, MaxStep, MaxNumSteps)) as executor:
+        results = list(executor.map(_run_sample, [(data, sample, options) for sample in cases]))
+
+    return get_table(cases, results)
+
+
+def get_table(cases, results):
+    """
+    Assemble the columnar result table of a sweep
+    :param cases: list of dicts with the dotted path and the value of each case
+    :param results: list of dicts returned by runner.run_case
+    :return: pandas DataFrame
+    """
+
+    paths = []
+    names = []
+    for sample, result in zip(cases, results):
+        paths += [path for path in sample if path not in paths]
+        names += [name for name in result['outputs'] if name not in names]
+
+    table = {'case': list(range(len(cases)))}
+    for path in paths:
+        table[path] = [sample.get(path) for sample in cases]
+    for column in ('status', 'error', 'elapsed', 'cached'):
+        table[column] = [result[column] for result in results]
+    for name in names:
+        table[name] = [result['outputs'].get(name) for result in results]
+
+    return pd.DataFrame(table)
+
+
+def read_base(base):
+    """
+    Read the base data dictionary from a json file or from a function as module:function
+    :param base: path of the json file or module:function
+    :return: data dictionary
+    """
+
+    if base.endswith('.json'):
+        with open(base) as f:
+            return json.load(f)
+
+    module_name, function_name = base.split(':')
+    return getattr(importlib.import_module(module_name), function_name)()
+
+
+def parse_grid(items):
+    """
+    Parse the grid arguments as path=value1,value2,...
+    :param items: list of strings
+    :return: grid dict
+    """
+
+    grid = {}
+    for item in items or []:
+        path, values = item.split('=', 1)
+        grid[path] = [json.loads(value) for value in values.split(',')]
+    return grid
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Run a parameter sweep over a base network.')
+    parser.add_argument('base', help='Path of the json file of the base network or module:function that returns it '
+                                     '(i.e. examples.network_examples:case_pipe).')
+    parser.add_argument('--grid', nargs='+', help='Grid as path=value1,value2,... (cartesian product).')
+    parser.add_argument('--samples', help='Path of a json file with a list of samples {path: value}.')
+    parser.add_argument('--outputs', nargs='+', default=[], help='Patterns of the variables to be collected.')
+    parser.add_argument('--reduction', default='last', choices=['last', 'first', 'max', 'min', 'mean', 'all'],
+                        help='Reduction of the time series of the outputs.')
+    parser.add_argument('--jobs', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('--output', default='sweep.csv', help='Path of the result table (csv or json).')
+    parser.add_argument('--reporting_interval', type=int, default=3600, help='Reporting interval in seconds.')
+    parser.add_argument('--time_horizon', type=int, default=20*24*3600, help='Time horizon in seconds')
+    parser.add_argument('--relative_tolerance', type=float, default=1e-6, help='Relative tolerance for the '
+                                                                               'integration method.')
+    parser.add_argument('--MaxStep', type=float, default=10., help='IDAS.MaxStep parameter.')
+    parser.add_argument('--MaxNumSteps', type=int, default=1000000, help='IDAS.MaxNumSteps parameter.')
+    parser.add_argument('--cache', nargs='?', const='', help='Use the result cache, in the given directory or in '
+                                                             'the default one.')
+
+    args = parser.parse_args()
+
+    samples = None
+    if args.samples:
+        with open(args.samples) as f:
+            samples = json.load(f)
+
+    table = run_sweep(read_base(args.base), grid=parse_grid(args.grid), samples=samples, outputs=args.outputs,
+                      reduction=args.reduction, jobs=args.jobs, reporting_interval=args.reporting_interval,
+                      time_horizon=args.time_horizon, relative_tolerance=args.relative_tolerance,
+                      MaxStep=args.MaxStep, MaxNumSteps=args.MaxNumSteps,
+                      cache=ResultCache(args.cache or None) if args.cache is not None else None)
+
+    if args.output.endswith('.json'):
+        table.to_json(args.output, orient='columns')
+    else:
+        table.to_csv(args.output, index=False)
+
+    print(table[['case', 'status', 'elapsed']])
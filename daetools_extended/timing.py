@@ -0,0 +1,142 @@
+__doc__="""
+Per-phase timing of a simulation: wall time, CPU time and peak resident memory (RSS) of each phase (network parsing,
+node tree, instantiation, DeclareEquations, Initialize, SolveInitial, Run, ...), so it is possible to tell if a slow
+run spends its time in the construction of the model or in the integration.
+"""
+
+import collections
+import contextlib
+import json
+import sys
+import time
+import types
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss():
+    """
+    Peak resident memory of the process
+    :return: bytes or None if not available
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes and macOS bytes
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+class PhaseTimer(object):
+
+    def __init__(self):
+        """
+        Timer of the phases of a simulation. A phase measured many times accumulates its times, and a phase
+        measured inside another one (i.e. DeclareEquations inside Initialize) records it as within.
+        """
+
+        self.phases = collections.OrderedDict()
+        self.stack = []
+        self.depth = 0
+
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Measure a phase:
+
+        with timer.phase('SolveInitial'):
+            simulation.SolveInitial()
+
+        :param name: name of the phase
+        """
+
+        within = self.stack[-1] if self.stack else None
+        record = self.phases.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'peak_rss': None, 'calls': 0,
+                                               'within': within})
+        self.stack.append(name)
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield
+        finally:
+            self.stack.pop()
+            record['wall'] += time.perf_counter() - wall
+            record['cpu'] += time.process_time() - cpu
+            record['peak_rss'] = get_peak_rss()
+            record['calls'] += 1
+
+
+    def wrap_declare_equations(self, model):
+        """
+        Measure the DeclareEquations of the model and of its submodels as one phase. DaeTools calls the
+        DeclareEquations of the submodels from the one of their parent, so only the outermost call is measured.
+        :param model: root model
+        :return:
+        """
+
+        timer = self
+        declare_equations = model.DeclareEquations
+
+        def DeclareEquations(self):
+            timer.depth += 1
+            try:
+                if timer.depth == 1:
+                    with timer.phase('DeclareEquations'):
+                        declare_equations()
+                else:
+                    declare_equations()
+            finally:
+                timer.depth -= 1
+
+        # A bound method, so it is taken as the override of the DaeTools base method
+        model.DeclareEquations = types.MethodType(DeclareEquations, model)
+
+        for submodel in getattr(model, 'submodels', {}).values():
+            self.wrap_declare_equations(submodel)
+
+
+    def to_dict(self):
+
+        return {
+            'phases': self.phases,
+            'total': {
+                'wall': sum(record['wall'] for record in self.phases.values() if not record['within']),
+                'cpu': sum(record['cpu'] for record in self.phases.values() if not record['within']),
+                'peak_rss': get_peak_rss(),
+            },
+        }
+
+
+    def write(self, path, **extra):
+        """
+        Write the report as JSON
+        :param path: path of the report
+        :param extra: other items of the report (i.e. number of equations)
+        :return:
+        """
+
+        report = self.to_dict()
+        report.update(extra)
+
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+    def print_report(self):
+
+        print('{0:<28} {1:>10} {2:>10} {3:>12}'.format('phase', 'wall [s]', 'cpu [s]', 'peak RSS [MB]'))
+        for name, record in self.phases.items():
+            if record['within']:
+                name = '  ' + name
+            rss = record['peak_rss'] / 1024 ** 2 if record['peak_rss'] is not None else float('nan')
+            print('{0:<28} {1:10.3f} {2:10.3f} {3:12.1f}'.format(name, record['wall'], record['cpu'], rss))
@@ -4,6 +4,8 @@ Extra tools for the daemode_extended module.
 
 import numpy as np
 import importlib
+import fnmatch
+import functools
 from copy import copy
 
 
@@ -111,6 +113,29 @@ def execute_recursive_method(obj, method_, subobj_name='submodels'):
             execute_recursive_method(obj_i, method_,subobj_name=subobj_name)
 
 
+def get_variables(model, patterns=('*',), prefix=''):
+    """
+    Recursively collects the variables of a model and its submodels whose names match the patterns
+    :param model: model
+    :param patterns: list of fnmatch patterns of the variable name relative to the model (i.e. '*.T' or 'pipe_*.P')
+    :param prefix: prefix of the relative name, used by the recursion
+    :return: list of tuples (relative name, variable)
+    """
+
+    variables = []
+
+    for variable in model.Variables:
+        name = prefix + variable.Name
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+            variables.append((name, variable))
+
+    if hasattr(model, 'submodels'):
+        for submodel_name, submodel in model.submodels.items():
+            variables += get_variables(submodel, patterns, prefix="{0}{1}.".format(prefix, submodel_name))
+
+    return variables
+
+
 def get_initialdata_from_reporter(datareporter):
     """
     Get name, time and data for the variablens in the DaeTools datareporter
@@ -195,3 +220,80 @@ def distribute_on_domains(domains, eq, eKind):
         return domains_list
     else:
         return eq.DistributeOnDomain(domains, eKind)
+
+
+class AliasVariable(object):
+
+    def __init__(self, name, expression, domains=()):
+        """
+        Replacement of a variable eliminated because its equation is an alias (variable = expression). It is called
+        with the same indexes of the variable and returns the expression, so the equations that use the variable are
+        written the same and the solver does not see the variable nor its equation.
+        :param name: name of the variable
+        :param expression: callable with the indexes of the variable returning the expression
+        :param domains: domains of the variable
+        """
+
+        self.Name = name
+        self.expression = expression
+        self.Domains = list(domains)
+
+
+    def __call__(self, *indexes):
+
+        return self.expression(*indexes)
+
+
+    @property
+    def NumberOfPoints(self):
+
+        return int(np.prod([domain.NumberOfPoints for domain in self.Domains]))
+
+
+def is_alias(model, method_name):
+    """
+    Check if the equation declared by a method of a model is eliminated as an alias
+    :param model: model
+    :param method_name: name of the method that declares the equation
+    :return: True if the model eliminates the aliases and the method resolved by its class (i.e. the override of a
+    subclass) is decorated with alias_equation
+    """
+
+    return bool(getattr(model, 'eliminate_aliases', False) and
+                getattr(getattr(type(model), method_name, None), 'alias', False))
+
+
+def alias_equation(method):
+    """
+    Decorator of the methods that declare an alias equation (variable = expression). When the model eliminates the
+    aliases (see daeModelExtended.is_alias) the equation is not declared, as its variable is an AliasVariable.
+    :param method: method that declares the equation
+    :return: decorated method
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.is_alias(method.__name__):
+            return None
+        return method(self, *args, **kwargs)
+
+    wrapper.alias = True
+
+    return wrapper
+
+
+def get_aliases(model, prefix=''):
+    """
+    Recursively collects the eliminated alias variables of a model and its submodels
+    :param model: model
+    :param prefix: prefix of the relative name, used by the recursion
+    :return: list of tuples (relative name, AliasVariable)
+    """
+
+    aliases = [(prefix + name, alias) for name, alias in getattr(model, 'aliases', {}).items()]
+
+    if hasattr(model, 'submodels'):
+        for submodel_name, submodel in model.submodels.items():
+            aliases += get_aliases(submodel, prefix="{0}{1}.".format(prefix, submodel_name))
+
+    return aliases
@@ -0,0 +1,345 @@
+__doc__ = """
+Generator of synthetic networks for scaling studies. The edges are copies of the single edge cases of the
+network_examples module (so their parameters are the validated ones) connected in one of the topologies:
+
+* series: a chain of n edges
+* parallel: a bundle of n edges between the same two nodes
+* ladder: two rails joined by rungs, flowing from the top rail to the bottom one
+* grid: a meshed grid flowing right and down, from the top-left corner to the bottom-right one
+* tree: a tree of the given branching, from the root to the leaves
+
+The first node is a Source with the pressure specified and the last nodes (the outlets) are Sinks with the pressure
+specified. The internal junctions are Sinks with no external flow (w = 0). The initial guesses are propagated
+through the network: the flow is split evenly at each junction, the pressure drops with the square of the flow and
+the heated edges warm up inversely to their flow.
+
+python -m examples.network_generator series 10 --model BiofilmedPipe --N 20 --output series_10.json
+"""
+
+import argparse
+import json
+from copy import deepcopy
+
+import examples.network_examples as ex
+
+
+# Class of the edge: case of network_examples used as template
+TEMPLATES = {
+    'Pipe': ex.case_pipe,
+    'FixedExternalTemperaturePipe': ex.case_fixed_external_temperature_pipe,
+    'FixedExternalConvectionPipe': ex.case_fixed_external_convection_pipe,
+    'ExternalFilmCondensationPipe': ex.case_external_film_condensation_pipe,
+    'BiofilmedPipe': ex.case_biofilmed_pipe,
+    'BiofilmedFixedExternalConvectionPipe': ex.case_biofilmed_fixed_external_convection_pipe,
+    'BiofilmedExternalFilmCondPipe': ex.case_biofilmed_external_film_cond_pipe,
+    'ExternalFilmCondensationTubeArrange': ex.case_external_film_condensation_tube_arrange,
+    'BiofilmedExternalFilmCondTubeArrange': ex.case_biofilmed_external_film_cond_tube_arrange,
+}
+
+TOPOLOGIES = ['series', 'parallel', 'ladder', 'grid', 'tree']
+
+# Upper bound of the guessed temperatures, below the bound of the water temperature type
+T_MAX = 368.15
+
+
+def get_template(class_name):
+    """
+    Get the edge and the operating point of a template case
+    :param class_name: class of the edge
+    :return: tuple with the edge data, the flow, the pressures and the temperatures at the inlet and outlet nodes
+    """
+
+    case = TEMPLATES[class_name]()
+    submodels = case['submodels']
+
+    edge = [submodel for submodel in submodels.values() if submodel['kind'] == 'edge'][0]
+    source = submodels[edge['from']]
+    sink = submodels[edge['to']]
+
+    return (edge, edge['initial_guess']['k'], source['specifications']['P'], sink['specifications']['P'],
+            source['parameters']['Text'], sink['parameters']['Text'])
+
+
+def series(n):
+    """
+    :return: tuple with the number of nodes and the list of edges (from, to)
+    """
+
+    return n + 1, [(i, i + 1) for i in range(n)]
+
+
+def parallel(n):
+
+    return 2, [(0, 1)] * n
+
+
+def ladder(n):
+
+    # rungs + 2 * (rungs - 1) edges, the closest to n
+    rungs = max(1, int(round((n + 2) / 3.)))
+    edges = []
+    for i in range(rungs):
+        edges.append((i, rungs + i))
+        if i < rungs - 1:
+            edges.append((i, i + 1))
+            edges.append((rungs + i, rungs + i + 1))
+
+    return 2 * rungs, edges
+
+
+def grid(n):
+
+    # 2 * rows * (rows - 1) edges of a square grid, the closest to n
+    rows = 2
+    while abs(2 * (rows + 1) * rows - n) < abs(2 * rows * (rows - 1) - n):
+        rows += 1
+
+    edges = []
+    for i in range(rows):
+        for j in range(rows):
+            node = i * rows + j
+            if j < rows - 1:
+                edges.append((node, node + 1))
+            if i < rows - 1:
+                edges.append((node, node + rows))
+
+    return rows * rows, edges
+
+
+def tree(n, branching=2):
+
+    edges = []
+    parent = 0
+    while len(edges) < n:
+        for i in range(branching):
+            if len(edges) < n:
+                edges.append((parent, len(edges) + 1))
+        parent += 1
+
+    return n + 1, edges
+
+
+def propagate(n_nodes, edges, q, p1, t1, dp, dt):
+    """
+    Propagate the guesses of flow, pressure and temperature from the source (node 0) in topological order
+    :param n_nodes: number of nodes
+    :param edges: list of edges (from, to)
+    :param q: flow of the source
+    :param p1: pressure of the source
+    :param t1: temperature of the source
+    :param dp: list of the pressure drops of the edges at the flow q
+    :param dt: list of the temperature rises of the edges at the flow q
+    :return: tuple with the lists of the flow of the edges, and the pressure, temperature and inflow of the nodes
+    """
+
+    outgoing = [[] for i in range(n_nodes)]
+    incoming = [[] for i in range(n_nodes)]
+    for e, (a, b) in enumerate(edges):
+        outgoing[a].append(e)
+        incoming[b].append(e)
+
+    flows = [0.0] * len(edges)
+    inflow = [0.0] * n_nodes
+    pressures = [p1] * n_nodes
+    temperatures = [t1] * n_nodes
+    inflow[0] = q
+
+    # The nodes are numbered in topological order by the topologies
+    for node in range(n_nodes):
+
+        if incoming[node]:
+            inflow[node] = sum(flows[e] for e in incoming[node])
+            weights = [flows[e] for e in incoming[node]]
+            drops = [pressures[edges[e][0]] - dp[e] * (flows[e] / q) ** 2 for e in incoming[node]]
+            rises = [min(temperatures[edges[e][0]] + dt[e] * q / max(flows[e], 1e-6 * q), T_MAX)
+                     for e in incoming[node]]
+            pressures[node] = sum(w * p for w, p in zip(weights, drops)) / sum(weights)
+            temperatures[node] = sum(w * t for w, t in zip(weights, rises)) / sum(weights)
+
+        for e in outgoing[node]:
+            flows[e] = inflow[node] / len(outgoing[node])
+
+    return flows, pressures, temperatures, inflow
+
+
+def scale_profile(guess, initial, final):
+
+    if isinstance(guess, dict):
+        guess = dict(guess)
+        guess['initial'] = initial
+        guess['final'] = final
+        return guess
+
+    return 0.5 * (initial + final)
+
+
+def get_edge(template, q, k, p_from, p_to, t_from, t_to, dp_in, dp_out, N=None, Ny=None):
+    """
+    Edge data from the template with the guesses of its operating point
+    :param template: edge data of the template
+    :param q: flow of the template
+    :param k: flow of the edge
+    :param p_from: pressure of the inlet node
+    :param p_to: pressure of the outlet node
+    :param t_from: temperature of the inlet node
+    :param t_to: temperature of the outlet node
+    :param dp_in: concentrated pressure loss at the inlet of the template
+    :param dp_out: concentrated pressure loss at the outlet of the template
+    :param N: number of points of the x domain, as in the template if None
+    :param Ny: number of tubes (y domain) of the tube arrangements, as in the template if None
+    :return: edge data
+    """
+
+    edge = deepcopy(template)
+
+    if N:
+        edge['domains']['x']['N'] = N
+
+    ny = 1
+    if 'y' in edge.get('domains', {}):
+        if Ny:
+            edge['domains']['y']['N'] = Ny
+            for name, value in edge['parameters'].items():
+                if isinstance(value, list):
+                    edge['parameters'][name] = [value[0]] * Ny
+        ny = edge['domains']['y']['N']
+
+    ratio = k / q
+    guess = edge['initial_guess']
+
+    guess['k'] = k / ny
+    for name in ('v', 'Re'):
+        if name in guess:
+            guess[name] = guess[name] * ratio / ny
+
+    loss = ratio ** 2
+    guess['P'] = scale_profile(guess['P'], p_from - dp_in * loss, p_to + dp_out * loss)
+
+    if isinstance(guess.get('T'), dict):
+        guess['T'] = scale_profile(guess['T'], t_from, t_to)
+    else:
+        guess['T'] = t_from
+
+    return edge
+
+
+def get_node(class_name, specifications, P, T, w, position):
+
+    return {
+        'kind': 'node',
+        'module': 'models.{0}'.format(class_name.lower()),
+        'class': class_name,
+        'specifications': specifications,
+        'parameters': {
+            'Text': T,
+            'Pext': P,
+            'x': float(position[0]),
+            'y': float(position[1]),
+            'z': 0.0
+        },
+        'initial_guess': {
+            'w': w,
+            'T': T,
+            'P': P,
+        }
+    }
+
+
+def generate_network(topology, n, model='Pipe', N=None, Ny=None, branching=2, name=None):
+    """
+    Generate the data dictionary of a network
+    :param topology: one of TOPOLOGIES
+    :param n: number of edges (ladder and grid use the closest size they can have)
+    :param model: class of the edges (see TEMPLATES) or list of classes used in turn
+    :param N: number of points of the x domain of the edges, as in the template if None
+    :param Ny: number of tubes of the tube arrangements, as in the template if None
+    :param branching: branching of the tree topology
+    :param name: name of the network
+    :return: data dictionary
+    """
+
+    if topology == 'tree':
+        n_nodes, edges = tree(n, branching)
+    elif topology in TOPOLOGIES:
+        n_nodes, edges = globals()[topology](n)
+    else:
+        raise ValueError("Unknown topology {0}, it must be one of {1}".format(topology, TOPOLOGIES))
+
+    models = [model] if isinstance(model, str) else list(model)
+    templates = {class_name: get_template(class_name) for class_name in set(models)}
+    edge_templates = [templates[models[e % len(models)]] for e in range(len(edges))]
+
+    # The operating point of the source is the one of the first template, the drops and rises of each edge are the
+    # ones of its own template (no rise if its template has a uniform temperature)
+    template, q, p1, p2, t1, t2 = templates[models[0]]
+    dp = [p1_e - p2_e for template_e, q_e, p1_e, p2_e, t1_e, t2_e in edge_templates]
+    dt = [t2_e - t1_e if isinstance(template_e['initial_guess'].get('T'), dict) else 0.0
+          for template_e, q_e, p1_e, p2_e, t1_e, t2_e in edge_templates]
+    flows, pressures, temperatures, inflow = propagate(n_nodes, edges, q, p1, t1, dp, dt)
+
+    outlets = [node for node in range(n_nodes) if not any(a == node for a, b in edges)]
+
+    name = name or 'network_{0}_{1}'.format(topology, len(edges))
+
+    submodels = {}
+    width = max(1, int(round(n_nodes ** 0.5)))
+
+    for node in range(n_nodes):
+
+        node_name = 'node_{0:04d}'.format(node)
+        position = (node % width, node // width)
+
+        if node == 0:
+            submodels[node_name] = get_node('Source', {'P': pressures[0]}, pressures[0], t1, q, position)
+        elif node in outlets:
+            submodels[node_name] = get_node('Sink', {'P': pressures[node]}, pressures[node], temperatures[node],
+                                            inflow[node], position)
+        else:
+            submodels[node_name] = get_node('Sink', {'w': 0.0}, pressures[node], temperatures[node], 0.0, position)
+
+    for e, (a, b) in enumerate(edges):
+
+        template_e, q_e, p1_e, p2_e, t1_e, t2_e = edge_templates[e]
+
+        guess_p = template_e['initial_guess']['P']
+        dp_in = p1_e - guess_p['initial'] if isinstance(guess_p, dict) else 0.0
+        dp_out = guess_p['final'] - p2_e if isinstance(guess_p, dict) else 0.0
+
+        edge = get_edge(template_e, q_e, flows[e], pressures[a], pressures[b], temperatures[a], temperatures[b],
+                        dp_in, dp_out, N=N, Ny=Ny)
+        edge['from'] = 'node_{0:04d}'.format(a)
+        edge['to'] = 'node_{0:04d}'.format(b)
+
+        submodels['pipe_{0:04d}'.format(e)] = edge
+
+    return {
+        'name': name,
+        'kind': 'network',
+        'submodels': submodels,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Generate the json data of a synthetic network.')
+    parser.add_argument('topology', choices=TOPOLOGIES, help='Topology of the network.')
+    parser.add_argument('n', type=int, help='Number of edges.')
+    parser.add_argument('--model', nargs='+', default=['Pipe'], choices=sorted(TEMPLATES),
+                        help='Classes of the edges, used in turn.')
+    parser.add_argument('--N', type=int, help='Number of points of the x domain of the edges.')
+    parser.add_argument('--Ny', type=int, help='Number of tubes of the tube arrangements.')
+    parser.add_argument('--branching', type=int, default=2, help='Branching of the tree topology.')
+    parser.add_argument('--name', help='Name of the network.')
+    parser.add_argument('--output', help='Path of the json file (default is network_<topology>_<n>.json).')
+
+    args = parser.parse_args()
+
+    data = generate_network(args.topology, args.n, model=args.model, N=args.N, Ny=args.Ny,
+                            branching=args.branching, name=args.name)
+
+    output = args.output or '{0}.json'.format(data['name'])
+    with open(output, 'w') as f:
+        json.dump(data, f, indent=2)
+
+    n_edges = len([submodel for submodel in data['submodels'].values() if submodel['kind'] == 'edge'])
+    print("{0} edges written to {1}".format(n_edges, output))
@@ -29,8 +29,18 @@ class Biofilm(daeModelExtended):
         rate_t = daeVariableType("rate_t", (kg ** (1)) * (m ** (-2)) * (day ** (-1)), 1e-9, 1e+04, 0.2, 1e-06)
 
         self.mf = daeVariable("mf", mass_biofilm_t, self, "Biofilm Mass per Area", self.Domains)
-        self.Tbf = daeVariable("Tbf", temperature_t, self, "Temperature of Biofilm", self.Domains)
-        self.vbf = daeVariable("vbf", velocity_t, self, "Velocity over Biofilm", self.Domains)
+
+        # The temperature and the velocity over the biofilm are the ones of the fluid in some pipes
+        if self.is_alias('eq_biofilm_temperature'):
+            self.Tbf = self.define_alias("Tbf", self.T, self.Domains)
+        else:
+            self.Tbf = daeVariable("Tbf", temperature_t, self, "Temperature of Biofilm", self.Domains)
+
+        if self.is_alias('eq_biofilm_velocity'):
+            self.vbf = self.define_alias("vbf", self.v, self.Domains)
+        else:
+            self.vbf = daeVariable("vbf", velocity_t, self, "Velocity over Biofilm", self.Domains)
+
         self.Jp = daeVariable("Jp", rate_t, self, "Biofilm formation specific formation rate", self.Domains)
         self.b = daeVariable("b", b_t, self, "Biofilm formation specific removal rate", self.Domains)
         self.ratef = daeVariable("ratef", rate_t, self, "Biofilm formation specific removal rate", self.Domains)
@@ -100,7 +110,7 @@ class Biofilm(daeModelExtended):
 
     def eq_biofilm(self):
 
-        self.IF(Time() < self.lagt, eventTolerance=1E-5)
+        self.IF(Time() < self.lagt - Constant(self.time_offset * s), eventTolerance=1E-5)
 
         eq = self.CreateEquation("BiofilmOFF", "Biofilm - OFF")
         domains = distribute_on_domains(self.Domains, eq, eClosedClosed)
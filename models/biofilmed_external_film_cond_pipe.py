@@ -15,7 +15,7 @@ except:
     from .external_film_condensation_pipe import ExternalFilmCondensationPipe
     from .biofilm import Biofilm
 
-from daetools_extended.tools import get_node_tree, execute_recursive_method, get_initialdata_from_reporter, update_initialdata
+from daetools_extended.tools import get_node_tree, execute_recursive_method, get_initialdata_from_reporter, update_initialdata, alias_equation
 
 class BiofilmedExternalFilmCondPipe(Biofilm, ExternalFilmCondensationPipe):
 
@@ -47,6 +47,7 @@ class BiofilmedExternalFilmCondPipe(Biofilm, ExternalFilmCondensationPipe):
         eq.Residual = self.Resistance(x) - (Resint + Reswall + Resext + Resfilm)
 
 
+    @alias_equation
     def eq_biofilm_temperature(self):
 
         eq = self.CreateEquation("Tbf", "Biofilm Temperature")
@@ -55,6 +56,7 @@ class BiofilmedExternalFilmCondPipe(Biofilm, ExternalFilmCondensationPipe):
         eq.Residual = self.T(x) - self.Tbf(x)
 
 
+    @alias_equation
     def eq_biofilm_velocity(self):
 
         eq = self.CreateEquation("vbf", "Biofilm Velocity")
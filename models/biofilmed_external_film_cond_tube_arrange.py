@@ -17,6 +17,8 @@ except:
 
 from water_properties import conductivity
 
+from daetools_extended.tools import alias_equation
+
 
 class BiofilmedExternalFilmCondensationTubeArrange(Biofilm, ExternalFilmCondensationTubeArrange):
 
@@ -58,6 +60,7 @@ class BiofilmedExternalFilmCondensationTubeArrange(Biofilm, ExternalFilmCondensa
         eq.Residual = self.Resistance(x,y) - (Resint + Reswall + Resext + Resfilm)
 
 
+    @alias_equation
     def eq_biofilm_temperature(self):
 
         eq = self.CreateEquation("Tbf", "Biofilm Temperature")
@@ -66,6 +69,7 @@ class BiofilmedExternalFilmCondensationTubeArrange(Biofilm, ExternalFilmCondensa
         #eq.Residual = self.Qout(x) - (self.T(x) - self.Tbf(x)) * (self.pi * self.D(x) * self.hint(x))
         eq.Residual = self.T(x, y) - self.Tbf(x, y)
 
+    @alias_equation
     def eq_biofilm_velocity(self):
 
         eq = self.CreateEquation("vbf", "Biofilm Velocity")
@@ -12,6 +12,8 @@ except:
     from .fixed_external_convection_pipe import FixedExternalConvectionPipe
     from .biofilm import Biofilm
 
+from daetools_extended.tools import alias_equation
+
 
 class BiofilmedFixedExternalConvectionPipe(Biofilm, FixedExternalConvectionPipe):
 
@@ -51,6 +53,7 @@ class BiofilmedFixedExternalConvectionPipe(Biofilm, FixedExternalConvectionPipe)
         eq.Residual = self.Qout(x) - (self.T(x) - self.Tbf(x)) * (self.pi * self.D(x) * self.hint(x))
 
 
+    @alias_equation
     def eq_biofilm_velocity(self):
 
         eq = self.CreateEquation("vbf", "Biofilm Velocity")
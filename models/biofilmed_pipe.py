@@ -13,6 +13,8 @@ except:
     from .pipe import Pipe
     from .biofilm import Biofilm
 
+from daetools_extended.tools import alias_equation
+
 
 class BiofilmedPipe(Biofilm, Pipe):
 
@@ -28,6 +30,7 @@ class BiofilmedPipe(Biofilm, Pipe):
         eq.Residual = self.D(x) - (self.Di() ** 2 - 4 * self.mf(x) * self.Di() / self.rhomf()) ** 0.5
 
 
+    @alias_equation
     def eq_biofilm_temperature(self):
 
         eq = self.CreateEquation("Tbf", "Biofilm Temperature")
@@ -36,6 +39,7 @@ class BiofilmedPipe(Biofilm, Pipe):
         eq.Residual = self.T(x) - self.Tbf(x)
 
 
+    @alias_equation
     def eq_biofilm_velocity(self):
         eq = self.CreateEquation("vbf", "Biofilm Velocity")
         x = eq.DistributeOnDomain(self.x, eClosedClosed)
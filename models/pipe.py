@@ -33,7 +33,7 @@ except:
 
 from water_properties import density, viscosity, conductivity, heat_capacity
 
-from daetools_extended.tools import daeVariable_wrapper, distribute_on_domains
+from daetools_extended.tools import daeVariable_wrapper, distribute_on_domains, alias_equation
 
 from scipy.constants import g as gravity
 from scipy.constants import pi
@@ -103,9 +103,18 @@ class Pipe(Edge):
         # Secondary variables
         self.H = daeVariable("H", power_t, self, "Fluid Entalphy", self.Domains)
         self.fD = daeVariable("fD", darcy_t, self, "Darcy friction factor", self.Domains)
-        self.D = daeVariable("D", diameter_t, self, "Internal flow diameter", self.Domains)
         self.v = daeVariable("v", velocity_t, self, "Internal flow velocity", self.Domains)
-        self.Qout = daeVariable("Qout", heat_per_length_t, self, "Mass loss per length", self.Domains)
+
+        # The diameter and the heat loss of the pipes without biofilm and without heat exchange are aliases
+        if self.is_alias('eq_internal_diameter'):
+            self.D = self.define_alias("D", lambda *indexes: self.Di(), self.Domains)
+        else:
+            self.D = daeVariable("D", diameter_t, self, "Internal flow diameter", self.Domains)
+
+        if self.is_alias('eq_total_he'):
+            self.Qout = self.define_alias("Qout", lambda *indexes: Constant(0 * J / m / s), self.Domains)
+        else:
+            self.Qout = daeVariable("Qout", heat_per_length_t, self, "Mass loss per length", self.Domains)
 
 
         # Fluid Properties
@@ -120,7 +129,11 @@ class Pipe(Edge):
 
         # Bounds
         self.klb = daeVariable("klb", mass_flowrate_t, self, "Lower Bound Mass flowrate")
-        self.kub = daeVariable("kub", mass_flowrate_t, self, "Upper Bound Mass flowrate")
+        # Both bounds are the total flowrate
+        if self.is_alias('eq_upperbound_flowrate'):
+            self.kub = self.define_alias("kub", self.klb)
+        else:
+            self.kub = daeVariable("kub", mass_flowrate_t, self, "Upper Bound Mass flowrate")
         self.Hub = daeVariable("Hub", power_t, self, "Upper Bound Fluid Enthalpy")
         self.Hlb = daeVariable("Hlb", power_t, self, "Lower Bound Fluid Enthalpy")
         self.dPlb = daeVariable("dPlb", delta_pressure_t, self, "Lower Bound Concentrated Pressure Loss", self.YDomains)
@@ -167,6 +180,7 @@ class Pipe(Edge):
         eq.Residual = k * cp * T - H
 
 
+    @alias_equation
     def eq_internal_diameter(self):
 
         eq = self.CreateEquation("D", "D_internal_flow_diameter")
@@ -230,6 +244,7 @@ class Pipe(Edge):
             eq.Residual = klb - k * Npipes
 
 
+    @alias_equation
     def eq_upperbound_flowrate(self):
 
         eq = self.CreateEquation("UpperBoundLowrate", "Upper Bound Flowrate")
@@ -369,6 +384,7 @@ class Pipe(Edge):
         eq.Residual = dt(rho * cp * A * T) + k * d( cp * T, self.x, eCFDM) / L + Qout
 
 
+    @alias_equation
     def eq_total_he(self):
         eq = self.CreateEquation("TotalHeat", "Heat balance - Qout")
         domains = distribute_on_domains(self.Domains, eq, eClosedClosed)
@@ -1,12 +1,37 @@
 
 # Before you have to run:
 # python -m daetools.dae_plotter.plotter &
+#
+# To simulate many networks at once (directory, glob or JSON Lines file):
+# python simulate.py batch cases/ --jobs 4 --format csv
+#
+# To follow a run without the GUI (i.e. on a headless server), publish it in shared memory and attach a monitor:
+# python simulate.py network.json --format shm --output daetools_monitor &
+# python -m daetools_extended.monitor daetools_monitor --variables "*.T"
+#
+# To choose the fastest evaluation mode of the equations once per network structure and reuse it:
+# python simulate.py tune network.json
+# python simulate.py network.json --format daeres --evaluation_mode auto
+#
+# To export a network to compiled C++ code (or to an FMU with --target fmi), cached by its content, and run it:
+# python simulate.py compile network.json --target cxx --run
+#
+# To seed the initial solution by solving each node and its outlet edges along the flow before the global one:
+# python simulate.py network.json --format daeres --initialization sequential
 
 import argparse
+import os
+import sys
 
 from daetools.pyDAE import *
 from daetools.pyDAE.data_reporters import *
 from daetools_extended.daesimulation_extended import daeSimulationExtended
+from daetools_extended import runner, batch, evaluation_mode, compiler
+from daetools_extended.checkpoint import read_checkpoint
+from daetools_extended.cache import ResultCache, get_key
+from daetools_extended.timing import PhaseTimer
+from daetools_extended.tools import get_aliases
+from daetools_extended.initialization import initialize_sequential
 
 
 def read_data(args):
@@ -19,7 +44,7 @@ def configure(args):
     cfg.SetBoolean('daetools.activity.printHeader', False)
     cfg.SetFloat('daetools.IDAS.MaxStep',args.MaxStep)
     cfg.SetFloat('daetools.IDAS.relativeTolerance',args.relative_tolerance)
-    cfg.GetInteger('daetools.IDAS.MaxNumSteps',args.MaxNumSteps)
+    cfg.SetInteger('daetools.IDAS.MaxNumSteps',args.MaxNumSteps)
     return cfg
 
 
@@ -73,24 +98,10 @@ def convert_to_xhtml(infile, outfile, xslfile):
 
 
 
-def get_reporter(args):
+def get_reporter(args, data):
 
-    if args.format == 'json':
-        dr = daeJSONFileDataReporter()
-    elif args.format == 'xml':
-        dr = daeXMLFileDataReporter()
-    elif args.format == 'mat':
-        dr = daeMatlabMATFileDataReporter()
-    elif args.format == 'xslx':
-        dr = daeExcelFileDataReporter()
-    elif args.format == 'vtk':
-        dr = daeVTKDataReporter()
-    elif args.format == 'csv':
-        dr = daeCSVFileDataReporter()
-    else:
-        dr = None
-
-    return dr
+    return runner.get_reporter(args.format, data=data, kpi_field=args.kpi_field,
+                               kpi_field_decimation=args.kpi_field_decimation)
 
 
 def get_name(args, data):
@@ -103,8 +114,109 @@ def get_name(args, data):
     return simName
 
 
+def get_steady_state(args):
+
+    if not args.steady_state:
+        return None
+
+    return {
+        'variables': args.steady_state,
+        'atol': args.steady_state_atol,
+        'rtol': args.steady_state_rtol,
+        'window': args.steady_state_window,
+        'action': args.steady_state_action,
+        'coarse_interval': args.coarse_interval,
+    }
+
+
+def get_adaptive_reporting(args):
+
+    if not args.adaptive_reporting:
+        return None
+
+    return {
+        'variables': args.adaptive_reporting,
+        'rtol': args.adaptive_rtol,
+        'atol': args.adaptive_atol,
+        'min_interval': args.min_reporting_interval,
+        'max_interval': args.max_reporting_interval,
+    }
+
+
+def get_output_paths(args):
+
+    # The output and the sidecar files of the binary and kpi formats
+    base, extension = os.path.splitext(args.output)
+    return [args.output, args.output + '.blocks', '{0}.field{1}'.format(base, extension)]
+
+
+def get_cache(args, data):
+
+    if args.cache is None or args.format in ('gui', 'shm') or args.resume:
+        return None, None
+
+    # Every option that changes the results, but not where they are written
+    ignored = ('input', 'output', 'cache', 'checkpoint', 'checkpoint_interval', 'resume', 'evaluation_mode',
+               'threads')
+    options = {key: value for key, value in vars(args).items() if key not in ignored}
+
+    return ResultCache(args.cache or None), get_key(data, options)
+
+
+def get_evaluation_mode(args, data):
+
+    if args.evaluation_mode == 'default':
+        return None
+
+    if args.evaluation_mode == 'auto':
+        return evaluation_mode.get_or_tune(data, relative_tolerance=args.relative_tolerance, MaxStep=args.MaxStep,
+                                           MaxNumSteps=args.MaxNumSteps)
+
+    return {'mode': args.evaluation_mode, 'threads': args.threads}
+
+
+def print_aliases(simulation):
+
+    aliases = get_aliases(simulation.m)
+    if not aliases:
+        return
+
+    # Each eliminated point is a variable and its equation
+    eliminated = sum(alias.NumberOfPoints for name, alias in aliases)
+    print("Eliminated aliases", eliminated, "({0:.1f}% of the system, {1} distributed variables)".format(
+        100. * eliminated / (simulation.NumberOfEquations + eliminated), len(aliases)))
+
+
+def get_checkpoint(args):
+
+    if not args.checkpoint:
+        args.checkpoint = '{0}.checkpoint'.format(args.input)
+
+    checkpoint = None
+    if args.checkpoint_interval > 0:
+        checkpoint = {'path': args.checkpoint, 'interval': args.checkpoint_interval}
+
+    resume = None
+    if args.resume:
+        resume = read_checkpoint(args.checkpoint)
+
+    return checkpoint, resume
+
+
+SUBCOMMANDS = {
+    'batch': batch.main,
+    'tune': evaluation_mode.main,
+    'compile': compiler.main,
+}
+
+
 if __name__ == "__main__":
 
+    # Subcommands, i.e.: python simulate.py batch cases/ --jobs 4
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        sys.exit()
+
     parser = argparse.ArgumentParser(description='Simulate a model according to DAETOOLS based on a json data. '
                                                  'It is necessary to have an openned dae_plotter thread before '
                                                  'executing. For that, please execute the following command:  '
@@ -112,8 +224,12 @@ if __name__ == "__main__":
     parser.add_argument('input', help='Path of the json input file.')
     parser.add_argument('--format', default='gui', help='Format of output, where gui is actually '
                                                         'a graphical interface.',
-                        choices=['gui', 'json', 'xml', 'mat','vtk','xlsx','csv'])
-    parser.add_argument('--output', help='Path to the output file (not used if format is gui).')
+                        choices=['gui', 'json', 'xml', 'mat','vtk','xlsx','csv', 'npz', 'h5', 'jsonl', 'daeres', 'shm', 'kpi'])
+    parser.add_argument('--output', help='Path to the output file (not used if format is gui). Name of the shared '
+                                         'memory block if format is shm.')
+    parser.add_argument('--kpi_field', nargs='+', help='Patterns of the variables (i.e. "*.T") also written in full '
+                                                       'with the kpi format, every kpi_field_decimation reports.')
+    parser.add_argument('--kpi_field_decimation', type=int, default=10, help='Decimation of the kpi field.')
     parser.add_argument('--name', help='Simulation name.')
     parser.add_argument('--reporting_interval', type=int, default= 3600, help='Reporting interval in seconds.')
     parser.add_argument('--time_horizon', type=int, default= 20*24*3600, help='Time horizon in seconds')
@@ -121,26 +237,113 @@ if __name__ == "__main__":
                                                                                 'method.')
     parser.add_argument('--MaxStep', type=int, default= 10., help='IDAS.MaxStep parameter.')
     parser.add_argument('--MaxNumSteps', type=int, default= 1000000, help='IDAS.MaxNumSteps parameter.')
+    parser.add_argument('--steady_state', nargs='+', help='Patterns of the variables monitored to detect the steady '
+                                                          'state (i.e. "*.T" "*.P").')
+    parser.add_argument('--steady_state_atol', type=float, default=1e-8, help='Absolute tolerance of the time '
+                                                                              'derivatives at steady state.')
+    parser.add_argument('--steady_state_rtol', type=float, default=1e-8, help='Relative tolerance of the time '
+                                                                              'derivatives at steady state.')
+    parser.add_argument('--steady_state_window', type=float, default=3600., help='Time in seconds the derivatives '
+                                                                                 'must stay below the tolerance.')
+    parser.add_argument('--steady_state_action', default='stop', choices=['stop', 'coarse'],
+                        help='Stop the run or switch to the coarse reporting interval at steady state.')
+    parser.add_argument('--coarse_interval', type=int, default=24*3600, help='Reporting interval in seconds after '
+                                                                             'the steady state.')
+    parser.add_argument('--checkpoint_interval', type=int, default=0, help='Interval in seconds between checkpoints '
+                                                                           '(0 disables them).')
+    parser.add_argument('--checkpoint', help='Path of the checkpoint directory (default is input.checkpoint).')
+    parser.add_argument('--resume', action='store_true', help='Resume the simulation from the latest checkpoint.')
+    parser.add_argument('--adaptive_reporting', nargs='+', help='Patterns of the variables whose changes trigger a '
+                                                                'report (replaces the fixed reporting interval).')
+    parser.add_argument('--adaptive_rtol', type=float, default=1e-3, help='Relative change that triggers a report.')
+    parser.add_argument('--adaptive_atol', type=float, default=0.0, help='Absolute change that triggers a report.')
+    parser.add_argument('--min_reporting_interval', type=int, default=60, help='Minimum interval in seconds between '
+                                                                               'adaptive reports.')
+    parser.add_argument('--solver_stats', action='store_true', help='Log the integrator statistics of each reporting '
+                                                                    'interval and write them to output.solver.json.')
+    parser.add_argument('--cache', nargs='?', const='', help='Restore the output from the result cache if the same '
+                                                             'input and options were already simulated, in the given '
+                                                             'directory or in the default one.')
+    parser.add_argument('--eliminate_aliases', action='store_true', help='Replace the variables of the alias '
+                                                                         'equations (i.e. D = Di, Tbf = T, vbf = v, '
+                                                                         'Qout = 0, kub = klb) by their expressions.')
+    parser.add_argument('--evaluation_mode', default='default', choices=['default', 'auto'] + evaluation_mode.MODES,
+                        help='Evaluation mode of the equations, auto uses the one tuned for the structure of the '
+                             'network (tuning it first if missing).')
+    parser.add_argument('--threads', type=int, default=0, help='Number of OpenMP threads of the evaluation mode (0 '
+                                                               'uses all the cpus).')
+    parser.add_argument('--initialization', default='global', choices=['global', 'sequential'],
+                        help='Initial solution of the whole network at once, or sequential to seed it first by '
+                             'solving each node and its outlet edges in the flow direction.')
+    parser.add_argument('--max_reporting_interval', type=int, default=24*3600, help='Maximum interval in seconds '
+                                                                                    'between adaptive reports.')
 
     args = parser.parse_args()
 
-    if args.format != 'gui' and not args.output:
+    if args.format == 'shm' and not args.output:
+        args.output = 'daetools_monitor'
+    elif args.format != 'gui' and not args.output:
         args.output = '{0}.output.{1}'.format(args.input,args.format)
 
+    # Timing of the phases
+    timer = PhaseTimer()
+
     # Read data
-    data = read_data(args)
+    with timer.phase('parsing'):
+        data = read_data(args)
+
+    if args.eliminate_aliases:
+        data['eliminate_aliases'] = True
 
     # Configure
     cfg = configure(args)
 
     # Reports
-    dr = get_reporter(args)
+    dr = get_reporter(args, data)
 
     # Name
     simName = get_name(args, data)
 
+    # Steady-state detection
+    steady_state = get_steady_state(args)
+
+    # Change-driven reporting
+    adaptive_reporting = get_adaptive_reporting(args)
+
+    # Result cache
+    cache, key = get_cache(args, data)
+    if key and cache.get_files(key, get_output_paths(args)):
+        print("Output restored from the result cache to {0}".format(args.output))
+        sys.exit()
+
+    # Evaluation mode of the equations
+    choice = get_evaluation_mode(args, data)
+    if choice:
+        evaluation_mode.apply(cfg, choice)
+        print("Evaluation mode {0} with {1} threads".format(choice['mode'], choice['threads']))
+
+    # Sequential initialization, seeding the initial guesses
+    if args.initialization == 'sequential' and not args.resume:
+        try:
+            with timer.phase('initialization'):
+                data, blocks = initialize_sequential(data, relative_tolerance=args.relative_tolerance)
+        except RuntimeError as e:
+            print(e)
+            sys.exit(1)
+        failed = [block['node'] for block in blocks if block['status'] != 'ok']
+        print("Sequential initialization: {0} blocks, {1} failed".format(len(blocks), len(failed)))
+        if failed:
+            print("The blocks of {0} keep their initial guesses".format(', '.join(failed)))
+
+    # Checkpoints
+    checkpoint, resume = get_checkpoint(args)
+    time_horizon = args.time_horizon
+    if resume:
+        time_horizon = args.time_horizon - resume['time']
+        print("Resuming from the checkpoint at {0} s".format(resume['time']))
+
     # Instantiate
-    simulation = daeSimulationExtended(simName, data=data, set_reporting = True, reporting_interval = args.reporting_interval, time_horizon = args.time_horizon)
+    simulation = daeSimulationExtended(simName, data=data, set_reporting = True, reporting_interval = args.reporting_interval, time_horizon = time_horizon, steady_state = steady_state, checkpoint = checkpoint, resume = resume, adaptive_reporting = adaptive_reporting, timer = timer, solver_stats = args.solver_stats)
 
     # Gui Option
     if args.format == 'gui':
@@ -161,6 +364,7 @@ if __name__ == "__main__":
         simulation.Initialize(solver, dr, log)
         print("Number of equations", simulation.NumberOfEquations)
         print("Number of variables", simulation.TotalNumberOfVariables)
+        print_aliases(simulation)
         save_reports(args)
 
         # Solve at time = 0
@@ -170,4 +374,15 @@ if __name__ == "__main__":
         simulation.Run()
 
         # Clean up
-        simulation.Finalize()
\ No newline at end of file
+        simulation.Finalize()
+
+        # Timing report
+        timer.print_report()
+        timer.write('{0}.timing.json'.format(args.output), equations=simulation.NumberOfEquations,
+                    variables=simulation.TotalNumberOfVariables)
+
+        if simulation.solver_stats:
+            simulation.solver_stats.write('{0}.solver.json'.format(args.output))
+
+        if key:
+            cache.put(key, files=get_output_paths(args))
\ No newline at end of file
@@ -0,0 +1,85 @@
+import numpy as np
+
+from daetools_extended.adaptive_reporting import ChangeDrivenReporting
+
+
+class Variable(object):
+
+    def __init__(self, name, values):
+        self.Name = name
+        self.npyValues = np.array(values, dtype=float)
+
+
+class Model(object):
+
+    def __init__(self, variables, submodels=None):
+        self.Variables = variables
+        self.submodels = submodels or {}
+
+
+def get_model():
+
+    T = Variable('T', [300., 310.])
+    v = Variable('v', [1.0, 1.0])
+    model = Model([], submodels={'pipe_01': Model([T, v])})
+
+    return model, T, v
+
+
+def test_relative_change():
+    """
+    Check that only a relative change of the monitored variables above rtol triggers a report
+    :return:
+    """
+
+    model, T, v = get_model()
+    trigger = ChangeDrivenReporting(model, variables=['*.T'], rtol=1e-3, min_interval=60., max_interval=3600.)
+    trigger.reported(0.)
+
+    T.npyValues[0] += 0.2
+    assert not trigger.update(60.)
+
+    # The change is measured from the last report, so small changes add up
+    T.npyValues[0] += 0.2
+    assert trigger.update(120.)
+    assert trigger.reported_time == 120.
+
+    T.npyValues[0] += 0.2
+    assert not trigger.update(180.)
+
+    # Changes of the variables not monitored are ignored
+    v.npyValues *= 2.
+    assert not trigger.update(240.)
+
+
+def test_absolute_change():
+    """
+    Check the absolute tolerance, that also covers the variables close to zero
+    :return:
+    """
+
+    model, T, v = get_model()
+    v.npyValues[:] = 0.
+    trigger = ChangeDrivenReporting(model, variables=['*.v'], rtol=0., atol=0.01, max_interval=3600.)
+    trigger.reported(0.)
+
+    v.npyValues[1] = 0.005
+    assert not trigger.update(60.)
+    v.npyValues[1] = 0.02
+    assert trigger.update(120.)
+
+
+def test_max_interval():
+    """
+    Check that the first update and the max interval always trigger a report
+    :return:
+    """
+
+    model, T, v = get_model()
+    trigger = ChangeDrivenReporting(model, variables=['*.T'], rtol=1e-3, min_interval=60., max_interval=300.)
+
+    assert trigger.update(0.)
+    assert not trigger.update(240.)
+    assert trigger.update(300.)
+    assert not trigger.update(360.)
+    assert trigger.update(600.)
@@ -0,0 +1,131 @@
+import collections
+import types
+
+import pytest
+
+from daetools_extended import tools
+from daetools_extended.tools import AliasVariable, alias_equation, get_aliases
+
+
+class Model(object):
+    """
+    Fake model with the alias elimination of daeModelExtended
+    """
+
+    def __init__(self, eliminate_aliases, submodels=None):
+
+        self.eliminate_aliases = eliminate_aliases
+        self.aliases = {}
+        self.submodels = submodels or {}
+        self.declared = []
+
+        x = types.SimpleNamespace(NumberOfPoints=10)
+        if self.is_alias('eq_internal_diameter'):
+            self.aliases['D'] = AliasVariable('D', lambda *indexes: 0.015, [x])
+
+
+    def is_alias(self, method_name):
+
+        return tools.is_alias(self, method_name)
+
+
+    @alias_equation
+    def eq_internal_diameter(self):
+
+        self.declared.append('D')
+
+
+    def eq_velocity(self):
+
+        self.declared.append('v')
+
+
+class OverridingModel(Model):
+    """
+    Fake model that overrides an alias equation with a real one
+    """
+
+    def eq_internal_diameter(self):
+
+        self.declared.append('D2')
+
+
+def test_alias_equation():
+    """
+    Check that the alias equations are not declared when eliminated, and the size of the eliminated variables
+    :return:
+    """
+
+    for eliminate_aliases in (False, True):
+        pipe = Model(eliminate_aliases)
+        pipe.eq_internal_diameter()
+        pipe.eq_velocity()
+        assert pipe.declared == (['v'] if eliminate_aliases else ['D', 'v'])
+
+    # The undecorated override keeps its variable
+    pipe = OverridingModel(True)
+    pipe.eq_internal_diameter()
+    assert pipe.declared == ['D2'] and not pipe.aliases
+
+    root = Model(False, submodels={'pipe_01': Model(True), 'pipe_02': Model(False)})
+    aliases = get_aliases(root)
+
+    assert [name for name, alias in aliases] == ['pipe_01.D']
+    assert aliases[0][1].NumberOfPoints == 10
+    assert aliases[0][1]('x') == 0.015
+
+
+def get_model(cls, eliminate_aliases):
+    """
+    Model with only the attributes of the alias elimination, the daeModel is not constructed
+    """
+
+    model = cls.__new__(cls)
+    model.eliminate_aliases = eliminate_aliases
+    model.aliases = collections.OrderedDict()
+
+    return model
+
+
+def test_model_aliases():
+    """
+    Check the alias equations resolved through the classes of the models, where the undecorated overrides (i.e.
+    eq_biofilm_temperature of the fixed external convection pipe or eq_internal_diameter of the biofilmed pipes) keep
+    their variables
+    :return:
+    """
+
+    pytest.importorskip('pyUnits')
+
+    from models.pipe import Pipe
+    from models.biofilmed_pipe import BiofilmedPipe
+    from models.biofilmed_fixed_external_convection_pipe import BiofilmedFixedExternalConvectionPipe
+
+    for cls in (Pipe, BiofilmedPipe, BiofilmedFixedExternalConvectionPipe):
+        model = get_model(cls, False)
+        assert not model.is_alias('eq_internal_diameter')
+
+    pipe = get_model(Pipe, True)
+    assert pipe.is_alias('eq_internal_diameter')
+    assert pipe.is_alias('eq_upperbound_flowrate')
+    assert pipe.is_alias('eq_total_he')
+    assert not pipe.is_alias('eq_velocity')
+
+    biofilmed = get_model(BiofilmedPipe, True)
+    assert biofilmed.is_alias('eq_biofilm_temperature')
+    assert biofilmed.is_alias('eq_biofilm_velocity')
+    assert not biofilmed.is_alias('eq_internal_diameter')
+
+    convection = get_model(BiofilmedFixedExternalConvectionPipe, True)
+    assert not convection.is_alias('eq_biofilm_temperature')
+    assert convection.is_alias('eq_biofilm_velocity')
+    assert convection.is_alias('eq_upperbound_flowrate')
+    assert not convection.is_alias('eq_total_he')
+    assert not convection.is_alias('eq_internal_diameter')
+
+    # The decorated method is skipped, the alias is what the equations use instead
+    assert BiofilmedFixedExternalConvectionPipe.eq_biofilm_velocity(convection) is None
+    x = types.SimpleNamespace(NumberOfPoints=5)
+    alias = convection.define_alias('vbf', lambda *indexes: 1.0, [x])
+    assert convection.aliases == {'vbf': alias}
+    assert get_aliases(convection) == [('vbf', alias)]
@@ -0,0 +1,66 @@
+import json
+import os
+
+from daetools_extended.batch import read_inputs
+
+
+def write_case(path, name):
+
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(path, 'w') as f:
+        json.dump({'name': name}, f)
+
+
+def test_read_directory(tmpdir):
+    """
+    Check that a directory gives its json files, named after them
+    :return:
+    """
+
+    write_case(str(tmpdir.join('cases', 'network_b.json')), 'b')
+    write_case(str(tmpdir.join('cases', 'network_a.json')), 'a')
+    write_case(str(tmpdir.join('cases', 'sub', 'network_c.json')), 'c')
+
+    cases = read_inputs(str(tmpdir.join('cases')))
+
+    assert cases == [('network_a', {'name': 'a'}), ('network_b', {'name': 'b'})]
+
+
+def test_read_glob(tmpdir):
+    """
+    Check that the inputs with the same file name in different directories get different names
+    :return:
+    """
+
+    write_case(str(tmpdir.join('cases', 'site_a', 'network.json')), 'a')
+    write_case(str(tmpdir.join('cases', 'site_b', 'network.json')), 'b')
+    write_case(str(tmpdir.join('cases', 'site_b', 'other.json')), 'c')
+
+    cases = read_inputs(str(tmpdir.join('cases', '*', '*.json')))
+
+    assert [name for name, data in cases] == ['site_a_network', 'site_b_network', 'site_b_other']
+    assert [data['name'] for name, data in cases] == ['a', 'b', 'c']
+
+    # Relative paths that still collide get a numeric suffix
+    write_case(str(tmpdir.join('cases', 'site_a_network.json')), 'd')
+    cases = read_inputs(str(tmpdir.join('cases', '**', '*.json')))
+    names = [name for name, data in cases]
+    assert len(set(names)) == len(names) == 4
+
+
+def test_read_jsonl(tmpdir):
+    """
+    Check that a JSON Lines file gives one case per line, skipping the empty ones
+    :return:
+    """
+
+    path = str(tmpdir.join('sweep.jsonl'))
+    with open(path, 'w') as f:
+        f.write('{"name": "a"}\n\n{"name": "b"}\n')
+
+    cases = read_inputs(path)
+
+    assert cases == [('sweep_0000', {'name': 'a'}), ('sweep_0002', {'name': 'b'})]
@@ -0,0 +1,51 @@
+import pytest
+
+from daetools_extended.benchmark import get_trials, fit_exponents, compare_baseline, METRICS
+
+
+def get_records(scale=1.0):
+
+    records = []
+    for trial in get_trials('quick'):
+        record = dict(trial, status='ok', error='')
+        # Linear in the edges and N, quadratic in Ny
+        power = 2 if trial['sweep'] == 'Ny' else 1
+        for metric in METRICS:
+            record[metric] = scale * trial['value'] ** power
+        record['equations'] = 10 * trial['value'] ** power
+        records.append(record)
+
+    return records
+
+
+def test_fit_exponents():
+
+    exponents = fit_exponents(get_records())
+
+    assert list(exponents) == ['edges', 'N', 'Ny']
+    assert exponents['edges']['construction'] == pytest.approx(1.0)
+    assert exponents['Ny']['run_per_hour'] == pytest.approx(2.0)
+
+
+def test_compare_baseline():
+    """
+    Check that the slower metrics and the extra equations are flagged, but not the ones within the tolerance
+    :return:
+    """
+
+    records = get_records()
+    baseline = {'records': records, 'exponents': fit_exponents(records)}
+
+    assert compare_baseline({'records': get_records(1.1), 'exponents': fit_exponents(get_records(1.1))},
+                            baseline) == []
+
+    slower = get_records(1.5)
+    slower[0]['equations'] += 1
+    slower[1]['status'] = 'failed'
+    regressions = compare_baseline({'records': slower, 'exponents': fit_exponents(slower)}, baseline)
+
+    flagged = {(regression['sweep'], regression['value'], regression['metric']) for regression in regressions}
+    assert ('edges', 1, 'equations') in flagged
+    assert ('edges', 2, 'status') in flagged
+    assert ('N', 40, 'run_per_hour') in flagged
+    assert not any(metric.endswith('exponent') for sweep, value, metric in flagged)
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+from daetools_extended import cache
+from daetools_extended.cache import ResultCache, get_key
+
+
+def test_get_key():
+    """
+    Check if the key does not depend on the order of the data and depends on the options
+    :return:
+    """
+
+    data_1 = {'name': 'network', 'submodels': {'node_A': {'kind': 'node'}, 'node_B': {'kind': 'node'}}}
+    data_2 = {'submodels': {'node_B': {'kind': 'node'}, 'node_A': {'kind': 'node'}}, 'name': 'network'}
+
+    assert get_key(data_1, {'time_horizon': 3600}) == get_key(data_2, {'time_horizon': 3600})
+    assert get_key(data_1, {'time_horizon': 3600}) != get_key(data_1, {'time_horizon': 7200})
+
+
+def test_get_key_sources(tmpdir, monkeypatch):
+    """
+    Check if the key depends on the source of every module of the package, i.e. the data reporters
+    :return:
+    """
+
+    package = str(tmpdir.join('daetools_extended'))
+    shutil.copytree(cache.PACKAGE, package, ignore=shutil.ignore_patterns('__pycache__'))
+    monkeypatch.setattr(cache, 'PACKAGE', package)
+
+    data = {'name': 'network', 'submodels': {'node_A': {'kind': 'node'}}}
+    key = get_key(data, {})
+
+    with open(os.path.join(package, 'data_reporters.py'), 'a') as f:
+        f.write('\n# changed\n')
+
+    assert get_key(data, {}) != key
+
+
+def test_result_cache(tmpdir):
+    """
+    Check the stored values and files and the eviction of the least recently used entries
+    :return:
+    """
+
+    cache = ResultCache(str(tmpdir.join('cache')), max_size=2500)
+
+    output = str(tmpdir.join('output.csv'))
+    with open(output, 'w') as f:
+        f.write('x' * 1000)
+
+    cache.put('a' * 64, value={'pipe_01.k': 0.1}, files=[output])
+    cache.put('b' * 64, value={'pipe_01.k': 0.2}, files=[output])
+
+    assert cache.get_value('a' * 64) == {'pipe_01.k': 0.1}
+
+    restored = str(tmpdir.join('restored.csv'))
+    assert cache.get_files('b' * 64, [restored])
+    assert os.path.getsize(restored) == 1000
+
+    # a and b were used, so c evicts the oldest one (a)
+    os.utime(cache.get_path('a' * 64), (0, 0))
+    cache.put('c' * 64, value=None, files=[output])
+
+    assert cache.get_value('a' * 64) is None
+    assert cache.get('b' * 64) is not None
+    assert cache.get('c' * 64) is not None
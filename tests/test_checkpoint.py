@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+
+from daetools.pyDAE import cnAlgebraic, cnDifferential
+from daetools_extended.checkpoint import CheckpointWriter, read_checkpoint, restore_state, STATES_FILE, \
+    ACTIVE_STATES_FILE
+
+
+class Variable(object):
+
+    def __init__(self, name, values, ids):
+        self.Name = name
+        self.npyValues = np.array(values, dtype=float)
+        self.npyTimeDerivatives = np.zeros_like(self.npyValues)
+        self.npyIDs = np.array(ids)
+        self.initial_conditions = {}
+        self.initial_guesses = {}
+
+
+    def SetInitialCondition(self, *args):
+        self.initial_conditions[args[:-1]] = args[-1]
+
+
+    def SetInitialGuess(self, *args):
+        self.initial_guesses[args[:-1]] = args[-1]
+
+
+class STN(object):
+
+    def __init__(self, name, active_state):
+        self.Name = name
+        self.ActiveState = active_state
+
+
+class Model(object):
+
+    def __init__(self, variables, stns=(), submodels=None):
+        self.Variables = variables
+        self.STNs = list(stns)
+        self.submodels = submodels or {}
+
+
+def get_model():
+
+    T = Variable('T', [300., 310., 320.], [cnDifferential, cnDifferential, cnAlgebraic])
+    stn = STN('biofilm', 'lag')
+    pipe = Model([T], stns=[stn])
+    w = Variable('w', 1.5, cnAlgebraic)
+
+    return Model([w], submodels={'pipe_01': pipe}), T, w, stn
+
+
+def test_write_read_restore(tmpdir):
+    """
+    Check that the latest checkpoint is read back with its absolute time and restored in a new model
+    :return:
+    """
+
+    path = str(tmpdir.join('checkpoint'))
+    model, T, w, stn = get_model()
+
+    writer = CheckpointWriter(model, path, interval=100., time_offset=1000.)
+    assert writer.update(0.)
+    assert not writer.update(50.)
+
+    T.npyValues += 5.
+    stn.ActiveState = 'growth'
+    assert writer.update(100.)
+
+    state = read_checkpoint(path)
+    assert state['time'] == 1100.
+    assert list(state['values']['pipe_01.T']) == [305., 315., 325.]
+    assert list(state['values']['w']) == [1.5]
+    assert state['active_states'] == {'pipe_01.biofilm': 'growth'}
+
+    new_model, new_T, new_w, new_stn = get_model()
+    restore_state(new_model, state)
+
+    assert new_stn.ActiveState == 'growth'
+    assert new_T.initial_conditions == {(0,): 305., (1,): 315.}
+    assert new_T.initial_guesses == {(2,): 325.}
+    assert new_w.initial_guesses == {(): 1.5}
+
+
+def test_truncated_checkpoint(tmpdir):
+    """
+    Check that a partial record and an unpaired active states line are dropped on resume, so the next records stay
+    aligned
+    :return:
+    """
+
+    path = str(tmpdir.join('checkpoint'))
+    model, T, w, stn = get_model()
+
+    writer = CheckpointWriter(model, path, interval=0.)
+    writer.update(0.)
+    T.npyValues += 5.
+    writer.update(10.)
+
+    # Crash in the middle of the third record, after the active states of a fourth one
+    with open(os.path.join(path, STATES_FILE), 'ab') as f:
+        np.arange(3, dtype=np.float64).tofile(f)
+    with open(os.path.join(path, ACTIVE_STATES_FILE), 'a') as f:
+        f.write('{"time": 20.0, "states": {}}\n{"time": 30.0, "states": {}}\n')
+
+    assert read_checkpoint(path)['time'] == 10.
+
+    # The resumed run appends after the last complete checkpoint
+    writer = CheckpointWriter(model, path, interval=0., time_offset=10.)
+    T.npyValues += 5.
+    stn.ActiveState = 'growth'
+    writer.update(5.)
+
+    state = read_checkpoint(path)
+    assert state['time'] == 15.
+    assert list(state['values']['pipe_01.T']) == [310., 320., 330.]
+    assert state['active_states'] == {'pipe_01.biofilm': 'growth'}
+
+    record_length = 1 + 2 * 4
+    assert os.path.getsize(os.path.join(path, STATES_FILE)) == 3 * 8 * record_length
+    with open(os.path.join(path, ACTIVE_STATES_FILE)) as f:
+        assert len(f.readlines()) == 3
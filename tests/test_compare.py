@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+
+from types import SimpleNamespace
+
+from daetools_extended.data_reporters import daeBinaryDataReporter, daeJSONLinesDataReporter
+from daetools_extended.compare import compare_results
+
+
+def report(dr, path, times, offset=0.0):
+    """
+    Feed a data reporter with a fake simulation, the temperature of the last point is shifted by the offset
+    :return:
+    """
+
+    dr.Connect(path, 'network')
+    dr.StartRegistration()
+    dr.RegisterDomain(SimpleNamespace(Name='network.pipe_01.x', Type='eStructuredGrid', NumberOfPoints=3,
+                                      Points=[0., .5, 1.]))
+    dr.RegisterVariable(SimpleNamespace(Name='network.pipe_01.T', NumberOfPoints=3, Domains=['network.pipe_01.x'],
+                                        Units='K'))
+    dr.RegisterVariable(SimpleNamespace(Name='network.pipe_01.k', NumberOfPoints=1, Domains=[], Units='kg/s'))
+    dr.EndRegistration()
+
+    for time in times:
+        dr.StartNewResultSet(time)
+        dr.SendVariable(SimpleNamespace(Name='network.pipe_01.T', Values=300. + np.array([0., 0., offset * time])))
+        dr.SendVariable(SimpleNamespace(Name='network.pipe_01.k', Values=np.array(0.1)))
+
+    dr.EndOfData()
+    dr.Disconnect()
+
+
+def test_compare_results(tmpdir):
+    """
+    Check the differences of two runs with different formats, blocks and reported times
+    :return:
+    """
+
+    path_a = str(tmpdir.join('a.daeres'))
+    path_b = str(tmpdir.join('b.jsonl'))
+
+    report(daeBinaryDataReporter(block_rows=4), path_a, 3600. * np.arange(10))
+    report(daeJSONLinesDataReporter(), path_b, 1800. * np.arange(20), offset=1e-4)
+
+    ranked = compare_results(path_a, path_b)
+
+    assert [stats['variable'] for stats in ranked] == ['pipe_01.T', 'pipe_01.k']
+    assert ranked[0]['rows'] == 10
+    assert ranked[0]['max'] == pytest.approx(1e-4 * 9 * 3600.)
+    assert ranked[0]['time_of_max'] == 9 * 3600.
+    assert ranked[1]['max'] == 0.0
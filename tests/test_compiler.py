@@ -0,0 +1,28 @@
+import os
+
+from daetools_extended.cache import ResultCache, get_key
+from daetools_extended.compiler import compile_network, get_executable
+
+
+def test_compile_cached(tmpdir):
+    """
+    Check that a cached artifact is restored without building the network, and that its executable is found
+    :return:
+    """
+
+    data = {'name': 'network', 'submodels': {}}
+
+    artifact = tmpdir.mkdir('artifact')
+    artifact.join('main.cpp').write('int main() { return 0; }')
+    executable = artifact.join('network')
+    executable.write('')
+    os.chmod(str(executable), 0o755)
+
+    cache = ResultCache(str(tmpdir.join('cache')))
+
+    cache.put(get_key(data, {'target': 'cxx', 'make': True}), value={'name': 'network'}, files=[str(artifact)])
+
+    output = str(tmpdir.join('network_cxx'))
+    assert compile_network(data, target='cxx', output=output, cache=cache) == (output, True)
+    assert sorted(os.listdir(output)) == ['main.cpp', 'network']
+    assert get_executable(output) == os.path.join(output, 'network')
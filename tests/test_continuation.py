@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+from daetools_extended import continuation
+from daetools_extended.sweep import get_data_value
+
+
+PATH = 'pipe_01.parameters.Tsat'
+
+
+def get_data():
+
+    return {'name': 'network', 'submodels': {'pipe_01': {'kind': 'edge', 'parameters': {'Tsat': 0.0}}}}
+
+
+def solve_initial(converges):
+    """
+    Fake continuation.solve_initial, that converges according to the ramped value and the last converged one
+    :param converges: function of the trial value and the last converged value
+    :return: function
+    """
+
+    last = {'value': None}
+
+    def solve(data, relative_tolerance=1e-6):
+        value = get_data_value(data, PATH)
+        if not converges(value, last['value']):
+            raise RuntimeError("Not converged")
+        last['value'] = value
+        return data, SimpleNamespace()
+
+    return solve
+
+
+def test_step_control(monkeypatch):
+    """
+    Check that the step shrinks after a failure and grows again after the converged steps
+    :return:
+    """
+
+    # A step longer than 3 from the last converged value fails
+    monkeypatch.setattr(continuation, 'solve_initial',
+                        solve_initial(lambda value, last: last is None or value - last <= 3.0))
+
+    seeded, report = continuation.run_continuation(get_data(), PATH, 0., 10., steps=5, growth=1.5, shrink=0.5)
+
+    assert get_data_value(seeded, PATH) == 10.
+    assert [row['value'] for row in report] == [0., 2., 5., 9.5, 7.25, 10.]
+    assert [row['status'] for row in report] == ['ok', 'ok', 'ok', 'failed', 'ok', 'ok']
+    assert [row['step_size'] for row in report] == [0., 2., 3., 4.5, 2.25, 2.75]
+
+
+def test_min_step(monkeypatch):
+    """
+    Check that the continuation stops when the step gets below the minimum, and when the start value fails
+    :return:
+    """
+
+    monkeypatch.setattr(continuation, 'solve_initial', solve_initial(lambda value, last: value <= 5.0))
+
+    with pytest.raises(RuntimeError, match='step size below 0.5'):
+        continuation.run_continuation(get_data(), PATH, 0., 10., steps=5, min_step=0.5)
+
+    monkeypatch.setattr(continuation, 'solve_initial', solve_initial(lambda value, last: value <= 5.0))
+
+    with pytest.raises(RuntimeError, match='start value'):
+        continuation.run_continuation(get_data(), PATH, 6., 10.)
@@ -0,0 +1,179 @@
+import os
+import pytest
+import numpy as np
+
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+from daetools_extended.data_reporters import daeChunkedDataReporter, daeJSONLinesDataReporter, \
+    daeSharedMemoryDataReporter, daeKPIDataReporter, daeBinaryDataReporter
+from daetools_extended.readers import read_chunked, read_jsonl, SharedMemoryReader, DaeResFile
+
+
+def report(dr, path, n=7):
+    """
+    Feed a data reporter with a fake simulation of one distributed and one lumped variable
+    :return:
+    """
+
+    dr.Connect(path, 'network')
+    dr.StartRegistration()
+    dr.RegisterDomain(SimpleNamespace(Name='network.pipe_01.x', Type='eStructuredGrid', NumberOfPoints=4,
+                                      Points=[0., 1. / 3., 2. / 3., 1.]))
+    dr.RegisterVariable(SimpleNamespace(Name='network.pipe_01.T', NumberOfPoints=4, Domains=['network.pipe_01.x'],
+                                        Units='K'))
+    dr.RegisterVariable(SimpleNamespace(Name='network.pipe_01.k', NumberOfPoints=1, Domains=[], Units='kg/s'))
+    dr.EndRegistration()
+
+    for i in range(n):
+        dr.StartNewResultSet(3600. * i)
+        dr.SendVariable(SimpleNamespace(Name='network.pipe_01.T', Values=300. + i + np.arange(4)))
+        dr.SendVariable(SimpleNamespace(Name='network.pipe_01.k', Values=np.array(0.1 * i)))
+
+    dr.EndOfData()
+    dr.Disconnect()
+
+
+@pytest.mark.parametrize("format", ['npz', 'h5'])
+def test_chunked_data_reporter(tmpdir, format):
+    """
+    Check if the chunked results are read back
+    :return:
+    """
+
+    path = str(tmpdir.join('output.{0}'.format(format)))
+
+    report(daeChunkedDataReporter(format=format, chunk_size=3), path)
+
+    index, times, values = read_chunked(path)
+
+    assert times.shape == (7,)
+    assert values['network.pipe_01.T'].shape == (7, 4)
+    assert values['network.pipe_01.T'][-1, -1] == 309.
+    assert values['network.pipe_01.k'][2] == pytest.approx(0.2)
+    assert index['domains']['network.pipe_01.x']['size'] == 4
+
+    index, times, values = read_chunked(path, variables=['network.pipe_01.k'])
+
+    assert list(values.keys()) == ['network.pipe_01.k']
+
+
+def test_jsonl_data_reporter(tmpdir):
+    """
+    Check if the JSON Lines results are read back, even with an incomplete last line
+    :return:
+    """
+
+    path = str(tmpdir.join('output.jsonl'))
+
+    report(daeJSONLinesDataReporter(variables=['pipe_01.T']), path)
+
+    with open(path, 'a') as f:
+        f.write('{"t": 25200.0, "v": [30')
+
+    index, times, values = read_jsonl(path)
+
+    assert times.shape == (7,)
+    assert list(values.keys()) == ['network.pipe_01.T']
+    assert values['network.pipe_01.T'][3, 0] == 303.
+
+
+def test_binary_data_reporter(tmpdir):
+    """
+    Check the lazy reading of the binary results by variable and time range
+    :return:
+    """
+
+    path = str(tmpdir.join('output.daeres'))
+
+    report(daeBinaryDataReporter(block_rows=3), path)
+
+    f = DaeResFile(path)
+
+    assert f.times.tolist() == [3600. * i for i in range(7)]
+
+    T = f['network.pipe_01.T']
+    assert T.shape == (7, 4)
+    assert np.asarray(T)[-1, -1] == 309.
+    assert T[2:5, 0].tolist() == [302., 303., 304.]
+    assert f['network.pipe_01.k'][-1] == pytest.approx(0.6)
+
+    rows = f.time_slice(7200., 14400.)
+    assert f.times[rows].tolist() == [7200., 10800., 14400.]
+
+
+def test_shared_memory_data_reporter():
+    """
+    Check if the latest rows of the ring buffer are read back
+    :return:
+    """
+
+    name = 'daetools_test_{0}'.format(os.getpid())
+
+    report(daeSharedMemoryDataReporter(slots=4, unlink=False), name)
+
+    reader = SharedMemoryReader(name)
+    try:
+        times, values = reader.latest(3)
+        assert times.tolist() == [4 * 3600., 5 * 3600., 6 * 3600.]
+        assert values['network.pipe_01.T'].shape == (3, 4)
+        assert values['network.pipe_01.T'][-1, 0] == 306.
+
+        times, values = reader.latest(10, variables=['network.pipe_01.k'])
+        assert len(times) == 4
+        assert list(values.keys()) == ['network.pipe_01.k']
+    finally:
+        reader.close()
+        shared_memory.SharedMemory(name=name).unlink()
+
+
+def test_kpi_data_reporter(tmpdir):
+    """
+    Check the KPIs of two stacked edges and the decimated field
+    :return:
+    """
+
+    path = str(tmpdir.join('output.kpi'))
+
+    data = {'name': 'network', 'submodels': {
+        'node_A': {'kind': 'node'},
+        'pipe_01': {'kind': 'edge', 'parameters': {'L': 2.0, 'Di': 0.02}},
+        'pipe_02': {'kind': 'edge', 'parameters': {'L': 4.0, 'Di': 0.02}},
+    }}
+
+    dr = daeKPIDataReporter(data, kpis=['heat_duty', 'pressure_drop', 'outlet_temperature'], chunk_size=2,
+                            field=['pipe_01.T'], field_decimation=2)
+
+    dr.Connect(path, 'network')
+    dr.StartRegistration()
+    for edge in ['pipe_01', 'pipe_02']:
+        domain = 'network.{0}.x'.format(edge)
+        dr.RegisterDomain(SimpleNamespace(Name=domain, Type='eStructuredGrid', NumberOfPoints=3, Points=[0., .5, 1.]))
+        for variable in ['T', 'P', 'Qout', 'v']:
+            dr.RegisterVariable(SimpleNamespace(Name='network.{0}.{1}'.format(edge, variable), NumberOfPoints=3,
+                                                Domains=[domain], Units='-'))
+    dr.EndRegistration()
+
+    for i in range(5):
+        dr.StartNewResultSet(3600. * i)
+        for edge in ['pipe_01', 'pipe_02']:
+            dr.SendVariable(SimpleNamespace(Name='network.{0}.T'.format(edge), Values=np.array([310., 305., 300. - i])))
+            dr.SendVariable(SimpleNamespace(Name='network.{0}.P'.format(edge), Values=np.array([3e5, 2.5e5, 2e5])))
+            dr.SendVariable(SimpleNamespace(Name='network.{0}.Qout'.format(edge), Values=np.array([10., 20., 30.])))
+            dr.SendVariable(SimpleNamespace(Name='network.{0}.v'.format(edge), Values=np.ones(3)))
+    dr.EndOfData()
+    dr.Disconnect()
+
+    index, times, values = read_chunked(path)
+
+    assert sorted(values.keys()) == sorted('network.{0}.{1}'.format(edge, kpi) for edge in ['pipe_01', 'pipe_02']
+                                           for kpi in ['heat_duty', 'pressure_drop', 'outlet_temperature'])
+    assert values['network.pipe_01.heat_duty'].tolist() == [40.] * 5
+    assert values['network.pipe_02.heat_duty'].tolist() == [80.] * 5
+    assert values['network.pipe_02.pressure_drop'][0] == 1e5
+    assert values['network.pipe_01.outlet_temperature'].tolist() == [300., 299., 298., 297., 296.]
+
+    index, times, values = read_chunked(str(tmpdir.join('output.field.kpi')))
+
+    assert times.tolist() == [0., 7200., 14400.]
+    assert list(values.keys()) == ['network.pipe_01.T']
@@ -0,0 +1,50 @@
+import os
+
+from daetools_extended.evaluation_mode import get_choice, get_choice_from_trials, get_thread_counts, store_choice
+
+
+def get_data(roughness):
+
+    return {'name': 'network', 'submodels': {
+        'node_A': {'kind': 'node', 'class': 'Source', 'specifications': {'P': 400000.}},
+        'pipe_01': {'kind': 'edge', 'class': 'Pipe', 'from': 'node_A', 'to': 'node_B', 'domains': {'x': {'N': 20}},
+                    'parameters': {'ep': roughness}},
+        'node_B': {'kind': 'node', 'class': 'Sink', 'specifications': {'P': 390000.}},
+    }}
+
+
+def test_get_thread_counts():
+
+    assert get_thread_counts(1) == [1]
+    assert get_thread_counts(6) == [1, 2, 4, 6]
+    assert get_thread_counts(8) == [1, 2, 4, 8]
+
+
+def test_store_choice(tmpdir):
+    """
+    Check the choice of the fastest trial and that it is reused by the networks with the same structure only
+    :return:
+    """
+
+    trials = [
+        {'mode': 'evaluationTree_OpenMP', 'threads': 1, 'status': 'ok', 'burst': 2.0},
+        {'mode': 'computeStack_OpenMP', 'threads': 1, 'status': 'ok', 'burst': 1.0},
+        {'mode': 'computeStack_OpenMP', 'threads': 2, 'status': 'ok', 'burst': 1.0},
+        {'mode': 'computeStack_OpenMP', 'threads': 4, 'status': 'failed', 'burst': None},
+    ]
+
+    choice = get_choice_from_trials(trials)
+    assert (choice['mode'], choice['threads']) == ('computeStack_OpenMP', 1)
+    assert get_choice_from_trials(trials[-1:])['mode'] is None
+
+    path = str(tmpdir.join('modes', 'evaluation_modes.json'))
+    assert get_choice(get_data(45e-6), path) is None
+
+    store_choice(get_data(45e-6), choice, path)
+    assert os.listdir(str(tmpdir.join('modes'))) == ['evaluation_modes.json']
+
+    assert get_choice(get_data(90e-6), path)['mode'] == 'computeStack_OpenMP'
+
+    other = get_data(45e-6)
+    other['submodels']['pipe_01']['domains']['x']['N'] = 40
+    assert get_choice(other, path) is None
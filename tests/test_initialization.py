@@ -0,0 +1,121 @@
+import sys
+from copy import deepcopy
+from types import SimpleNamespace
+
+import pytest
+
+from daetools_extended.initialization import get_block, get_flowrate, get_order, initialize_sequential
+from daetools_extended.tools import get_node_tree
+from examples.network_generator import generate_network
+
+
+def test_get_order():
+    """
+    Check that every node comes after the nodes upstream of it
+    :return:
+    """
+
+    data = generate_network('grid', 12)
+    node_tree = get_node_tree(data['name'], data, node_tree={})
+
+    order = get_order(node_tree)
+
+    assert sorted(order) == sorted(node_tree)
+    assert order[0] == 'node_0000'
+    for edge in (submodel for submodel in data['submodels'].values() if submodel['kind'] == 'edge'):
+        assert order.index(edge['from']) < order.index(edge['to'])
+
+
+def test_get_block():
+    """
+    Check that a block is the node as a source with its outlet edges and their nodes as sinks with their flowrates
+    :return:
+    """
+
+    data = generate_network('tree', 6, branching=2)
+    node_tree = get_node_tree(data['name'], data, node_tree={})
+    node = 'node_0001'
+
+    block = get_block(data, node, node_tree, 390000., 310.)
+    submodels = block['submodels']
+
+    assert block['name'] == data['name']
+    assert submodels[node]['class'] == 'Source'
+    assert submodels[node]['specifications'] == {'P': 390000.}
+    assert submodels[node]['parameters']['Text'] == 310.
+
+    edges = node_tree[node]['outlet']
+    assert len(edges) == 2
+    for edge in edges:
+        sink = submodels[data['submodels'][edge]['to']]
+        assert sink['class'] == 'Sink'
+        assert sink['specifications'] == {'w': get_flowrate(data['submodels'][edge])}
+
+    assert len(submodels) == 5
+    assert data['submodels'][node]['class'] != 'Source'
+
+
+def solve_initial(failing=()):
+    """
+    Fake continuation.solve_initial: each edge drops the pressure by 1000 Pa and heats the water by 5 K
+    :param failing: nodes whose blocks fail
+    :return: function
+    """
+
+    def solve(block, relative_tolerance=1e-6):
+
+        source = [name for name, submodel in block['submodels'].items() if submodel.get('class') == 'Source'][0]
+        if source in failing:
+            raise RuntimeError("Failed")
+
+        seeded = deepcopy(block)
+        P = block['submodels'][source]['specifications']['P']
+        T = block['submodels'][source]['parameters']['Text']
+
+        for name, submodel in seeded['submodels'].items():
+            if submodel['kind'] == 'edge':
+                submodel['initial_guess']['T'] = T + 2.5
+            elif name != source:
+                submodel['initial_guess'].update({'P': P - 1000., 'T': T + 5.})
+
+        return seeded, SimpleNamespace(NumberOfEquations=len(seeded['submodels']))
+
+    return solve
+
+
+def test_initialize_sequential(monkeypatch):
+    """
+    Check that the outlet states reach the downstream nodes and that a failed block keeps its guesses
+    :return:
+    """
+
+    data = generate_network('series', 3)
+    submodels = data['submodels']
+    P0, T0 = submodels['node_0000']['specifications']['P'], submodels['node_0000']['parameters']['Text']
+
+    monkeypatch.setitem(sys.modules, 'daetools_extended.continuation', SimpleNamespace(solve_initial=solve_initial()))
+    seeded, report = initialize_sequential(data)
+
+    assert [row['node'] for row in report] == ['node_0000', 'node_0001', 'node_0002']
+    assert all(row['status'] == 'ok' for row in report)
+    for i in (1, 2, 3):
+        guess = seeded['submodels']['node_000{0}'.format(i)]['initial_guess']
+        assert (guess['P'], guess['T']) == pytest.approx((P0 - 1000. * i, T0 + 5. * i))
+    assert submodels['node_0001']['initial_guess']['P'] != P0 - 1000.
+
+    # The block of node_0001 fails: its edge and node_0002 keep their guesses, the march goes on from them
+    monkeypatch.setitem(sys.modules, 'daetools_extended.continuation',
+                        SimpleNamespace(solve_initial=solve_initial(failing=['node_0001'])))
+    seeded, report = initialize_sequential(data)
+
+    assert [row['status'] for row in report] == ['ok', 'failed', 'ok']
+    edge = [name for name in submodels if submodels[name].get('from') == 'node_0001'][0]
+    assert seeded['submodels'][edge]['initial_guess'] == submodels[edge]['initial_guess']
+    assert seeded['submodels']['node_0002']['initial_guess'] == submodels['node_0002']['initial_guess']
+    P2 = submodels['node_0002']['initial_guess']['P']
+    assert seeded['submodels']['node_0003']['initial_guess']['P'] == P2 - 1000.
+
+    monkeypatch.setitem(sys.modules, 'daetools_extended.continuation',
+                        SimpleNamespace(solve_initial=solve_initial(failing=['node_0000', 'node_0001', 'node_0002'])))
+    with pytest.raises(RuntimeError):
+        initialize_sequential(data)
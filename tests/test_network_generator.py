@@ -0,0 +1,35 @@
+import pytest
+
+from examples.network_generator import generate_network, TOPOLOGIES
+
+
+@pytest.mark.parametrize('topology', TOPOLOGIES)
+def test_generate_network(topology):
+    """
+    Check the connectivity, the specifications and that the pressure guesses drop along the edges
+    :return:
+    """
+
+    data = generate_network(topology, 10, model=['Pipe', 'FixedExternalConvectionPipe'], N=5)
+
+    submodels = data['submodels']
+    nodes = {name: submodel for name, submodel in submodels.items() if submodel['kind'] == 'node'}
+    edges = {name: submodel for name, submodel in submodels.items() if submodel['kind'] == 'edge'}
+
+    assert abs(len(edges) - 10) <= 2
+
+    sources = [name for name, node in nodes.items() if node['class'] == 'Source']
+    assert sources == ['node_0000']
+
+    for edge in edges.values():
+        assert edge['from'] in nodes and edge['to'] in nodes
+        assert edge['domains']['x']['N'] == 5
+        assert nodes[edge['from']]['initial_guess']['P'] > nodes[edge['to']]['initial_guess']['P']
+
+    # Every node but the source is reached and the outlets have the pressure specified
+    for name, node in nodes.items():
+        outgoing = [edge for edge in edges.values() if edge['from'] == name]
+        incoming = [edge for edge in edges.values() if edge['to'] == name]
+        if name != 'node_0000':
+            assert incoming
+            assert list(node['specifications']) == (['w'] if outgoing else ['P'])
@@ -0,0 +1,76 @@
+import sys
+import types
+
+import water_properties
+from daetools_extended.profiler import ExpressionProfiler, count_nodes
+
+
+class Node(object):
+
+    def __init__(self, *children):
+
+        for name, child in zip(('LNode', 'RNode'), children):
+            setattr(self, name, child)
+
+
+class Equation(object):
+    """
+    Fake equation instantiated on the given expression trees
+    """
+
+    def __init__(self, model, name, nodes):
+
+        self.Name = name
+        self.CanonicalName = '{0}.{1}'.format(model, name)
+        self.EquationExecutionInfos = [types.SimpleNamespace(Node=node) for node in nodes]
+
+
+class Model(object):
+
+    def __init__(self, name, equations=(), submodels=None):
+
+        self.CanonicalName = name
+        self.Equations = list(equations)
+        self.Variables = [types.SimpleNamespace(NumberOfPoints=len(self.Equations))]
+        self.submodels = submodels or {}
+
+
+def test_profile(monkeypatch):
+    """
+    Check the node counts per equation and model, and that the property functions are attributed to the equation
+    being declared
+    :return:
+    """
+
+    module = types.ModuleType('fake_model')
+    module.density = water_properties.density
+    monkeypatch.setitem(sys.modules, 'fake_model', module)
+
+    profiler = ExpressionProfiler()
+
+    with profiler.record_functions():
+        assert module.density is not water_properties.density
+        eq = Equation('root.pipe', 'v', [])
+        module.density(300., 400000., simplified=True)
+        module.density(300., 400000., simplified=True)
+
+    assert module.density is water_properties.density
+
+    # a + b * c has 5 nodes
+    expression = Node(Node(), Node(Node(), Node()))
+    pipe = Model('root.pipe', [Equation('root.pipe', 'v', [expression] * 3), Equation('root.pipe', 'D', [Node()])])
+    root = Model('root', submodels={'pipe': pipe})
+
+    report = profiler.profile(root)
+
+    assert count_nodes(expression) == 5
+    assert report['total'] == {'equations': 4, 'variables': 2, 'nodes': 16}
+    assert report['equations'][0]['equation'] == 'root.pipe.v'
+    assert report['equations'][0]['max_nodes'] == 5
+    assert report['models'][0]['model'] == 'root.pipe'
+
+    # Two constant subexpressions, expanded on the 3 instances of the equation
+    density = report['functions'][0]
+    assert density['function'] == 'density'
+    assert density['calls'] == 2
+    assert density['equations'] == {'root.pipe.v': 6}
@@ -0,0 +1,83 @@
+from daetools_extended.daemodel_extended import daeModelExtended
+
+
+class Variable(object):
+
+    def __init__(self, name):
+        self.Name = name
+        self.ReportingOn = True
+
+
+class Model(object):
+
+    def __init__(self, data, variables, submodels=None):
+        self.data = data
+        self.Variables = [Variable(name) for name in variables]
+        self.submodels = submodels or {}
+
+
+def get_network(reporting):
+
+    pipe = Model({}, ['T', 'P', 'v'])
+    node = Model({}, ['T', 'P', 'w'])
+    return Model({'reporting': reporting}, [], submodels={'pipe_01': pipe, 'node_A': node})
+
+
+def get_reported(model, prefix=''):
+
+    reported = [prefix + variable.Name for variable in model.Variables if variable.ReportingOn]
+    for name, submodel in model.submodels.items():
+        reported += get_reported(submodel, prefix='{0}{1}.'.format(prefix, name))
+
+    return sorted(reported)
+
+
+def test_include():
+    """
+    Check that only the variables matching the include patterns are reported
+    :return:
+    """
+
+    network = get_network({'include': ['*.T', 'pipe_*.P']})
+    daeModelExtended.setup_reporting(network)
+
+    assert get_reported(network) == ['node_A.T', 'pipe_01.P', 'pipe_01.T']
+
+
+def test_exclude():
+    """
+    Check that the variables matching the exclude patterns are not reported
+    :return:
+    """
+
+    network = get_network({'exclude': ['node_*.*']})
+    daeModelExtended.setup_reporting(network)
+
+    assert get_reported(network) == ['pipe_01.P', 'pipe_01.T', 'pipe_01.v']
+
+
+def test_exclude_overrides_include():
+    """
+    Check that the exclude patterns apply after the include ones
+    :return:
+    """
+
+    network = get_network({'include': ['*.T', '*.P'], 'exclude': ['node_A.P', '*.T']})
+    daeModelExtended.setup_reporting(network)
+
+    assert get_reported(network) == ['pipe_01.P']
+
+
+def test_submodel_overrides_root():
+    """
+    Check that the selection of a submodel, applied after the one of the root, takes precedence
+    :return:
+    """
+
+    network = get_network({'include': ['*.T']})
+    network.submodels['pipe_01'].data = {'reporting': {'include': ['v']}}
+
+    daeModelExtended.setup_reporting(network)
+    daeModelExtended.setup_reporting(network.submodels['pipe_01'])
+
+    assert get_reported(network) == ['node_A.T', 'pipe_01.v']
@@ -0,0 +1,64 @@
+import numpy as np
+
+from types import SimpleNamespace
+
+from daetools_extended.results import LabeledArray, Results
+
+
+def get_reporter():
+    """
+    Fake local data reporter of a pipe with a distributed and a lumped variable
+    :return:
+    """
+
+    times = 3600. * np.arange(5)
+    x = np.linspace(0., 1., 4)
+    T = 300. + times[:, np.newaxis] / 3600. + x[np.newaxis, :]
+    k = 0.1 * np.ones(5)
+
+    values = {
+        'network.pipe_01.T': (T, times, [x], 'K'),
+        'network.pipe_01.k': (k, times, [], 'kg/s'),
+        'network.node_A.P': (1e5 * np.ones(5), times, [], 'Pa'),
+    }
+
+    return SimpleNamespace(Process=SimpleNamespace(dictVariableValues=values))
+
+
+def test_labeled_array():
+    """
+    Check the selections by coordinates and positions, and that they are views
+    :return:
+    """
+
+    results = Results.from_reporter(get_reporter(), root='network')
+
+    T = results['pipe_01.T']
+
+    assert T.dims == ('time', 'x')
+    assert T.shape == (5, 4)
+
+    selected = T.sel(time=(3600., 7200.))
+    assert selected.times.tolist() == [3600., 7200.]
+    assert np.shares_memory(selected.values, T.values)
+
+    outlet = T.sel(x=1.0)
+    assert outlet.dims == ('time',)
+    assert outlet.values.tolist() == [301., 302., 303., 304., 305.]
+
+    last = T.isel(time=-1)
+    assert last.shape == (1, 4)
+    assert last.times.tolist() == [4 * 3600.]
+
+
+def test_results_selection():
+    """
+    Check the selections of variables by edge and pattern
+    :return:
+    """
+
+    results = Results.from_reporter(get_reporter(), root='network')
+
+    assert sorted(results.edge('pipe_01').keys()) == ['T', 'k']
+    assert list(results.select('*.P').keys()) == ['node_A.P']
+    assert results.sel(time=(0., 3600.), x=(0., 0.5))['pipe_01.T'].shape == (2, 2)
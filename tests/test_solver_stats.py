@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from daetools_extended.solver_stats import get_solver_stats, SolverStatsRecorder
+
+
+def get_integrator_stats(steps, residuals, jacobians, iterations, step):
+    """
+    Statistics as returned by daeIDAS.IntegratorStats of DaeTools 1.9.0 (daeIDASolver::GetIntegratorStats), a dict
+    of floats
+    """
+
+    return {
+        'NumSteps': float(steps),
+        'NumEquationEvals': float(residuals),
+        'NumErrTestFails': 1.0,
+        'LastOrder': 2.0,
+        'CurrentOrder': 2.0,
+        'ActualInitStep': 1e-4,
+        'LastStep': step,
+        'CurrentStep': step,
+        'CurrentTime': 100.0,
+        'NumNonlinSolvIters': float(iterations),
+        'NumNonlinSolvConvFails': 0.0,
+        'NumJacobianEvals': float(jacobians),
+    }
+
+
+def test_solver_stats():
+    """
+    Check the mapping of the statistics names and the statistics of the intervals
+    :return:
+    """
+
+    solver = SimpleNamespace(IntegratorStats=get_integrator_stats(10, 30, 4, 12, 2.5))
+    simulation = SimpleNamespace(DAESolver=solver)
+
+    stats = get_solver_stats(simulation)
+
+    assert stats['steps'] == 10
+    assert stats['residual_evaluations'] == 30
+    assert stats['jacobian_evaluations'] == 4
+    assert stats['nonlinear_iterations'] == 12
+    assert stats['error_test_failures'] == 1
+    assert stats['last_order'] == 2.0
+    assert all(value is not None for value in stats.values())
+
+    recorder = SolverStatsRecorder(simulation)
+    recorder.start(0.)
+
+    solver.IntegratorStats = get_integrator_stats(30, 80, 9, 40, 5.)
+    interval = recorder.update(100.)
+
+    assert interval['steps'] == 20
+    assert interval['residual_evaluations'] == 50
+    assert interval['jacobian_evaluations'] == 5
+    assert interval['nonlinear_iterations'] == 28
+    assert interval['mean_step'] == 5.
+    assert interval['last_step'] == 5.
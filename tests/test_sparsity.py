@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+from scipy import io, sparse
+
+from daetools_extended.sparsity import block_triangular, get_summary, write_pattern
+
+
+def test_block_triangular(tmpdir):
+    """
+    Check the blocks of a chain with a 2x2 cycle and that the permuted pattern is block lower triangular
+    :return:
+    """
+
+    # Chain x0 -> x1 -> (x2, x3) -> x4, rows and columns scrambled
+    chain = np.array([[1, 0, 0, 0, 0],
+                      [1, 1, 0, 0, 0],
+                      [0, 1, 1, 1, 0],
+                      [0, 0, 1, 1, 0],
+                      [0, 0, 0, 1, 1]])
+    pattern = chain[[3, 0, 4, 1, 2], :][:, ::-1]
+    matrix = sparse.csr_matrix(pattern)
+
+    decomposition = block_triangular(matrix)
+
+    assert decomposition['structural_rank'] == 5
+    assert not decomposition['over']['rows'] and not decomposition['under']['columns']
+    assert get_summary(decomposition) == {'blocks': 4, 'largest': 2, 'sizes': {'1': 3, '2': 1}}
+    assert sorted(decomposition['row_order']) == list(range(5))
+
+    permuted = pattern[decomposition['row_order'], :][:, decomposition['column_order']]
+    start = 0
+    for block in decomposition['blocks']:
+        end = start + len(block)
+        assert not permuted[start:end, end:].any()
+        start = end
+
+    path = str(tmpdir.join('pattern.mtx'))
+    write_pattern(path, matrix, decomposition, ['eq{0}'.format(i) for i in range(5)],
+                  ['v{0}'.format(i) for i in range(5)])
+
+    assert (io.mmread(path).toarray() != 0).tolist() == (pattern != 0).tolist()
+    assert (io.mmread(str(tmpdir.join('pattern.btf.mtx'))).toarray() != 0).tolist() == (permuted != 0).tolist()
+    with open(str(tmpdir.join('pattern.json'))) as f:
+        assert json.load(f)['summary']['blocks'] == 4
+
+
+def test_block_triangular_singular():
+    """
+    Check the over and under-determined parts of a structurally singular pattern
+    :return:
+    """
+
+    # Two equations in the variable 0 alone, variables 1 and 2 in a single equation
+    pattern = sparse.csr_matrix(np.array([[1, 0, 0],
+                                          [1, 0, 0],
+                                          [0, 1, 1]]))
+
+    decomposition = block_triangular(pattern)
+
+    assert decomposition['structural_rank'] == 2
+    assert decomposition['over'] == {'rows': [0, 1], 'columns': [0]}
+    assert decomposition['under'] == {'rows': [2], 'columns': [1, 2]}
+    assert decomposition['blocks'] == []
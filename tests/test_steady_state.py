@@ -0,0 +1,84 @@
+import numpy as np
+
+from daetools_extended.steady_state import SteadyStateDetector
+
+
+class Variable(object):
+
+    def __init__(self, name, values):
+        self.Name = name
+        self.npyValues = np.array(values, dtype=float)
+        self.npyTimeDerivatives = np.zeros_like(self.npyValues)
+
+
+class Model(object):
+
+    def __init__(self, variables, submodels=None):
+        self.Variables = variables
+        self.submodels = submodels or {}
+
+
+def get_model():
+
+    T = Variable('T', [300., 310.])
+    v = Variable('v', [1.0, 1.0])
+    model = Model([], submodels={'pipe_01': Model([T, v])})
+
+    return model, T, v
+
+
+def test_window_spans_two_updates():
+    """
+    Check that a single quiet interval as long as the window does not reach the steady state
+    :return:
+    """
+
+    model, T, v = get_model()
+    detector = SteadyStateDetector(model, variables=['*.T'], atol=1e-6, rtol=0., window=3600.)
+
+    assert not detector.update(0.)
+    assert not detector.update(3600.)
+    assert detector.settled_time == 3600.
+    assert detector.update(7200.)
+
+
+def test_changes_reset_the_window():
+    """
+    Check that a change between the reports and a time derivative at the report both reset the window
+    :return:
+    """
+
+    model, T, v = get_model()
+    detector = SteadyStateDetector(model, variables=['*.T'], atol=1e-6, rtol=0., window=100.)
+
+    detector.update(0.)
+    detector.update(100.)
+    T.npyValues += 1.
+    assert not detector.update(200.)
+    assert detector.settled_time == 0.
+    assert detector.max_rate == 0.01
+
+    # Same value at the reports, but still oscillating
+    detector.update(300.)
+    T.npyTimeDerivatives[1] = 1e-3
+    assert not detector.update(400.)
+    assert detector.max_rate == 1e-3
+
+    T.npyTimeDerivatives[1] = 0.
+    detector.update(500.)
+    assert detector.update(600.)
+
+
+def test_monitored_variables():
+    """
+    Check that only the variables matching the patterns are monitored
+    :return:
+    """
+
+    model, T, v = get_model()
+    detector = SteadyStateDetector(model, variables=['*.T'], atol=1e-6, rtol=0., window=100.)
+
+    detector.update(0.)
+    v.npyValues += 10.
+    detector.update(100.)
+    assert detector.update(200.)
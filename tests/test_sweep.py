@@ -0,0 +1,69 @@
+import pytest
+
+from daetools_extended.sweep import expand_grid, build_case, get_data_value, set_data_value, run_sweep
+
+
+def get_data():
+    """
+    Get the base data of the sweep from the network_examples module
+    :return:
+    """
+
+    import examples.network_examples as ex
+
+    return ex.case_pipe()
+
+
+def test_expand_grid():
+    """
+    Check if the grid is expanded as a cartesian product
+    :return:
+    """
+
+    grid = {
+        'pipe_01.parameters.ep': [45e-6, 90e-6],
+        'node_A.specifications.P': [398000., 399000., 400000.],
+    }
+
+    cases = expand_grid(grid)
+
+    assert len(cases) == 6
+    assert cases[0] == {'pipe_01.parameters.ep': 45e-6, 'node_A.specifications.P': 398000.}
+
+
+def test_build_case():
+    """
+    Check if a case changes only its copy of the data dictionary
+    :return:
+    """
+
+    data = get_data()
+
+    case = build_case(data, {'pipe_01.parameters.ep': 90e-6, 'submodels.node_A.specifications.P': 390000.})
+
+    assert get_data_value(case, 'pipe_01.parameters.ep') == 90e-6
+    assert case['submodels']['node_A']['specifications']['P'] == 390000.
+    assert get_data_value(data, 'pipe_01.parameters.ep') == 45e-6
+
+    with pytest.raises(KeyError):
+        set_data_value(case, 'pipe_99.parameters.ep', 1.0)
+
+    # A mistyped parameter is not added silently
+    with pytest.raises(KeyError):
+        build_case(data, {'pipe_01.parameters.epp': 2e-5})
+
+    assert get_data_value(set_data_value(case, 'pipe_01.parameters.epp', 2e-5, create=True),
+                          'pipe_01.parameters.epp') == 2e-5
+
+
+def test_run_sweep():
+    """
+    Check if the sweep collects one row per case
+    :return:
+    """
+
+    table = run_sweep(get_data(), grid={'pipe_01.parameters.ep': [45e-6, 90e-6]}, outputs=['pipe_01.k'], jobs=2,
+                      reporting_interval=3600, time_horizon=3600*24, relative_tolerance=1e-3)
+
+    assert list(table['status']) == ['ok', 'ok']
+    assert table['pipe_01.k'][1] < table['pipe_01.k'][0]
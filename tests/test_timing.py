@@ -0,0 +1,53 @@
+import json
+
+from daetools_extended.timing import PhaseTimer
+
+
+class Model(object):
+    """
+    Fake model whose DeclareEquations calls the ones of its submodels, as DaeTools does
+    """
+
+    def __init__(self, submodels=()):
+
+        self.submodels = {'sub_{0}'.format(i): submodel for i, submodel in enumerate(submodels)}
+        self.declared = 0
+
+
+    def DeclareEquations(self):
+
+        self.declared += 1
+        for submodel in self.submodels.values():
+            submodel.DeclareEquations()
+
+
+def test_phase_timer(tmpdir):
+    """
+    Check the nested phases and that DeclareEquations of the whole model tree is measured once
+    :return:
+    """
+
+    timer = PhaseTimer()
+
+    model = Model([Model(), Model([Model()])])
+    timer.wrap_declare_equations(model)
+
+    with timer.phase('Initialize'):
+        model.DeclareEquations()
+
+    with timer.phase('Run'):
+        sum(range(10000))
+
+    assert list(timer.phases.keys()) == ['Initialize', 'DeclareEquations', 'Run']
+    assert timer.phases['DeclareEquations']['calls'] == 1
+    assert timer.phases['DeclareEquations']['within'] == 'Initialize'
+    assert model.submodels['sub_1'].submodels['sub_0'].declared == 1
+
+    path = str(tmpdir.join('output.timing.json'))
+    timer.write(path, equations=10)
+
+    with open(path) as f:
+        report = json.load(f)
+
+    assert report['equations'] == 10
+    assert report['total']['wall'] == timer.phases['Initialize']['wall'] + timer.phases['Run']['wall']